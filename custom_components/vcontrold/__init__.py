@@ -1,5 +1,6 @@
 """Viessmann vcontrold Integration - All-in-One Lösung mit integriertem Daemon."""
 import logging
+from pathlib import Path
 from typing import Final
 
 from homeassistant.config_entries import ConfigEntry
@@ -7,25 +8,39 @@ from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryNotReady
 
+from .backend import HeatingBackend
 from .config_flow import VcontroledOptionsFlow
 from .const import (
     ATTR_MODE,
     ATTR_TEMPERATURE,
+    BACKEND_SERIAL,
+    CONF_BACKEND,
+    CONF_BAUDRATE,
     CONF_DEVICE,
+    CONF_DEVICE_ID,
     CONF_FRAMING,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_BACKEND,
+    DEFAULT_BAUDRATE,
     DEFAULT_CACHE_TTL,
     DEFAULT_DEVICE,
     DEFAULT_FRAMING,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
+    FRAMING_AUTO,
     MAX_TEMP,
     MIN_TEMP,
+    PROBE_CACHE_FILE,
+    REGISTRY_CACHE_FILE,
+    REGISTRY_SEARCH_DIRS,
     SERVICE_SET_BETRIEBSART,
     SERVICE_SET_TEMP_WW_SOLL,
     VALID_MODES,
 )
 from .daemon_manager import VcontroledDaemonManager
+from .heating_controller import Framing, ViessmannHeatingController
+from .probe import async_detect
+from .registry import CommandRegistry, load_registry
 from .vcontrold_manager import VcontroledManager
 
 _LOGGER = logging.getLogger(__name__)
@@ -37,9 +52,10 @@ CONFIG_SCHEMA = None  # Wird durch Config Flow ersetzt
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Richte Integration ein - All-in-One mit integriertem Daemon."""
+    """Richte Integration ein - direkt seriell oder über vcontrold (integriert/extern)."""
     _LOGGER.debug("🔧 Richte vcontrold All-in-One Integration ein")
     
+    backend_type = entry.data.get(CONF_BACKEND, DEFAULT_BACKEND)
     device = entry.data.get(CONF_DEVICE, DEFAULT_DEVICE)
     framing = entry.data.get(CONF_FRAMING, DEFAULT_FRAMING)
     manage_daemon = entry.data.get("manage_daemon", True)  # Default: HA verwaltet Daemon
@@ -49,8 +65,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Speichere Manager im hass.data
     hass.data.setdefault(DOMAIN, {})
     
-    # Starte Daemon wenn aktiviert (ALL-IN-ONE)
-    if manage_daemon:
+    # Starte Daemon wenn aktiviert (ALL-IN-ONE) - direkt seriell braucht keinen
+    if manage_daemon and backend_type != BACKEND_SERIAL:
         _LOGGER.info("📡 Starte integriertem vcontrold Daemon...")
         daemon_manager = VcontroledDaemonManager(
             config_dir=hass.config.path(),
@@ -78,19 +94,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN]["daemon_manager"] = daemon_manager
         _LOGGER.info(f"✅ vcontrold Daemon läuft auf {host}:{port}")
     
-    # Verbinde zum vcontrold (integriert oder extern)
-    manager = VcontroledManager(host=host, port=port)
+    # Befehls-Registry (vito.xml wird einmal geparst und auf der Platte gecacht)
+    daemon_dir = Path(hass.config.path("vcontrold_daemon"))
+    registry = await hass.async_add_executor_job(
+        load_registry,
+        [daemon_dir, *map(Path, REGISTRY_SEARCH_DIRS)],
+        daemon_dir / REGISTRY_CACHE_FILE,
+        entry.data.get(CONF_DEVICE_ID),
+    )
+    
+    if backend_type == BACKEND_SERIAL:
+        # Direkt über die serielle Schnittstelle - kein Daemon, kein TCP
+        manager: HeatingBackend = await _async_create_serial_backend(
+            hass, entry, device, daemon_dir, registry
+        )
+        target = device
+    else:
+        # Verbinde zum vcontrold (integriert oder extern)
+        manager = VcontroledManager(host=host, port=port, registry=registry)
+        target = f"{host}:{port}"
+        
+        # Supervisor pausiert das Polling, solange der Daemon neu startet
+        daemon_manager = hass.data[DOMAIN].get("daemon_manager")
+        if daemon_manager is not None:
+            daemon_manager.add_availability_listener(manager.set_daemon_available)
     
     # Prüfe Verfügbarkeit
     try:
-        is_available = await hass.async_add_executor_job(manager.is_available)
-        if not is_available:
-            error_msg = f"vcontrold nicht erreichbar auf {host}:{port}"
-            _LOGGER.error(f"❌ {error_msg}")
-            raise ConfigEntryNotReady(error_msg)
+        is_available = await manager.is_available()
     except Exception as e:
         _LOGGER.error(f"❌ Fehler beim Verbindungstest: {e}")
+        await _async_abort_setup(hass, manager)
         raise ConfigEntryNotReady(f"Verbindungsfehler: {e}")
+    if not is_available:
+        error_msg = f"Heizung nicht erreichbar über {target}"
+        _LOGGER.error(f"❌ {error_msg}")
+        await _async_abort_setup(hass, manager)
+        raise ConfigEntryNotReady(error_msg)
     
     # Speichere Manager
     hass.data[DOMAIN][entry.entry_id] = manager
@@ -101,19 +141,74 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Lade Plattformen
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
-    _LOGGER.info(f"✅ vcontrold Integration erfolgreich eingerichtet ({host}:{port})")
+    _LOGGER.info(f"✅ vcontrold Integration erfolgreich eingerichtet ({backend_type}: {target})")
     return True
 
 
+async def _async_abort_setup(hass: HomeAssistant, manager: HeatingBackend) -> None:
+    """Räume nach fehlgeschlagenem Verbindungstest auf.
+    
+    Der Retry von ``ConfigEntryNotReady`` legt einen neuen Daemon Manager an -
+    der alte darf dann weder in hass.data stehen noch Supervisor und Health
+    Checks weiterlaufen lassen. Ein selbst gestarteter Daemon wird beendet,
+    ein übernommener bleibt für den nächsten Versuch stehen.
+    """
+    await manager.cleanup()
+    
+    daemon_manager = hass.data.get(DOMAIN, {}).pop("daemon_manager", None)
+    if daemon_manager is None:
+        return
+    if isinstance(manager, VcontroledManager):
+        daemon_manager.remove_availability_listener(manager.set_daemon_available)
+    if daemon_manager.spawned:
+        await daemon_manager.stop_daemon()
+    else:
+        await daemon_manager.detach()
+
+
+async def _async_create_serial_backend(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    device: str,
+    daemon_dir: Path,
+    registry: CommandRegistry,
+) -> ViessmannHeatingController:
+    """Erzeuge das direkte serielle Backend.
+    
+    Protokoll und Baud-Rate stammen aus dem Config Entry; bei "Automatisch"
+    liefert sie der Probe (beim Setup gespeichert, sonst neu erkannt).
+    """
+    framing = entry.data.get(CONF_FRAMING, DEFAULT_FRAMING)
+    baudrate = entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)
+    
+    if framing == FRAMING_AUTO:
+        result = await async_detect(device, daemon_dir / PROBE_CACHE_FILE)
+        if result is None:
+            raise ConfigEntryNotReady(f"Keine Heizung auf {device} erkannt")
+        framing = result.framing.value
+        baudrate = result.baudrate
+    
+    return ViessmannHeatingController(
+        port=device,
+        baudrate=baudrate,
+        framing=Framing(framing),
+        registry=registry,
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Entlade Integration."""
     _LOGGER.debug("Entlade vcontrold Integration")
     
-    # Stoppe Daemon wenn HA ihn verwaltet
-    daemon_manager = hass.data[DOMAIN].get("daemon_manager")
+    # Daemon wenn HA ihn verwaltet: beim Reload weiterlaufen lassen (wird beim
+    # Setup übernommen), beim Deaktivieren stoppen
+    daemon_manager = hass.data[DOMAIN].pop("daemon_manager", None)
     if daemon_manager:
-        await hass.async_add_executor_job(daemon_manager.stop_daemon)
-        _LOGGER.info("vcontrold Daemon gestoppt")
+        if entry.disabled_by:
+            await daemon_manager.stop_daemon()
+            _LOGGER.info("vcontrold Daemon gestoppt")
+        else:
+            await daemon_manager.detach()
     
     # Entlade Plattformen
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -121,12 +216,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         manager = hass.data[DOMAIN].pop(entry.entry_id, None)
         if manager:
-            manager.cleanup()
+            await manager.cleanup()
     
     return unload_ok
 
 
-def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Integration entfernt - abgekoppelten Daemon beenden."""
+    if not entry.data.get("manage_daemon", True) or entry.data.get(CONF_BACKEND) == BACKEND_SERIAL:
+        return
+    daemon_manager = VcontroledDaemonManager(config_dir=hass.config.path())
+    await daemon_manager.stop_daemon()
+
+
+def _setup_services(hass: HomeAssistant, manager: HeatingBackend):
     """Registriere Custom Services."""
     
     async def handle_set_temp_ww_soll(call: ServiceCall) -> None:
@@ -137,9 +240,7 @@ def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
             _LOGGER.error(f"Ungültige Temperatur: {temp}. Bereich: {MIN_TEMP}-{MAX_TEMP}°C")
             return
         
-        result = await hass.async_add_executor_job(
-            manager.set_temperature, "setTempWWsoll", float(temp)
-        )
+        result = await manager.set_temperature("setTempWWsoll", float(temp))
         
         if result:
             _LOGGER.info(f"✅ Warmwasser-Solltemperatur auf {temp}°C gesetzt")
@@ -154,9 +255,7 @@ def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
             _LOGGER.error(f"Ungültige Betriebsart: {mode}. Gültig: {VALID_MODES}")
             return
         
-        result = await hass.async_add_executor_job(
-            manager.set_operating_mode, mode
-        )
+        result = await manager.set_operating_mode(mode)
         
         if result:
             _LOGGER.info(f"✅ Betriebsart auf {mode} gesetzt")
@@ -170,9 +269,7 @@ def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
         async def handle_start_daemon(call: ServiceCall) -> None:
             """Service zum Starten des Daemons."""
             device = call.data.get("device")
-            result = await hass.async_add_executor_job(
-                daemon_manager.start_daemon, device
-            )
+            result = await daemon_manager.start_daemon(device)
             
             if result:
                 _LOGGER.info("✅ vcontrold Daemon gestartet")
@@ -187,9 +284,7 @@ def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
         
         async def handle_stop_daemon(call: ServiceCall) -> None:
             """Service zum Stoppen des Daemons."""
-            result = await hass.async_add_executor_job(
-                daemon_manager.stop_daemon
-            )
+            result = await daemon_manager.stop_daemon()
             
             if result:
                 _LOGGER.info("✅ vcontrold Daemon gestoppt")
@@ -198,10 +293,18 @@ def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
         
         async def handle_check_status(call: ServiceCall) -> None:
             """Service zum Prüfen des Daemon-Status."""
+            await daemon_manager.health_check()
             status = daemon_manager.get_daemon_status()
-            health_ok = await daemon_manager.health_check()
+            health = status["health"]
             
-            status_text = "✅ OK" if health_ok else "⚠️ ERROR"
+            status_text = {
+                "healthy": "✅ healthy",
+                "degraded": "⚠️ degraded",
+                "down": "🔴 down",
+            }.get(health["state"], "❔ unbekannt")
+            histogram = " | ".join(
+                f"{bucket}: {count}" for bucket, count in health["histogram"].items()
+            )
             message = f"""
 **vcontrold Daemon Status: {status_text}**
 
@@ -212,6 +315,10 @@ def _setup_services(hass: HomeAssistant, manager: VcontroledManager):
 - Device: {status['config']['device']}
 - Listen: {status['config']['host']}:{status['config']['port']}
 - Health Checks: {status['health_checks']}
+- Neustarts: {status['restarts']}{' (🔁 Crash-Loop)' if status['crash_loop'] else ''}
+- Fehlerrate: {f"{health['error_rate']:.0%}" if health['error_rate'] is not None else 'N/A'} ({health['errors']}/{health['checks']} Checks)
+- Latenz p95: {f"{health['p95_ms']:g} ms" if health['p95_ms'] is not None else 'N/A'}
+- Latenz-Histogramm: {histogram}
             """
             
             await hass.async_create_task(
@@ -0,0 +1,68 @@
+"""Gemeinsame Schnittstelle der Heizungs-Backends.
+
+Sensoren und Services sprechen nur mit ``HeatingBackend``; welches Backend
+dahinter steckt, entscheidet der Config Flow:
+
+- ``ViessmannHeatingController`` - direkt über die serielle Schnittstelle
+  (Optolink), ohne vcontrold Binary, Subprozess und TCP
+- ``VcontroledManager`` - über einen vcontrold Daemon (TCP, integriert
+  gestartet oder extern)
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+from .registry import CommandRegistry
+
+
+class HeatingBackend(ABC):
+    """Lese- und Schreibzugriff auf eine Heizung."""
+
+    registry: CommandRegistry
+
+    def __init__(self):
+        """Initialisiere gemeinsame Listener."""
+        self._write_listeners: List[Callable[[str], None]] = []
+
+    def add_write_listener(self, listener: Callable[[str], None]) -> Callable[[], None]:
+        """Melde Schreibbefehle mit dem betroffenen Getter (z.B. für sofortiges Neulesen).
+
+        Returns:
+            Callback zum Abmelden
+        """
+        self._write_listeners.append(listener)
+        return lambda: self._write_listeners.remove(listener)
+
+    def _notify_write(self, getter: str) -> None:
+        """Benachrichtige Listener nach einem Schreibbefehl (erfolgreich oder nicht)."""
+        for listener in self._write_listeners:
+            listener(getter)
+
+    @abstractmethod
+    async def read_many(
+        self, sensor_types: List[str], use_cache: bool = True
+    ) -> Dict[str, Optional[Any]]:
+        """Lese mehrere Datenpunkte (None für nicht lesbare)."""
+
+    @abstractmethod
+    async def get_temperature(self, sensor_type: str) -> Optional[float]:
+        """Lese einen Datenpunkt (mit Cache)."""
+
+    @abstractmethod
+    async def set_temperature(self, command: str, value: float) -> bool:
+        """Schreibe einen Temperatur-Sollwert."""
+
+    @abstractmethod
+    async def set_operating_mode(self, mode: str) -> bool:
+        """Setze die Betriebsart (auto, standby, party, eco)."""
+
+    @abstractmethod
+    async def is_available(self) -> bool:
+        """Ist die Heizung erreichbar?"""
+
+    @abstractmethod
+    def get_info(self) -> dict:
+        """Verbindungs- und Cache-Statistik."""
+
+    @abstractmethod
+    async def cleanup(self) -> None:
+        """Verbindung schließen und Hintergrundarbeit beenden."""
@@ -0,0 +1,98 @@
+"""Datenpunkt-Cache mit TTL pro Befehl und Stale-While-Revalidate."""
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class CacheState(Enum):
+    """Zustand eines Cache-Eintrags."""
+    FRESH = "fresh"  # innerhalb der TTL
+    STALE = "stale"  # TTL abgelaufen, darf aber noch ausgeliefert werden
+    MISS = "miss"  # kein (verwendbarer) Wert
+
+
+class DatapointCache:
+    """Gemeinsamer Cache für beide Backends.
+
+    - TTL pro Befehl (Außentemperatur ändert sich langsam, Vorlauf schnell)
+    - Monotone Uhr, d.h. unabhängig von Sprüngen der Systemzeit
+    - Stale-While-Revalidate: nach Ablauf der TTL wird der letzte Wert noch
+      bis ``ttl * stale_factor`` ausgeliefert, während der Aufrufer im
+      Hintergrund neu liest
+    - Hit/Miss Zähler
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 30,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_factor: float = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialisiere Cache.
+
+        Args:
+            default_ttl: TTL in Sekunden für Befehle ohne eigenen Eintrag
+            ttls: TTL in Sekunden pro Befehl
+            stale_factor: Wie viele TTLs ein abgelaufener Wert noch gilt
+            clock: Zeitquelle (monoton)
+        """
+        self.default_ttl = default_ttl
+        self.ttls: Dict[str, float] = dict(ttls or {})
+        self.stale_factor = stale_factor
+        self._clock = clock
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def ttl(self, key: str) -> float:
+        """TTL für einen Befehl."""
+        return self.ttls.get(key, self.default_ttl)
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], CacheState]:
+        """Hole Wert und Zustand eines Eintrags (zählt Hits/Misses)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, CacheState.MISS
+
+        value, stored = entry
+        age = self._clock() - stored
+        ttl = self.ttl(key)
+        if age < ttl:
+            self.hits += 1
+            return value, CacheState.FRESH
+        if age < ttl * self.stale_factor:
+            self.stale_hits += 1
+            return value, CacheState.STALE
+
+        self.misses += 1
+        return None, CacheState.MISS
+
+    def put(self, key: str, value: Any) -> None:
+        """Speichere Wert mit aktuellem Zeitstempel."""
+        self._entries[key] = (value, self._clock())
+
+    def invalidate(self, key: str) -> None:
+        """Verwerfe einen Eintrag."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Verwerfe alle Einträge."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Anzahl gespeicherter Einträge."""
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        """Hole Cache-Statistik."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+        }
@@ -0,0 +1,110 @@
+"""Single-Flight Coalescing für Lesebefehle.
+
+Fragen mehrere Aufrufer (Coordinator, Service, Diagnose) gleichzeitig denselben
+Datenpunkt ab, teilen sie sich eine laufende Bus-Transaktion und deren
+Ergebnis, statt den langsamen Optolink-Bus mehrfach zu belegen.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncRequestCoalescer:
+    """Single-Flight für Coroutinen (vcontrold TCP Client)."""
+
+    def __init__(self):
+        """Initialisiere Coalescer."""
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Prüfe ob für ``key`` bereits eine Anfrage läuft."""
+        return key in self._inflight
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        """Entferne abgeschlossene Anfrage (nur wenn sie noch registriert ist)."""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Führe ``factory`` aus oder hänge dich an eine laufende Anfrage an.
+
+        Der Abbruch eines einzelnen Aufrufers bricht die gemeinsame
+        Transaktion nicht ab (``asyncio.shield``).
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            _LOGGER.debug(f"Anfrage {key} an laufende Transaktion angehängt")
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(factory())
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(future)
+
+    def start_many(
+        self,
+        keys: Iterable[Hashable],
+        factory: Callable[[list], Awaitable[Dict[Hashable, T]]],
+    ) -> Dict[Hashable, asyncio.Future]:
+        """Registriere Anfragen sofort und starte fehlende im Hintergrund.
+
+        Bereits laufende Schlüssel werden mitgenutzt, alle übrigen gemeinsam
+        an ``factory`` übergeben (ein Aufruf, z.B. ein Pipelining-Batch).
+        Die Registrierung passiert synchron - ein Aufrufer, der direkt
+        danach denselben Schlüssel anfragt, hängt sich bereits an.
+
+        Returns:
+            Dict Schlüssel -> Future mit dem Einzelergebnis
+        """
+        loop = asyncio.get_running_loop()
+        futures: Dict[Hashable, asyncio.Future] = {}
+        missing = []
+
+        for key in keys:
+            if key in futures:
+                continue
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = loop.create_future()
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._release(key, done))
+                missing.append(key)
+            futures[key] = future
+
+        if missing:
+            batch = asyncio.ensure_future(factory(missing))
+
+            def _resolve(done: asyncio.Future) -> None:
+                for key in missing:
+                    future = futures[key]
+                    if future.done():
+                        continue
+                    if done.cancelled():
+                        future.cancel()
+                    elif done.exception() is not None:
+                        future.set_exception(done.exception())
+                    else:
+                        future.set_result(done.result().get(key))
+
+            batch.add_done_callback(_resolve)
+
+        return futures
+
+    async def run_many(
+        self,
+        keys: Iterable[Hashable],
+        factory: Callable[[list], Awaitable[Dict[Hashable, T]]],
+    ) -> Dict[Hashable, T]:
+        """Batch-Variante von ``run`` (siehe ``start_many``)."""
+        futures = self.start_many(keys, factory)
+        return {
+            key: await asyncio.shield(future) for key, future in futures.items()
+        }
@@ -1,5 +1,6 @@
 """Config Flow für vcontrold Integration - Viessmann Vitotronic 300 optimiert."""
 import logging
+from pathlib import Path
 from typing import Any, Dict, Optional
 
 import serial
@@ -9,7 +10,12 @@ from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
 
 from .const import (
+    BACKEND_SERIAL,
+    BACKEND_VCONTROLD,
+    CONF_BACKEND,
+    CONF_BAUDRATE,
     CONF_DEVICE,
+    CONF_DEVICE_ID,
     CONF_FRAMING,
     CONF_HEATER_MODEL,
     CONF_LOG_LEVEL,
@@ -19,10 +25,17 @@ from .const import (
     DEFAULT_HEATER_MODEL,
     DEFAULT_LOG_LEVEL,
     DOMAIN,
+    FRAMING_AUTO,
     FRAMING_OPTIONS,
     HEATER_MODELS,
     LOG_LEVELS,
+    PROBE_CACHE_FILE,
+    SETUP_EXTERNAL_DAEMON,
+    SETUP_MANAGED_DAEMON,
+    SETUP_OPTIONS,
+    SETUP_SERIAL,
 )
+from .probe import async_detect
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,21 +55,22 @@ class VcontroledConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
-        """Step 1: Daemon-Setup auswählen."""
+        """Step 1: Backend auswählen (direkt seriell oder vcontrold Daemon)."""
         if user_input is not None:
-            manage_daemon = user_input.get("manage_daemon", True)
+            setup = user_input.get("setup")
+            if setup is None:
+                # YAML-Import / ältere Konfiguration
+                manage_daemon = user_input.get("manage_daemon", True)
+                setup = SETUP_MANAGED_DAEMON if manage_daemon else SETUP_EXTERNAL_DAEMON
+            self.context["setup"] = setup
             
-            if manage_daemon:
-                return await self.async_step_select_heater_model()
-            else:
+            if setup == SETUP_EXTERNAL_DAEMON:
                 return await self.async_step_external_connection()
+            return await self.async_step_select_heater_model()
         
         data_schema = vol.Schema(
             {
-                vol.Required("manage_daemon", default=True): vol.In({
-                    True: "🔧 HA verwaltet Daemon (All-in-One - EMPFOHLEN)",
-                    False: "🌐 Externe vcontrold Instanz",
-                }),
+                vol.Required("setup", default=SETUP_SERIAL): vol.In(SETUP_OPTIONS),
             }
         )
         
@@ -93,10 +107,14 @@ class VcontroledConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_ha_managed_device(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
-        """Step 2a: Serielles Gerät für HA-verwalteten Daemon."""
+        """Step 2a: Serielles Gerät (direkt oder für HA-verwalteten Daemon)."""
         errors: Dict[str, str] = {}
         
         if user_input is not None:
+            self.context[CONF_DEVICE] = user_input.get(CONF_DEVICE, DEFAULT_DEVICE)
+            if self.context.get("setup") == SETUP_SERIAL:
+                # Ohne Daemon keine Netzwerk-Einstellungen
+                return await self.async_step_ha_managed_advanced()
             return await self.async_step_ha_managed_network()
         
         serial_ports = self._get_serial_ports()
@@ -165,20 +183,51 @@ class VcontroledConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             update_interval = user_input.get("update_interval", DEFAULT_UPDATE_INTERVAL)
             log_level = user_input.get("log_level", DEFAULT_LOG_LEVEL)
             framing = user_input.get(CONF_FRAMING, DEFAULT_FRAMING)
+            probe_data: Dict[str, Any] = {}
             
-            return self.async_create_entry(
-                title=f"� Viessmann vcontrold - {HEATER_MODELS.get(heater_model, 'Heizung')}",
-                data={
-                    "manage_daemon": True,
+            if framing == FRAMING_AUTO and self.context.get("setup") == SETUP_SERIAL:
+                # Protokoll, Baud-Rate und Geräte-ID erkennen (Ergebnis wird gespeichert).
+                # Nur für das serielle Backend - beim integrierten Daemon gehört die
+                # Schnittstelle vcontrold, das Protokoll steht in dessen Konfiguration
+                result = await async_detect(
+                    device,
+                    Path(self.hass.config.path("vcontrold_daemon")) / PROBE_CACHE_FILE,
+                    force=True,
+                )
+                if result is None:
+                    errors["base"] = "probe_failed"
+                else:
+                    framing = result.framing.value
+                    probe_data = {
+                        CONF_BAUDRATE: result.baudrate,
+                        CONF_DEVICE_ID: result.device_id,
+                    }
+            
+            if not errors:
+                model_name = HEATER_MODELS.get(heater_model, 'Heizung')
+                data = {
                     CONF_DEVICE: device,
                     CONF_FRAMING: framing,
                     CONF_HEATER_MODEL: heater_model,
-                    "host": host,
-                    "port": port,
                     "update_interval": update_interval,
                     "log_level": log_level,
-                },
-            )
+                    **probe_data,
+                }
+                if self.context.get("setup") == SETUP_SERIAL:
+                    return self.async_create_entry(
+                        title=f"⚡ Viessmann seriell - {model_name}",
+                        data={CONF_BACKEND: BACKEND_SERIAL, "manage_daemon": False, **data},
+                    )
+                return self.async_create_entry(
+                    title=f"� Viessmann vcontrold - {model_name}",
+                    data={
+                        CONF_BACKEND: BACKEND_VCONTROLD,
+                        "manage_daemon": True,
+                        "host": host,
+                        "port": port,
+                        **data,
+                    },
+                )
         
         data_schema = vol.Schema(
             {
@@ -187,7 +236,7 @@ class VcontroledConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Range(min=30, max=300),
                 ),
                 vol.Required("log_level", default=DEFAULT_LOG_LEVEL): vol.In(LOG_LEVELS),
-                vol.Optional(CONF_FRAMING, default=DEFAULT_FRAMING): vol.In(FRAMING_OPTIONS),
+                vol.Optional(CONF_FRAMING, default=FRAMING_AUTO): vol.In(FRAMING_OPTIONS),
             }
         )
         
@@ -198,7 +247,7 @@ class VcontroledConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={
                 "update_help": "Wie oft Sensoren aktualisiert werden (30-300 Sekunden)",
                 "log_help": "Detailliertheitsgrad des Logging",
-                "framing_help": "RS232 Protokoll-Variante (KW für die meisten Viessmann)",
+                "framing_help": "RS232 Protokoll-Variante (Automatisch: wird beim Setup erkannt)",
             },
             errors=errors,
         )
@@ -264,6 +313,7 @@ class VcontroledConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return self.async_create_entry(
                 title=f"🌐 Viessmann vcontrold ({host}:{port})",
                 data={
+                    CONF_BACKEND: BACKEND_VCONTROLD,
                     "manage_daemon": False,
                     "host": host,
                     "port": port,
@@ -22,6 +22,9 @@ CONF_LOG_LEVEL = "log_level"
 CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_MANAGE_DAEMON = "manage_daemon"
+CONF_DEVICE_ID = "device_id"
+CONF_BAUDRATE = "baudrate"
+CONF_BACKEND = "backend"
 
 # ======================= STANDARDWERTE =======================
 # Für Vitotronic 300
@@ -30,10 +33,66 @@ DEFAULT_FRAMING = "kw"  # Komfortsignal - Standard für Vitotronic 300
 DEFAULT_UPDATE_INTERVAL = 60
 DEFAULT_CACHE_TTL = 30
 DEFAULT_TIMEOUT = 10
+DAEMON_READY_TIMEOUT = 20  # Max. Wartezeit bis vcontrold den Prompt sendet (Sekunden)
+DAEMON_ADOPT_TIMEOUT = 2  # Ein übernommener Daemon muss sofort antworten (Sekunden)
+DAEMON_STATE_FILE = "daemon_state.json"  # PID, Binary, Argumente (im vcontrold_daemon Verzeichnis)
+
+# Daemon-Ausgabe: rotierendes Logfile (max. 1 MB + 2 Backups, schont die SD-Karte)
+DAEMON_LOG_MAX_BYTES = 1024 * 1024
+DAEMON_LOG_BACKUPS = 2
+
+# Zähler aus der Daemon-Ausgabe - Regex pro Zähler (ohne Groß/Klein)
+DAEMON_LOG_PATTERNS = {
+    "serial_timeouts": r"time ?out",
+    "naks": r"\bNAK\b|0x15|NOT_OK",
+    "reconnects": r"re-?connect|re-?open|re-?init|re-?sync",
+    "command_errors": r"^ERR|\berror\b|fehler",
+}
+
+# Diagnose-Entities für die Zähler
+DAEMON_LOG_SENSORS = {
+    "serial_timeouts": {"name": "vcontrold serielle Timeouts", "icon": "mdi:timer-alert-outline"},
+    "naks": {"name": "vcontrold NAKs", "icon": "mdi:alert-circle-outline"},
+    "reconnects": {"name": "vcontrold Reconnects", "icon": "mdi:connection"},
+    "command_errors": {"name": "vcontrold Befehlsfehler", "icon": "mdi:alert-octagon-outline"},
+}
+
+# Supervisor: Neustart nach Absturz mit exponentiellem Backoff (Sekunden)
+RESTART_BACKOFF_MIN = 1
+RESTART_BACKOFF_MAX = 300
+DAEMON_STABLE_UPTIME = 120  # Läuft der Daemon so lange, beginnt der Backoff von vorn
+CRASH_LOOP_WINDOW = 600
+CRASH_LOOP_THRESHOLD = 5  # Abstürze im Fenster, ab denen ein Crash-Loop vorliegt
+
+# Health Check: echter Read eines günstigen Datenpunkts über den Client
+HEALTH_CHECK_COMMAND = "getTempAussen"
+HEALTH_CHECK_INTERVAL = 60  # Sekunden
+HEALTH_CHECK_TIMEOUT = 5  # Sekunden
+HEALTH_WINDOW = 20  # Anzahl Checks, über die bewertet wird
+HEALTH_LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]  # Sekunden
+HEALTH_DEGRADED_P95 = 2.0  # Sekunden
+HEALTH_DEGRADED_ERROR_RATE = 0.1
+HEALTH_DOWN_ERROR_RATE = 0.5
 DEFAULT_HEATER_MODEL = HEATER_VITOTRONIC_300
 DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 3002
+DEFAULT_BAUDRATE = 4800  # Optolink 4800 8E2
+
+# Backends: direkt seriell (Optolink) oder über den vcontrold Daemon (TCP)
+BACKEND_SERIAL = "serial"
+BACKEND_VCONTROLD = "vcontrold"
+DEFAULT_BACKEND = BACKEND_VCONTROLD  # Einträge ohne Backend stammen aus der Daemon-Zeit
+
+# Setup-Varianten im Config Flow
+SETUP_SERIAL = "serial"
+SETUP_MANAGED_DAEMON = "managed_daemon"
+SETUP_EXTERNAL_DAEMON = "external_daemon"
+SETUP_OPTIONS = {
+    SETUP_SERIAL: "⚡ Direkt seriell (ohne Daemon - EMPFOHLEN)",
+    SETUP_MANAGED_DAEMON: "🔧 HA verwaltet vcontrold Daemon (All-in-One)",
+    SETUP_EXTERNAL_DAEMON: "🌐 Externe vcontrold Instanz",
+}
 
 # Log-Level Optionen
 LOG_LEVELS = {
@@ -44,7 +103,9 @@ LOG_LEVELS = {
 }
 
 # Protokoll-Optionen für Vitotronic 300
+FRAMING_AUTO = "auto"
 FRAMING_OPTIONS = {
+    FRAMING_AUTO: "🔍 Automatisch erkennen (empfohlen)",
     "kw": "📡 KW (Komfortsignal - Standard)",
     "raw": "📡 Raw (Binär)",
     "framing": "📡 Framing (Spezial)",
@@ -67,6 +128,14 @@ MODE_STANDBY = "standby"
 MODE_PARTY = "party"
 MODE_ECO = "eco"
 
+# Betriebsart -> Rohwert von getBetriebsart/setBetriebsart (ohne vito.xml Enum)
+MODE_VALUES = {
+    MODE_AUTO: 0x00,
+    MODE_STANDBY: 0x01,
+    MODE_PARTY: 0x02,
+    MODE_ECO: 0x03,
+}
+
 VALID_MODES = [MODE_AUTO, MODE_STANDBY, MODE_PARTY, MODE_ECO]
 
 MODE_NAMES = {
@@ -84,11 +153,59 @@ MAX_UPDATE_INTERVAL = 300
 MIN_PORT = 1024
 MAX_PORT = 65535
 
+# ======================= SCHREIBBEFEHLE =======================
+# Setter -> Getter: nach bestätigtem Schreiben wird der Cache des Getters
+# mit dem geschriebenen Wert aktualisiert (Write-Through)
+SETTER_GETTER_MAP = {
+    "setTempWWsoll": "getTempWWsoll",
+    "setBetriebsart": "getBetriebsart",
+}
+
+# ======================= CACHE =======================
+# TTL in Sekunden pro Befehl (sonst DEFAULT_CACHE_TTL)
+CACHE_TTLS = {
+    "getTempAussen": 300,  # Außentemperatur ändert sich langsam
+    "getTempKessel": 15,
+    "getTempVorlaufHK1": 10,  # Vorlauf reagiert schnell auf den Brenner
+    "getTempWWist": 30,
+    "getTempWWsoll": 600,  # Sollwert ändert sich nur per Service
+}
+
 # ======================= UPDATE-INTERVALL =======================
 SCAN_INTERVAL = 60
 
+# Polling-Stufen in Sekunden beim Standard-Intervall (DEFAULT_UPDATE_INTERVAL) -
+# der Scheduler ordnet jeden Datenpunkt einer Stufe zu und passt sie an, je
+# nachdem wie oft sich der Wert ändert. Stufen und Start-Intervalle werden mit
+# CONF_UPDATE_INTERVAL / DEFAULT_UPDATE_INTERVAL skaliert (nie unter SCHEDULER_TICK)
+POLL_TIERS = [10, 30, 60, 300, 900]
+SCHEDULER_TICK = 5
+
+# Start-Intervall pro Datenpunkt beim Standard-Intervall (sonst CONF_UPDATE_INTERVAL)
+POLL_INTERVALS = {
+    "getTempVorlaufHK1": 10,
+    "getTempKessel": 10,
+    "getTempWWist": 60,
+    "getTempAussen": 300,
+    "getTempWWsoll": 900,
+}
+
+# ======================= STATE-WRITES =======================
+# Entities schreiben ihren State nur, wenn sich der Wert mindestens um die
+# Deadband geändert hat oder der Heartbeat (MAX_REPORT_INTERVAL) abläuft
+DEFAULT_DEADBAND = 0.2
+MIN_REPORT_INTERVAL = 10
+MAX_REPORT_INTERVAL = 900
+
+# Deadband pro Sensor (sonst DEFAULT_DEADBAND)
+SENSOR_DEADBANDS = {
+    "getTempAussen": 0.5,
+    "getTempWWsoll": 0,  # Sollwert-Änderungen immer sofort melden
+}
+
 # ======================= VITOTRONIC 300 SPEZIFISCHE SENSOREN =======================
-# Diese Sensoren sind typisch für Vitotronic 300
+# Diese Sensoren sind typisch für Vitotronic 300 - angelegt werden nur die,
+# die in der Befehls-Registry (vito.xml bzw. eingebaute Datenpunkte) existieren
 VITOTRONIC_300_SENSORS = {
     "getTempKessel": {
         "name": "Kesseltemperatur",
@@ -103,24 +220,32 @@ VITOTRONIC_300_SENSORS = {
         "key": "aussentemperatur",
     },
     "getTempWWsoll": {
-        "name": "Warmwasser Solltemperatur",
+        "name": "Warmwasser-Solltemperatur",
         "unit": "°C",
         "icon": "mdi:water-thermometer",
-        "key": "warmwasser_soll",
+        "key": "warmwasser_solltemperatur",
     },
     "getTempWWist": {
-        "name": "Warmwasser Isttemperatur",
+        "name": "Warmwasser-Isttemperatur",
         "unit": "°C",
         "icon": "mdi:water-thermometer",
-        "key": "warmwasser_ist",
+        "key": "warmwasser_isttemperatur",
     },
     "getTempVorlaufHK1": {
-        "name": "Heizkreis 1 Vorlauftemperatur",
+        "name": "Heizkreis Vorlauftemperatur",
         "unit": "°C",
         "icon": "mdi:pipe-valve",
-        "key": "vorlauf_hk1",
+        "key": "heizkreis_vorlauftemperatur",
     },
 }
 
+# ======================= BEFEHLS-REGISTRY =======================
+# vito.xml / vcontrold.xml werden zuerst im Daemon-Verzeichnis, dann hier gesucht
+REGISTRY_SEARCH_DIRS = ["/etc/vcontrold"]
+REGISTRY_CACHE_FILE = "registry_cache.json"
+
 # ======================= ENTITY-PRÄFIXE =======================
 ENTITY_PREFIX = "sensor.vcontrold"
+
+# Gespeichertes Ergebnis der Protokoll-Erkennung (im vcontrold_daemon Verzeichnis)
+PROBE_CACHE_FILE = "probe_cache.json"
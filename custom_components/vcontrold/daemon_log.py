@@ -0,0 +1,158 @@
+"""Log-Verarbeitung für den vcontrold Daemon.
+
+stdout/stderr des Daemons gehen in eine Capture-Datei (``vcontrold.out``,
+O_APPEND) statt in eine Pipe - so überlebt der Daemon einen Neustart von
+Home Assistant und kann übernommen werden, ohne beim nächsten Schreiben an
+SIGPIPE zu sterben. Ein Leser verfolgt die Datei (wie ``tail -f``), übersetzt
+die Zeilen inkrementell in Zähler (serielle Timeouts, NAKs, Reconnects,
+Befehlsfehler) und gibt sie über eine Queue an ein größenbegrenztes,
+rotierendes Logfile - Dateizugriffe laufen im Executor bzw. in einem
+Hintergrund-Thread, damit der Event Loop nie auf die SD-Karte wartet.
+Die Capture-Datei wird geleert, sobald sie ``max_bytes`` erreicht.
+"""
+import asyncio
+import logging
+import os
+import re
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+from queue import SimpleQueue
+from typing import Any, Dict, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0  # Sekunden zwischen zwei Blicken in die Capture-Datei
+READ_CHUNK = 64 * 1024
+MAX_LINE = 64 * 1024  # längere Zeilen werden verworfen
+
+# Laufende Leser pro PID - nach einem Reload übernimmt der nächste Daemon
+# Manager Leser und Zähler; nach einem HA-Neustart startet er einen neuen
+_INGESTORS: Dict[int, "DaemonLogIngestor"] = {}
+
+
+class DaemonLogStats:
+    """Zähler für Log-Zeilen, die auf die konfigurierten Muster passen."""
+
+    def __init__(self, patterns: Dict[str, str]):
+        """Initialisiere Zähler - ein Muster (Regex, ohne Groß/Klein) pro Zähler."""
+        self._patterns = [
+            (name, re.compile(pattern, re.IGNORECASE)) for name, pattern in patterns.items()
+        ]
+        self.counters: Dict[str, int] = dict.fromkeys(patterns, 0)
+        self.lines = 0
+        self.last_line: Optional[str] = None
+
+    def feed(self, line: str) -> None:
+        """Zeile auswerten - eine Zeile kann mehrere Zähler erhöhen."""
+        self.lines += 1
+        self.last_line = line
+        for name, pattern in self._patterns:
+            if pattern.search(line):
+                self.counters[name] += 1
+
+    def get_stats(self) -> dict:
+        """Zähler und letzte Zeile."""
+        return {**self.counters, "lines": self.lines, "last_line": self.last_line}
+
+
+class DaemonLogIngestor:
+    """Verfolgt die Capture-Datei eines Daemon-Prozesses bis zu dessen Ende."""
+
+    def __init__(
+        self, path: Path, capture: Path, stats: DaemonLogStats, max_bytes: int, backups: int
+    ):
+        """Initialisiere Leser.
+
+        Args:
+            path: Logfile (rotiert nach ``max_bytes`` auf ``.1`` … ``.<backups>``)
+            capture: Datei, in die der Daemon schreibt
+            stats: Zähler, die fortgeschrieben werden
+        """
+        self.path = path
+        self.capture = capture
+        self.stats = stats
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, process: Any, offset: int = 0) -> None:
+        """Starte das Lesen im Hintergrund ab Byte ``offset`` der Capture-Datei.
+
+        Args:
+            process: Gestarteter oder übernommener Prozess (``pid``, ``returncode``)
+        """
+        _INGESTORS[process.pid] = self
+        self._task = asyncio.create_task(self._consume(process, offset))
+        self._task.add_done_callback(lambda _: _INGESTORS.pop(process.pid, None))
+
+    def _read_from(self, offset: int) -> Tuple[bytes, int]:
+        """Neue Bytes ab ``offset`` lesen (Executor) - leert die Datei am Limit.
+
+        Returns:
+            (gelesene Bytes, nächster Offset)
+        """
+        try:
+            with open(self.capture, "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                if size < offset:
+                    # Von außen geleert - von vorne lesen
+                    offset = 0
+                file.seek(offset)
+                data = file.read(READ_CHUNK)
+        except FileNotFoundError:
+            return b"", 0
+        offset += len(data)
+        if offset >= size and size >= self._max_bytes:
+            # Alles gelesen und im rotierenden Log - Capture-Datei leeren
+            # (der Daemon schreibt mit O_APPEND, also wieder ab Byte 0)
+            os.truncate(self.capture, 0)
+            offset = 0
+        return data, offset
+
+    async def _consume(self, process: Any, offset: int) -> None:
+        """Zeilen lesen, zählen und an den Schreib-Thread geben."""
+        loop = asyncio.get_running_loop()
+        handler = RotatingFileHandler(
+            self.path,
+            maxBytes=self._max_bytes,
+            backupCount=self._backups,
+            encoding="utf-8",
+            delay=True,
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        queue: SimpleQueue = SimpleQueue()
+        listener = QueueListener(queue, handler)
+        listener.start()
+        pending = b""
+        try:
+            while True:
+                # Erst prüfen, dann lesen - die letzte Ausgabe geht nicht verloren
+                alive = process.returncode is None
+                data, offset = await loop.run_in_executor(None, self._read_from, offset)
+                if not data:
+                    if not alive:
+                        break
+                    await asyncio.sleep(POLL_INTERVAL)
+                    continue
+                *lines, pending = (pending + data).split(b"\n")
+                if len(pending) > MAX_LINE:
+                    pending = b""
+                for raw in lines:
+                    self._ingest(raw, queue)
+        finally:
+            self._ingest(pending, queue)
+            await loop.run_in_executor(None, listener.stop)
+            handler.close()
+
+    def _ingest(self, raw: bytes, queue: SimpleQueue) -> None:
+        """Eine Zeile zählen und ins Logfile geben."""
+        line = raw.decode("utf-8", errors="replace").rstrip()
+        if not line:
+            return
+        self.stats.feed(line)
+        queue.put_nowait(logging.makeLogRecord({"msg": line}))
+
+
+def running_ingestor(pid: int) -> Optional[DaemonLogIngestor]:
+    """Leser eines noch laufenden Prozesses (None nach HA-Neustart)."""
+    return _INGESTORS.get(pid)
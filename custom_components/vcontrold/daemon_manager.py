@@ -3,13 +3,49 @@ import asyncio
 import logging
 import os
 import platform
+import random
 import subprocess
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Callable, Deque, List, Optional, Dict, Any, Tuple, Union
 import signal
 
+from .const import (
+    CRASH_LOOP_THRESHOLD,
+    CRASH_LOOP_WINDOW,
+    DAEMON_ADOPT_TIMEOUT,
+    DAEMON_LOG_BACKUPS,
+    DAEMON_LOG_MAX_BYTES,
+    DAEMON_LOG_PATTERNS,
+    DAEMON_READY_TIMEOUT,
+    DAEMON_STATE_FILE,
+    DAEMON_STABLE_UPTIME,
+    HEALTH_CHECK_COMMAND,
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_CHECK_TIMEOUT,
+    HEALTH_DEGRADED_ERROR_RATE,
+    HEALTH_DEGRADED_P95,
+    HEALTH_DOWN_ERROR_RATE,
+    HEALTH_LATENCY_BUCKETS,
+    HEALTH_WINDOW,
+    RESTART_BACKOFF_MAX,
+    RESTART_BACKOFF_MIN,
+)
+from .daemon_log import DaemonLogIngestor, DaemonLogStats, running_ingestor
+from .daemon_state import (
+    AdoptedProcess,
+    command_state,
+    pid_alive,
+    read_state,
+    remove_state,
+    write_state,
+)
+from .health import HEALTH_DOWN, HEALTH_HEALTHY, HealthMonitor
+from .readiness import wait_until_ready
+from .vcontrold_manager import VcontroledManager
+
 _LOGGER = logging.getLogger(__name__)
 
 # Import Binary Manager (optional - nur für Download)
@@ -35,7 +71,9 @@ class VcontroledDaemonManager:
         self.config_dir = Path(config_dir)
         self.daemon_dir = self.config_dir / "vcontrold_daemon"
         self.daemon_log = self.daemon_dir / "vcontrold.log"
+        self.daemon_output = self.daemon_dir / "vcontrold.out"
         self.daemon_config = self.daemon_dir / "vcontrold.conf"
+        self.daemon_state = self.daemon_dir / DAEMON_STATE_FILE
         
         # Konfiguration
         self.device = device
@@ -48,11 +86,36 @@ class VcontroledDaemonManager:
         self.is_linux = platform.system() == "Linux"
         
         self.daemon_binary = self._get_daemon_binary_path()
-        self._process: Optional[subprocess.Popen] = None
+        self._process: Optional[Union[asyncio.subprocess.Process, AdoptedProcess]] = None
         self._running = False
         self._start_time: Optional[datetime] = None
         self._health_check_count = 0
         self._last_health_check: Optional[datetime] = None
+        
+        # Supervisor (Neustart nach Absturz)
+        self._launch_args: Optional[tuple] = None
+        self._started_at = 0.0
+        self._supervisor: Optional[asyncio.Task] = None
+        self._crashes: Deque[float] = deque()
+        self._restarts = 0
+        self._next_restart: Optional[float] = None
+        self._available = False
+        self._listeners: List[Callable[[bool], None]] = []
+        
+        # Health Checks (echte Reads, Latenz-Histogramm)
+        self._health = HealthMonitor(
+            bounds=HEALTH_LATENCY_BUCKETS,
+            window=HEALTH_WINDOW,
+            degraded_p95=HEALTH_DEGRADED_P95,
+            degraded_error_rate=HEALTH_DEGRADED_ERROR_RATE,
+            down_error_rate=HEALTH_DOWN_ERROR_RATE,
+        )
+        self._health_client: Optional[VcontroledManager] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._health_state: Optional[str] = None
+        
+        # Zähler aus der Daemon-Ausgabe (Timeouts, NAKs, Reconnects, Fehler)
+        self.log_stats = DaemonLogStats(DAEMON_LOG_PATTERNS)
 
     def _get_daemon_binary_path(self) -> Path:
         """Bestimme Pfad zum vcontrold Binary - HACS-kompatibel.
@@ -172,62 +235,28 @@ class VcontroledDaemonManager:
         
         if not self._ensure_daemon_dir():
             return False
+        
+        # Manueller Start ersetzt einen ausstehenden Neustart des Supervisors
+        await self._stop_supervisor()
+        await self._terminate_process()
 
         # Verifiziere dass Binary vorhanden ist (ALL-IN-ONE)
         if not await self._verify_binary():
             _LOGGER.error("vcontrold Binary nicht verfügbar - Installation erforderlich")
             return False
 
+        self._launch_args = (device, host, port, log_level)
         try:
-            # Logfile öffnen
-            log_file = open(self.daemon_log, "a", encoding="utf-8")
-            
-            # Command zusammenstellen - direkter Befehl oder via Konfigurationsdatei
-            if self.is_linux or self.is_macos:
-                # Unix: direkter vcontrold Befehl
-                cmd = [
-                    str(self.daemon_binary),
-                    "-l", str(host),
-                    "-p", str(port),
-                    "-d", device,
-                    "--loglevel", log_level,
-                ]
-            else:
-                # Windows: Binary mit Parametern
-                cmd = [
-                    str(self.daemon_binary),
-                    "-l", str(host),
-                    "-p", str(port),
-                    "-d", device,
-                    "--loglevel", log_level,
-                ]
-            
-            _LOGGER.info(f"🚀 Starte vcontrold Daemon auf {host}:{port} (Gerät: {device})")
-            _LOGGER.debug(f"Kommando: {' '.join(cmd)}")
-            
-            # Prozess starten
-            self._process = subprocess.Popen(
-                cmd,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                stdin=subprocess.DEVNULL,
-                cwd=str(self.daemon_dir) if self.daemon_dir.exists() else None,
-                preexec_fn=os.setsid if not self.is_windows else None,  # Process group (Unix)
-            )
-            
-            # Kurz warten um zu prüfen ob es erfolgreich gestartet ist
-            await asyncio.sleep(2)
-            
-            if self._process.poll() is not None:
-                # Prozess ist bereits beendet (Fehler)
-                error_msg = f"vcontrold Daemon konnte nicht gestartet werden (Exit Code: {self._process.returncode})"
-                _LOGGER.error(error_msg)
-                log_file.close()
+            if await self._adopt(device, host, port, log_level):
+                _LOGGER.info(f"♻️ Laufender vcontrold Daemon übernommen (PID: {self._process.pid})")
+            elif not await self._launch(device, host, port, log_level):
                 return False
+            else:
+                _LOGGER.info(f"✅ vcontrold Daemon erfolgreich gestartet (PID: {self._process.pid})")
             
             self._running = True
-            self._start_time = datetime.now()
-            _LOGGER.info(f"✅ vcontrold Daemon erfolgreich gestartet (PID: {self._process.pid})")
+            self._set_available(True)
+            self._start_supervisor()
             return True
             
         except FileNotFoundError as e:
@@ -239,30 +268,295 @@ class VcontroledDaemonManager:
             self._running = False
             return False
 
+    def _build_command(self, device: str, host: str, port: int, log_level: str) -> List[str]:
+        """Command zusammenstellen - direkter Befehl oder via Konfigurationsdatei."""
+        if self.is_linux or self.is_macos:
+            # Unix: direkter vcontrold Befehl
+            return [
+                str(self.daemon_binary),
+                "-l", str(host),
+                "-p", str(port),
+                "-d", device,
+                "--loglevel", log_level,
+            ]
+        # Windows: Binary mit Parametern
+        return [
+            str(self.daemon_binary),
+            "-l", str(host),
+            "-p", str(port),
+            "-d", device,
+            "--loglevel", log_level,
+        ]
+
+    async def _launch(self, device: str, host: str, port: int, log_level: str) -> bool:
+        """Starte den Prozess und warte bis er auf dem Port antwortet."""
+        cmd = self._build_command(device, host, port, log_level)
+        
+        _LOGGER.info(f"🚀 Starte vcontrold Daemon auf {host}:{port} (Gerät: {device})")
+        _LOGGER.debug(f"Kommando: {' '.join(cmd)}")
+        
+        # Prozess starten - Ausgabe in die Capture-Datei (keine Pipe: die
+        # stirbt mit Home Assistant und der übernommene Daemon an SIGPIPE)
+        output = await self._in_executor(self._open_output)
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=output,
+                stderr=asyncio.subprocess.STDOUT,
+                stdin=asyncio.subprocess.DEVNULL,
+                cwd=str(self.daemon_dir) if self.daemon_dir.exists() else None,
+                start_new_session=not self.is_windows,  # Process group (Unix)
+            )
+        finally:
+            os.close(output)
+        self._ingest_output(self._process)
+        
+        # Warten bis der Daemon tatsächlich antwortet - nicht länger
+        if not await wait_until_ready(host, port, DAEMON_READY_TIMEOUT, self._process):
+            error_msg = f"vcontrold Daemon konnte nicht gestartet werden (Exit Code: {self._process.returncode})"
+            _LOGGER.error(error_msg)
+            await self._terminate_process()
+            return False
+        
+        self._start_time = datetime.now()
+        self._started_at = time.monotonic()
+        await self._in_executor(
+            write_state,
+            self.daemon_state,
+            command_state(self._process.pid, cmd, device, host, port, self._start_time.isoformat()),
+        )
+        return True
+
+    async def _in_executor(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Blockierende Datei-Zugriffe im Executor statt im Event Loop ausführen."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _open_output(self) -> int:
+        """Capture-Datei leeren und für den Daemon öffnen (O_APPEND, Executor)."""
+        self.daemon_output.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(
+            self.daemon_output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644
+        )
+
+    def _output_size(self) -> int:
+        """Aktuelle Größe der Capture-Datei (Executor)."""
+        try:
+            return self.daemon_output.stat().st_size
+        except OSError:
+            return 0
+
+    async def _adopt(self, device: str, host: str, port: int, log_level: str) -> bool:
+        """Übernimm einen laufenden Daemon mit identischen Argumenten.
+        
+        Ein Daemon mit anderen Argumenten (Gerät, Port, Log Level, Binary)
+        oder einer, der nicht antwortet, wird beendet.
+        
+        Returns:
+            True wenn der laufende Prozess übernommen wurde
+        """
+        found = await self._in_executor(self._read_state_process)
+        if found is None:
+            return False
+        
+        process, state = found
+        cmd = self._build_command(device, host, port, log_level)
+        if state.get("args") != cmd:
+            _LOGGER.info(f"🔄 vcontrold Konfiguration geändert - starte neu (PID: {process.pid})")
+        elif await wait_until_ready(host, port, DAEMON_ADOPT_TIMEOUT, process):
+            self._process = process
+            # Nach einem Reload liest der alte Leser weiter - Zähler übernehmen;
+            # nach einem HA-Neustart ab dem aktuellen Ende der Capture-Datei
+            ingestor = running_ingestor(process.pid)
+            if ingestor is not None:
+                self.log_stats = ingestor.stats
+            else:
+                self._ingest_output(process, await self._in_executor(self._output_size))
+            try:
+                self._start_time = datetime.fromisoformat(state["start_time"])
+            except (KeyError, TypeError, ValueError):
+                self._start_time = datetime.now()
+            self._started_at = time.monotonic() - (datetime.now() - self._start_time).total_seconds()
+            return True
+        else:
+            _LOGGER.warning(f"⚠️ Laufender vcontrold antwortet nicht - starte neu (PID: {process.pid})")
+        
+        self._process = process
+        await self._terminate_process()
+        await self._in_executor(remove_state, self.daemon_state)
+        return False
+
+    def _ingest_output(
+        self, process: Union[asyncio.subprocess.Process, AdoptedProcess], offset: int = 0
+    ) -> None:
+        """Starte den Leser für die Capture-Datei des Daemons."""
+        DaemonLogIngestor(
+            self.daemon_log,
+            self.daemon_output,
+            self.log_stats,
+            DAEMON_LOG_MAX_BYTES,
+            DAEMON_LOG_BACKUPS,
+        ).start(process, offset)
+
+    def _read_state_process(self) -> Optional[Tuple[AdoptedProcess, Dict[str, Any]]]:
+        """Laufender Daemon und Zustand laut Zustandsdatei (None wenn keiner).
+        
+        Blockierend (Datei-I/O, /proc) - über ``_in_executor`` aufrufen.
+        """
+        if self.is_windows:
+            # os.kill(pid, 0) würde unter Windows den Prozess beenden
+            return None
+        
+        state = read_state(self.daemon_state)
+        if state is None:
+            return None
+        
+        pid = state.get("pid")
+        binary = state.get("binary")
+        if not isinstance(pid, int) or not pid_alive(pid, binary):
+            _LOGGER.debug("Daemon-Zustandsdatei veraltet - Prozess läuft nicht mehr")
+            remove_state(self.daemon_state)
+            return None
+        return AdoptedProcess(pid, binary), state
+
+    async def detach(self) -> None:
+        """Beende nur die Überwachung - der Daemon läuft für das nächste Setup weiter."""
+        await self._stop_supervisor()
+        if self._process is not None:
+            _LOGGER.info(f"vcontrold Daemon läuft weiter (PID: {self._process.pid})")
+        self._process = None
+        self._running = False
+
+    # ======================= SUPERVISOR =======================
+
+    def add_availability_listener(self, listener: Callable[[bool], None]) -> None:
+        """Melde Start/Absturz des Daemons (z.B. um das Polling zu pausieren)."""
+        self._listeners.append(listener)
+
+    def remove_availability_listener(self, listener: Callable[[bool], None]) -> None:
+        """Listener wieder abmelden (z.B. wenn das Setup abgebrochen wird)."""
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _set_available(self, available: bool) -> None:
+        """Benachrichtige Listener bei Zustandswechsel."""
+        if available == self._available:
+            return
+        self._available = available
+        for listener in self._listeners:
+            try:
+                listener(available)
+            except Exception as e:
+                _LOGGER.error(f"Fehler im Availability-Listener: {e}")
+
+    def _start_supervisor(self) -> None:
+        """Starte die Überwachung und die regelmäßigen Health Checks (falls nicht schon aktiv)."""
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(self._supervise())
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _stop_supervisor(self) -> None:
+        """Beende die Überwachung - gewollte Stopps sollen keinen Neustart auslösen."""
+        tasks = [self._supervisor, self._health_task]
+        self._supervisor = self._health_task = None
+        for task in tasks:
+            if task is None or task is asyncio.current_task():
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._health_client is not None:
+            await self._health_client.cleanup()
+
+    def _crash_loop(self) -> bool:
+        """Zu viele Abstürze im Zeitfenster?"""
+        now = time.monotonic()
+        while self._crashes and now - self._crashes[0] > CRASH_LOOP_WINDOW:
+            self._crashes.popleft()
+        return len(self._crashes) >= CRASH_LOOP_THRESHOLD
+
+    def _restart_delay(self, failures: int) -> float:
+        """Exponentieller Backoff mit Jitter; im Crash-Loop immer das Maximum."""
+        if self._crash_loop():
+            delay = RESTART_BACKOFF_MAX
+        else:
+            delay = min(RESTART_BACKOFF_MIN * 2 ** (failures - 1), RESTART_BACKOFF_MAX)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _supervise(self) -> None:
+        """Warte auf das Prozessende und starte den Daemon neu.
+
+        Läuft der Daemon kürzer als ``DAEMON_STABLE_UPTIME``, wächst der
+        Backoff weiter; ab ``CRASH_LOOP_THRESHOLD`` Abstürzen innerhalb von
+        ``CRASH_LOOP_WINDOW`` gilt er als Crash-Loop und wird nur noch im
+        maximalen Abstand versucht. Solange er nicht läuft, sind die
+        Listener auf "nicht verfügbar" gesetzt.
+        """
+        failures = 0
+        while True:
+            returncode = await self._process.wait()
+            uptime = time.monotonic() - self._started_at
+            if uptime >= DAEMON_STABLE_UPTIME:
+                failures = 0
+            
+            _LOGGER.warning(f"⚠️ vcontrold Daemon beendet (Exit Code: {returncode}, Laufzeit: {uptime:.0f}s)")
+            self._running = False
+            self._process = None
+            self._set_available(False)
+            
+            while True:
+                failures += 1
+                was_crash_loop = self._crash_loop()
+                self._crashes.append(time.monotonic())
+                if self._crash_loop() and not was_crash_loop:
+                    _LOGGER.error(
+                        f"❌ vcontrold Crash-Loop: {len(self._crashes)} Abstürze in {CRASH_LOOP_WINDOW}s - "
+                        f"Neustart nur noch alle {RESTART_BACKOFF_MAX}s, bitte {self.daemon_log} prüfen"
+                    )
+                
+                delay = self._restart_delay(failures)
+                self._next_restart = time.monotonic() + delay
+                _LOGGER.info(f"🔄 Neustart von vcontrold in {delay:.1f}s (Versuch {failures})")
+                await asyncio.sleep(delay)
+                self._next_restart = None
+                
+                self._restarts += 1
+                device, host, port, log_level = self._launch_args
+                try:
+                    if await self._launch(device, host, port, log_level):
+                        break
+                except Exception as e:
+                    _LOGGER.error(f"❌ Fehler beim Neustart des vcontrold Daemons: {e}")
+            
+            self._running = True
+            _LOGGER.info(f"✅ vcontrold Daemon neu gestartet (PID: {self._process.pid})")
+            self._set_available(True)
+
     async def stop_daemon(self) -> bool:
         """Stoppe vcontrold Daemon.
         
         Returns:
             True wenn erfolgreich gestoppt
         """
-        if not self._running or self._process is None:
+        await self._stop_supervisor()
+        self._set_available(False)
+        
+        if self._process is None:
+            # Abgekoppelter Daemon (z.B. nach Reload) - laut Zustandsdatei
+            found = await self._in_executor(self._read_state_process)
+            self._process = found[0] if found is not None else None
+        if self._process is None:
+            self._running = False
             return True
 
         try:
             _LOGGER.info(f"Stoppe vcontrold Daemon (PID: {self._process.pid})")
-            
-            # SIGTERM senden
-            self._process.terminate()
-            
-            # Warten auf Beendigung (max 5 Sekunden)
-            try:
-                self._process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                # Erzwinge Beendigung
-                _LOGGER.warning("vcontrold Daemon antwortet nicht, erzwinge Beendigung")
-                self._process.kill()
-                self._process.wait()
-            
+            await self._terminate_process()
+            await self._in_executor(remove_state, self.daemon_state)
             self._running = False
             self._process = None
             _LOGGER.info("vcontrold Daemon beendet")
@@ -273,17 +567,37 @@ class VcontroledDaemonManager:
             self._running = False
             return False
 
+    async def _terminate_process(self) -> None:
+        """Beende den Prozess: SIGTERM, nach 5 Sekunden SIGKILL."""
+        process = self._process
+        if process is None or process.returncode is not None:
+            self._process = None
+            return
+        
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            # Erzwinge Beendigung
+            _LOGGER.warning("vcontrold Daemon antwortet nicht, erzwinge Beendigung")
+            process.kill()
+            await process.wait()
+        self._process = None
+
+    @property
+    def spawned(self) -> bool:
+        """Wurde der laufende Prozess von diesem Manager gestartet (nicht übernommen)?"""
+        return self._process is not None and not isinstance(self._process, AdoptedProcess)
+
     def is_running(self) -> bool:
         """Prüfe ob Daemon läuft."""
         if self._process is None:
             return False
         
-        return self._process.poll() is None
+        return self._process.returncode is None
 
     def get_daemon_status(self) -> dict:
         """Hole detaillierten Daemon Status."""
-        import socket
-        
         uptime = None
         if self._start_time:
             uptime = (datetime.now() - self._start_time).total_seconds()
@@ -303,30 +617,69 @@ class VcontroledDaemonManager:
             "start_time": self._start_time.isoformat() if self._start_time else None,
             "health_checks": self._health_check_count,
             "last_health_check": self._last_health_check.isoformat() if self._last_health_check else None,
+            "supervised": self._supervisor is not None and not self._supervisor.done(),
+            "restarts": self._restarts,
+            "crash_loop": self._crash_loop(),
+            "next_restart_in": (
+                max(self._next_restart - time.monotonic(), 0) if self._next_restart else None
+            ),
+            "log": self.log_stats.get_stats(),
+            "health": {
+                **self._health.get_stats(),
+                # Ohne laufenden Prozess ist der Daemon "down", egal was das Fenster sagt
+                "state": self._health.state if self.is_running() else HEALTH_DOWN,
+            },
         }
     
     async def health_check(self) -> bool:
-        """Prüfe Daemon Gesundheitsstatus via TCP."""
-        import socket
+        """Prüfe Daemon Gesundheitsstatus mit einem echten Datenpunkt-Read.
+        
+        Ein offener Port reicht nicht - vcontrold beantwortet bei verlorener
+        serieller Verbindung jeden Befehl mit ``ERR``. Gemessen wird die
+        Round Trip Zeit des Reads (``HEALTH_CHECK_COMMAND``).
         
+        Returns:
+            True solange der Zustand nicht "down" ist
+        """
+        if self._health_client is None:
+            self._health_client = VcontroledManager(
+                host=self.host, port=self.port, timeout=HEALTH_CHECK_TIMEOUT
+            )
+        
+        start = time.monotonic()
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            result = sock.connect_ex((self.host, self.port))
-            sock.close()
-            
-            self._health_check_count += 1
-            self._last_health_check = datetime.now()
-            
-            if result == 0:
-                _LOGGER.debug(f"✅ vcontrold Health Check OK ({self.host}:{self.port})")
-                return True
-            else:
-                _LOGGER.warning(f"⚠️ vcontrold Health Check FAILED ({self.host}:{self.port})")
-                return False
+            values = await self._health_client.read_many([HEALTH_CHECK_COMMAND], use_cache=False)
+            ok = values.get(HEALTH_CHECK_COMMAND) is not None
         except Exception as e:
-            _LOGGER.error(f"❌ vcontrold Health Check Error: {e}")
-            return False
+            _LOGGER.debug(f"vcontrold Health Check Read fehlgeschlagen: {e}")
+            ok = False
+        latency = time.monotonic() - start
+        
+        self._health.record(ok, latency if ok else None)
+        self._health_check_count += 1
+        self._last_health_check = datetime.now()
+        
+        state = self._health.state
+        if state == self._health_state:
+            _LOGGER.debug(f"vcontrold Health Check: {state} ({latency * 1000:.0f} ms)")
+        elif state == HEALTH_HEALTHY:
+            _LOGGER.info(f"✅ vcontrold Health Check OK ({self.host}:{self.port})")
+        else:
+            p95 = self._health.p95
+            detail = f"p95 {p95 * 1000:g} ms" if p95 is not None else "keine Antwort"
+            _LOGGER.warning(
+                f"⚠️ vcontrold Health Check {state.upper()} ({self.host}:{self.port}) - "
+                f"Fehlerrate {self._health.error_rate:.0%}, {detail}"
+            )
+        self._health_state = state
+        return state != HEALTH_DOWN
+
+    async def _health_loop(self) -> None:
+        """Prüfe den laufenden Daemon regelmäßig."""
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            if self._available:
+                await self.health_check()
     
     async def ensure_running(self, device: Optional[str] = None) -> bool:
         """Stelle sicher dass Daemon läuft - starte falls nötig."""
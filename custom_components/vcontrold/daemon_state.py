@@ -0,0 +1,135 @@
+"""PID/Zustandsdatei des vcontrold Daemons.
+
+Der Daemon Manager schreibt nach jedem Start Binary, Argumente, Listen-Adresse
+und PID in ``daemon_state.json``. Beim nächsten Setup (Reload der Integration
+oder Neustart von Home Assistant) wird ein noch laufender Prozess mit
+denselben Argumenten übernommen statt neu gestartet - die serielle
+Verbindung zur Heizung bleibt dabei bestehen.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.5  # Sekunden - fremde Prozesse lassen sich nicht per waitpid beobachten
+
+
+def read_state(path: Path) -> Optional[Dict[str, Any]]:
+    """Lese Zustandsdatei (None wenn nicht vorhanden oder unlesbar)."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            state = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        _LOGGER.warning(f"⚠️ Daemon-Zustandsdatei unlesbar ({path}): {e}")
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def write_state(path: Path, state: Dict[str, Any]) -> None:
+    """Schreibe Zustandsdatei atomar."""
+    tmp = path.with_suffix(".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        _LOGGER.warning(f"⚠️ Konnte Daemon-Zustandsdatei nicht schreiben ({path}): {e}")
+
+
+def remove_state(path: Path) -> None:
+    """Lösche Zustandsdatei (falls vorhanden)."""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        _LOGGER.warning(f"⚠️ Konnte Daemon-Zustandsdatei nicht löschen ({path}): {e}")
+
+
+def pid_alive(pid: int, binary: Optional[str] = None) -> bool:
+    """Läuft der Prozess noch - und ist es (laut /proc) noch unser Binary?
+
+    Prüft unter Linux zusätzlich Zombie-Status und Kommandozeile, damit eine
+    wiederverwendete PID nicht für den alten Daemon gehalten wird.
+    """
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        # ProcessLookupError: beendet; PermissionError: gehört nicht uns
+        return False
+
+    proc = Path(f"/proc/{pid}")
+    if not proc.exists():
+        return True
+    try:
+        stat = (proc / "stat").read_text()
+        if stat[stat.rindex(")") + 2] == "Z":
+            return False
+        if binary is not None:
+            cmdline = (proc / "cmdline").read_bytes().split(b"\0")
+            return os.fsencode(binary) in cmdline
+    except (OSError, IndexError, ValueError):
+        return False
+    return True
+
+
+class AdoptedProcess:
+    """Übernommener Daemon-Prozess (kein eigenes Kind).
+
+    Bietet die von ``VcontroledDaemonManager`` genutzte Schnittstelle von
+    ``asyncio.subprocess.Process`` (``pid``, ``returncode``, ``wait``,
+    ``terminate``, ``kill``); das Prozessende wird per Polling erkannt,
+    der Exit Code ist dann unbekannt (-1).
+    """
+
+    def __init__(self, pid: int, binary: Optional[str] = None):
+        """Initialisiere mit PID und erwartetem Binary."""
+        self.pid = pid
+        self._binary = binary
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """None solange der Prozess läuft."""
+        return None if pid_alive(self.pid, self._binary) else -1
+
+    async def wait(self) -> int:
+        """Warte auf das Prozessende."""
+        while self.returncode is None:
+            await asyncio.sleep(POLL_INTERVAL)
+        return -1
+
+    def terminate(self) -> None:
+        """SIGTERM senden."""
+        self._signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        """SIGKILL senden."""
+        self._signal(getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    def _signal(self, signum: int) -> None:
+        try:
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+def command_state(
+    pid: int, args: List[str], device: str, host: str, port: int, start_time: str
+) -> Dict[str, Any]:
+    """Inhalt der Zustandsdatei."""
+    return {
+        "pid": pid,
+        "binary": args[0],
+        "args": args,
+        "device": device,
+        "host": host,
+        "port": port,
+        "start_time": start_time,
+    }
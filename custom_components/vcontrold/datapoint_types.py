@@ -0,0 +1,309 @@
+"""Typisierte Codecs für Vitotronic Datenpunkte.
+
+Jeder Datenpunkt-Typ aus vcontrolds ``vcontrold.xml`` (``<type>`` einer
+Einheit) hat einen Codec mit vorkompiliertem ``struct`` Layout:
+
+- ``char``/``uchar``/``short``/``ushort``/``int``/``uint`` - Zahlen mit
+  Skalierung (z.B. Temperaturen /10, Statusbytes, Brennerstunden und -starts)
+- ``systime`` - 8 Byte BCD Zeitstempel (Jahr, Monat, Tag, Wochentag, Uhrzeit)
+- ``cycletime`` - 56 Byte Schaltzeiten (7 Tage x 4 Ein/Aus-Paare)
+- ``errstate`` - Fehlereinträge (Code + Zeitstempel, 9 Byte); ein Vielfaches
+  davon ist die Fehlerhistorie (Ringpuffer, neuester Eintrag zuerst)
+
+``BlockLayout`` dekodiert alle Datenpunkte eines Block-Reads in einem
+Durchgang: zahlenwertige Datenpunkte über ein einziges ``unpack_from``.
+"""
+import logging
+import struct
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Zahlentypen (Little Endian wie im Speicher der Vitotronic)
+VALUE_STRUCTS = {
+    "char": struct.Struct("<b"),
+    "uchar": struct.Struct("<B"),
+    "short": struct.Struct("<h"),
+    "ushort": struct.Struct("<H"),
+    "int": struct.Struct("<i"),
+    "uint": struct.Struct("<I"),
+}
+
+# Typ unbekannt: Layout nach Länge
+_DEFAULT_STRUCTS = {1: VALUE_STRUCTS["uchar"], 2: VALUE_STRUCTS["short"], 4: VALUE_STRUCTS["int"]}
+
+# Zeitstempel: Jahr (2 Byte), Monat, Tag, Wochentag, Stunde, Minute, Sekunde - alles BCD
+_TIMESTAMP = struct.Struct("8B")
+TIMESTAMP_LENGTH = _TIMESTAMP.size
+
+# Schaltzeiten: 7 Tage x 4 Paare (Ein, Aus), ein Byte je Zeit (Stunde << 3 | Minute / 10)
+SCHEDULE_DAYS = ("mo", "di", "mi", "do", "fr", "sa", "so")
+SCHEDULE_SLOTS = 4
+_SCHEDULE = struct.Struct(f"{len(SCHEDULE_DAYS) * SCHEDULE_SLOTS * 2}B")
+SCHEDULE_LENGTH = _SCHEDULE.size
+SCHEDULE_UNUSED = 0xFF
+
+# Fehlereintrag: Fehlercode + Zeitstempel
+_ERROR_ENTRY = struct.Struct(f"B{TIMESTAMP_LENGTH}s")
+ERROR_ENTRY_LENGTH = _ERROR_ENTRY.size
+
+
+def _from_bcd(byte: int) -> int:
+    return (byte >> 4) * 10 + (byte & 0x0F)
+
+
+def _to_bcd(value: int) -> int:
+    return (value // 10) << 4 | value % 10
+
+
+class Codec(ABC):
+    """Basis: dekodiert/kodiert die Rohdaten eines Datenpunkt-Typs."""
+
+    __slots__ = ("size",)
+
+    # Liefert der Codec Zahlenwerte (für State Class / Deadband)?
+    numeric = False
+
+    # Passt der Wert in einen Sensor-Zustand (keine Listen/Tabellen)?
+    scalar = True
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def decode(self, data, offset: int = 0) -> Optional[Any]:
+        """Dekodiere ab ``offset`` (None bei zu kurzen Daten)."""
+        if len(data) < offset + self.size:
+            return None
+        return self._decode(data, offset)
+
+    @abstractmethod
+    def _decode(self, data, offset: int) -> Optional[Any]:
+        """Dekodiere ab ``offset`` (Länge ist bereits geprüft)."""
+
+    def encode(self, value: Any) -> bytes:
+        """Kodiere einen Wert (ValueError bei ungeeigneten Werten)."""
+        raise ValueError(f"{type(self).__name__} kann nicht geschrieben werden")
+
+
+class NumberCodec(Codec):
+    """Ganzzahl mit Skalierung (z.B. ``short`` /10 für Temperaturen)."""
+
+    __slots__ = ("layout", "scale")
+
+    numeric = True
+
+    def __init__(self, layout: struct.Struct, scale: float = 1.0):
+        super().__init__(layout.size)
+        self.layout = layout
+        self.scale = scale
+
+    @property
+    def code(self) -> str:
+        """Formatzeichen des Layouts (für zusammengesetzte Layouts)."""
+        return self.layout.format[-1]
+
+    def convert(self, raw: int) -> float:
+        """Rohwert -> skalierter Wert."""
+        return raw / self.scale if self.scale != 1 else raw
+
+    def _decode(self, data, offset: int) -> float:
+        return self.convert(self.layout.unpack_from(data, offset)[0])
+
+    def encode(self, value: float) -> bytes:
+        try:
+            return self.layout.pack(int(round(float(value) * self.scale)))
+        except struct.error as e:
+            raise ValueError(f"Wert {value} passt nicht in {self.layout.format}: {e}") from e
+
+
+class TimestampCodec(Codec):
+    """8 Byte BCD Zeitstempel (``systime``)."""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(TIMESTAMP_LENGTH)
+
+    def _decode(self, data, offset: int) -> Optional[datetime]:
+        year_hi, year_lo, month, day, _, hour, minute, second = (
+            _from_bcd(byte) for byte in _TIMESTAMP.unpack_from(data, offset)
+        )
+        try:
+            return datetime(year_hi * 100 + year_lo, month, day, hour, minute, second)
+        except ValueError:
+            return None  # Leerer Eintrag (z.B. Fehlerhistorie ohne Fehler)
+
+    def encode(self, value: datetime) -> bytes:
+        return _TIMESTAMP.pack(
+            *(_to_bcd(part) for part in (
+                value.year // 100, value.year % 100, value.month, value.day,
+                value.isoweekday(), value.hour, value.minute, value.second,
+            ))
+        )
+
+
+class ScheduleCodec(Codec):
+    """Schaltzeiten einer Woche (``cycletime``): Tag -> [(Ein, Aus), ...]."""
+
+    __slots__ = ()
+
+    scalar = False
+
+    def __init__(self):
+        super().__init__(SCHEDULE_LENGTH)
+
+    @staticmethod
+    def _time(byte: int) -> Optional[str]:
+        if byte == SCHEDULE_UNUSED:
+            return None
+        return f"{byte >> 3:02d}:{(byte & 0x07) * 10:02d}"
+
+    def _decode(self, data, offset: int) -> Dict[str, List[Tuple[str, str]]]:
+        times = [self._time(byte) for byte in _SCHEDULE.unpack_from(data, offset)]
+        schedule = {}
+        for index, day in enumerate(SCHEDULE_DAYS):
+            day_times = times[index * SCHEDULE_SLOTS * 2:(index + 1) * SCHEDULE_SLOTS * 2]
+            schedule[day] = [
+                (on, off)
+                for on, off in zip(day_times[::2], day_times[1::2])
+                if on is not None and off is not None
+            ]
+        return schedule
+
+    def encode(self, value: Dict[str, List[Tuple[str, str]]]) -> bytes:
+        raw = [SCHEDULE_UNUSED] * SCHEDULE_LENGTH
+        for index, day in enumerate(SCHEDULE_DAYS):
+            pairs = value.get(day, [])
+            if len(pairs) > SCHEDULE_SLOTS:
+                raise ValueError(f"Maximal {SCHEDULE_SLOTS} Schaltzeiten pro Tag ({day})")
+            for slot, times in enumerate(pairs):
+                for position, text in enumerate(times):
+                    hour, minute = (int(part) for part in text.split(":"))
+                    if not 0 <= hour <= 24 or minute % 10 or not 0 <= minute < 60:
+                        raise ValueError(f"Ungültige Schaltzeit {text} (10-Minuten-Raster)")
+                    raw[(index * SCHEDULE_SLOTS + slot) * 2 + position] = hour << 3 | minute // 10
+        return _SCHEDULE.pack(*raw)
+
+
+class ErrorHistoryCodec(Codec):
+    """Fehlereinträge (``errstate``): [{"code", "time"}, ...], leere ausgelassen."""
+
+    __slots__ = ("entries",)
+
+    scalar = False
+
+    def __init__(self, entries: int = 1):
+        super().__init__(entries * ERROR_ENTRY_LENGTH)
+        self.entries = entries
+
+    def _decode(self, data, offset: int) -> List[Dict[str, Any]]:
+        history = []
+        for _ in range(self.entries):
+            code, stamp = _ERROR_ENTRY.unpack_from(data, offset)
+            offset += ERROR_ENTRY_LENGTH
+            if code:
+                history.append({"code": code, "time": _TIMESTAMP_CODEC.decode(stamp)})
+        return history
+
+
+class EnumCodec(Codec):
+    """Aufzählung (z.B. Betriebsart): Rohbytes <-> Text, sonst Zahlenwert."""
+
+    __slots__ = ("enum", "reverse", "inner")
+
+    def __init__(self, enum: Dict[str, str], inner: Optional[Codec], size: int):
+        super().__init__(size)
+        self.enum = enum
+        self.reverse = {text: raw for raw, text in enum.items()}
+        self.inner = inner
+
+    def _decode(self, data, offset: int) -> Optional[Any]:
+        text = self.enum.get(memoryview(data)[offset:offset + self.size].hex())
+        if text is not None or self.inner is None:
+            return text
+        return self.inner.decode(data, offset)
+
+    def encode(self, value: Any) -> bytes:
+        if isinstance(value, str) and value in self.reverse:
+            return bytes.fromhex(self.reverse[value])
+        if self.inner is None:
+            raise ValueError(f"Unbekannter Wert {value}")
+        return self.inner.encode(value)
+
+
+_TIMESTAMP_CODEC = TimestampCodec()
+
+
+@lru_cache(maxsize=None)
+def codec_for(type_: Optional[str], length: int, scale: float = 1.0) -> Optional[Codec]:
+    """Codec für Typ, Länge und Skalierung (None wenn nicht dekodierbar)."""
+    if type_ == "systime" and length == TIMESTAMP_LENGTH:
+        return _TIMESTAMP_CODEC
+    if type_ == "cycletime" and length == SCHEDULE_LENGTH:
+        return ScheduleCodec()
+    if type_ == "errstate" and length and length % ERROR_ENTRY_LENGTH == 0:
+        return ErrorHistoryCodec(length // ERROR_ENTRY_LENGTH)
+
+    layout = VALUE_STRUCTS.get(type_ or "")
+    if layout is None or layout.size != length:
+        layout = _DEFAULT_STRUCTS.get(length)
+    return NumberCodec(layout, scale) if layout is not None else None
+
+
+def datapoint_codec(datapoint) -> Optional[Codec]:
+    """Codec für einen Registry-Datenpunkt (inkl. Enum-Texten)."""
+    codec = codec_for(datapoint.type, datapoint.length, datapoint.scale)
+    if datapoint.enum:
+        return EnumCodec(datapoint.enum, codec, datapoint.length)
+    return codec
+
+
+class BlockLayout:
+    """Vorkompiliertes Dekodier-Layout für einen Block-Read.
+
+    Zahlenwertige Datenpunkte werden zu einem ``struct`` Format mit
+    Füllbytes für Lücken zusammengesetzt und mit einem ``unpack_from``
+    gelesen; alle übrigen (Enums, Zeitstempel, Tabellen, Überlappungen)
+    dekodiert ihr Codec direkt aus demselben Puffer.
+    """
+
+    __slots__ = ("_struct", "_numbers", "_others")
+
+    def __init__(self, entries: Iterable[Tuple[str, Optional[Codec], int]]):
+        """Initialisiere Layout aus (Name, Codec, Offset) Einträgen."""
+        parts = []
+        position = 0
+        self._numbers: List[Tuple[str, NumberCodec, int]] = []
+        self._others: List[Tuple[str, Optional[Codec], int]] = []
+        for name, codec, offset in sorted(entries, key=lambda entry: entry[2]):
+            if type(codec) is NumberCodec and offset >= position:
+                if offset > position:
+                    parts.append(f"{offset - position}x")
+                parts.append(codec.code)
+                position = offset + codec.size
+                self._numbers.append((name, codec, offset))
+            else:
+                self._others.append((name, codec, offset))
+        self._struct = _compile("<" + "".join(parts))
+
+    def decode(self, data) -> Dict[str, Optional[Any]]:
+        """Dekodiere alle Datenpunkte aus ``data`` (Bytes oder memoryview)."""
+        values: Dict[str, Optional[Any]] = {}
+        if len(data) >= self._struct.size:
+            for (name, codec, _), raw in zip(self._numbers, self._struct.unpack_from(data)):
+                values[name] = codec.convert(raw)
+        else:
+            # Verkürzte Antwort - einzeln, soweit die Daten reichen
+            for name, codec, offset in self._numbers:
+                values[name] = codec.decode(data, offset)
+        for name, codec, offset in self._others:
+            values[name] = codec.decode(data, offset) if codec is not None else None
+        return values
+
+
+@lru_cache(maxsize=256)
+def _compile(fmt: str) -> struct.Struct:
+    return struct.Struct(fmt)
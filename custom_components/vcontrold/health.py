@@ -0,0 +1,123 @@
+"""Gesundheitszustand des vcontrold Daemons.
+
+Jeder Health Check ist ein echter Datenpunkt-Read über den Client. Die
+Antwortzeiten landen in einem Histogramm mit festen Buckets, die Ergebnisse
+der letzten Checks in einem gleitenden Fenster; daraus wird der Zustand
+(healthy, degraded, down) über Fehlerrate und p95-Latenz abgeleitet.
+"""
+import math
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence, Tuple
+
+HEALTH_HEALTHY = "healthy"
+HEALTH_DEGRADED = "degraded"
+HEALTH_DOWN = "down"
+
+
+class LatencyHistogram:
+    """Histogramm mit festen Bucket-Obergrenzen (Sekunden, aufsteigend)."""
+
+    def __init__(self, bounds: Sequence[float]):
+        """Initialisiere Histogramm - ein zusätzlicher Bucket nimmt alles darüber auf."""
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Messung einsortieren."""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+
+    def as_dict(self) -> Dict[str, int]:
+        """Bucket-Label -> Anzahl, z.B. ``{"<=50ms": 3, ..., ">5000ms": 0}``."""
+        labels = [f"<={bound * 1000:g}ms" for bound in self.bounds]
+        labels.append(f">{self.bounds[-1] * 1000:g}ms")
+        return dict(zip(labels, self.counts))
+
+
+class HealthMonitor:
+    """Bewertet die letzten Health Checks.
+
+    - down: Fehlerrate im Fenster ab ``down_error_rate``
+    - degraded: Fehlerrate ab ``degraded_error_rate`` oder p95 über ``degraded_p95``
+    - healthy: sonst
+    """
+
+    def __init__(
+        self,
+        bounds: Sequence[float],
+        window: int,
+        degraded_p95: float,
+        degraded_error_rate: float,
+        down_error_rate: float,
+    ):
+        """Initialisiere Monitor."""
+        self.histogram = LatencyHistogram(bounds)
+        self.degraded_p95 = degraded_p95
+        self.degraded_error_rate = degraded_error_rate
+        self.down_error_rate = down_error_rate
+        self.checks = 0
+        self.errors = 0
+        self._window: Deque[Tuple[bool, Optional[float]]] = deque(maxlen=window)
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        """Ergebnis eines Checks; Latenz nur bei Antwort (sonst None)."""
+        self.checks += 1
+        if not ok:
+            self.errors += 1
+        if latency is not None:
+            self.histogram.record(latency)
+        self._window.append((ok, latency))
+
+    @property
+    def error_rate(self) -> Optional[float]:
+        """Fehlerrate im Fenster."""
+        if not self._window:
+            return None
+        return sum(1 for ok, _ in self._window if not ok) / len(self._window)
+
+    @property
+    def p95(self) -> Optional[float]:
+        """Exakte p95-Latenz der Antworten im Fenster (Nearest-Rank).
+
+        Das Histogramm liefert nur Bucket-Grenzen und dient der Verteilung;
+        bewertet wird mit den gemessenen Werten, damit ``degraded_p95`` auch
+        zwischen zwei Buckets genau greift.
+        """
+        latencies = sorted(latency for _, latency in self._window if latency is not None)
+        if not latencies:
+            return None
+        return latencies[max(math.ceil(0.95 * len(latencies)), 1) - 1]
+
+    @property
+    def state(self) -> Optional[str]:
+        """healthy, degraded, down - None solange noch nicht geprüft wurde."""
+        error_rate = self.error_rate
+        if error_rate is None:
+            return None
+        if error_rate >= self.down_error_rate:
+            return HEALTH_DOWN
+        p95 = self.p95
+        if error_rate >= self.degraded_error_rate or (p95 is not None and p95 > self.degraded_p95):
+            return HEALTH_DEGRADED
+        return HEALTH_HEALTHY
+
+    def get_stats(self) -> dict:
+        """Zustand, Kennzahlen und Histogramm."""
+        p95 = self.p95
+        return {
+            "state": self.state,
+            "checks": self.checks,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "p95_ms": None if p95 is None else round(p95 * 1000, 1),
+            "mean_ms": (
+                round(self.histogram.sum / self.histogram.total * 1000, 1)
+                if self.histogram.total
+                else None
+            ),
+            "histogram": self.histogram.as_dict(),
+        }
@@ -1,249 +1,404 @@
 """Viessmann Heizungssteuerung - Native Python Implementation (Embedded)."""
 import asyncio
 import logging
-import struct
-from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Set
 import serial
 import serial.tools.list_ports
 
+from . import optolink
+from .backend import HeatingBackend
+from .cache import CacheState, DatapointCache
+from .coalescer import AsyncRequestCoalescer
+from .kw_sync import KwSyncTracker
+from .const import CACHE_TTLS, MODE_VALUES, SETTER_GETTER_MAP
+from .datapoint_types import BlockLayout, datapoint_codec
+from .optolink import Event, KwDecoder, Vs2Decoder, Vs2Frame
+from .planner import BlockRead, plan_reads
+from .registry import CommandRegistry, Datapoint
+from .serial_transport import OptolinkProtocol, create_serial_connection
+from .serial_worker import Priority, SerialWorker
+
 _LOGGER = logging.getLogger(__name__)
 
+# Wartezeit auf das Sync-Byte 0x05 (Heizung sendet es etwa alle 2 s)
+SYNC_TIMEOUT = 3.0
+
+# Wiederholungen nach NAK - fehlerhafte Frames werden nicht wiederholt
+NAK_RETRIES = 1
+
+# Antwort-Timeout für KW Folgebefehle in offener Sitzung (Sekunden)
+KW_CONTINUE_TIMEOUT = 0.5
+
 
 class Framing(Enum):
-    """Protokoll-Varianten für Viessmann Heizungen."""
+    """Protokoll-Varianten für Viessmann Heizungen.
+
+    FRAMING: VS2 / Protokoll 300 (Telegramme mit Prüfsumme)
+    KW: KW-Protokoll, Befehl nach dem Sync-Byte der Heizung
+    RAW: KW-Befehle ohne Warten auf das Sync-Byte
+    """
     RAW = "raw"
     FRAMING = "framing"
     KW = "kw"
 
 
-class CRCCalculator:
-    """CRC-16 Berechnung für Viessmann Protokoll."""
+class ViessmannProtocol:
+    """Viessmann Heizungs-Protokoll Implementierung (siehe ``optolink``)."""
     
-    CRC_TABLE = None
-    
-    @classmethod
-    def _init_crc_table(cls):
-        """Initialisiere CRC Tabelle."""
-        if cls.CRC_TABLE is not None:
-            return
-        
-        cls.CRC_TABLE = []
-        for i in range(256):
-            crc = i
-            for _ in range(8):
-                if crc & 1:
-                    crc = (crc >> 1) ^ 0xA001
-                else:
-                    crc >>= 1
-            cls.CRC_TABLE.append(crc)
+    # Standard-Kommandos (eingebaute Datenpunkte)
+    REGISTRY = CommandRegistry.builtin()
     
     @staticmethod
-    def calculate(data: bytes) -> int:
-        """Berechne CRC-16."""
-        CRCCalculator._init_crc_table()
-        crc = 0
-        
-        for byte in data:
-            crc = (CRCCalculator.CRC_TABLE[byte ^ (crc & 0xFF)]) ^ (crc >> 8)
+    def encode_request(
+        address: int,
+        length: int,
+        framing: Framing,
+        data: Optional[bytes] = None,
+        first: bool = True,
+    ) -> bytes:
+        """Erstelle Lese- (``data`` None) oder Schreib-Telegramm.
         
-        return crc
-
-
-class ViessmannProtocol:
-    """Viessmann Heizungs-Protokoll Implementierung."""
-    
-    # Kommandos
-    COMMANDS = {
-        "getTempKessel": bytes([0x00, 0x01]),
-        "getTempAussen": bytes([0x00, 0x0d]),
-        "getTempWWsoll": bytes([0x00, 0x40]),
-        "getTempWWist": bytes([0x00, 0x41]),
-        "getTempVorlaufHK1": bytes([0x00, 0x02]),
-        "setTempWWsoll": bytes([0x01, 0x40]),
-        "setBetriebsart": bytes([0x01, 0x20]),
-    }
-    
-    # Antwort Prefixes
-    RESPONSE_OK = bytes([0x06])
-    RESPONSE_ERROR = bytes([0x15])
+        ``first`` (nur KW): erster Befehl nach dem Sync-Byte (mit 0x01).
+        """
+        if framing is Framing.FRAMING:
+            if data is None:
+                return optolink.encode_vs2_read(address, length)
+            return optolink.encode_vs2_write(address, data)
+        if data is None:
+            return optolink.encode_kw_read(address, length, first)
+        return optolink.encode_kw_write(address, data, first)
     
     @staticmethod
-    def create_command(cmd_name: str, value: Optional[float] = None) -> bytes:
+    def create_command(
+        cmd_name: str,
+        value: Optional[float] = None,
+        registry: Optional[CommandRegistry] = None,
+        framing: Framing = Framing.FRAMING,
+    ) -> bytes:
         """Erstelle Kommando Bytes."""
-        if cmd_name not in ViessmannProtocol.COMMANDS:
+        datapoint = (registry or ViessmannProtocol.REGISTRY).get(cmd_name)
+        if datapoint is None:
             raise ValueError(f"Unbekanntes Kommando: {cmd_name}")
         
-        cmd = ViessmannProtocol.COMMANDS[cmd_name]
-        
-        if value is not None:
-            # Set-Kommando mit Wert
-            # Format: [MSB, LSB] in Viessmann Encoding
-            value_int = int(value * 2)  # Auflösung: 0.5°C
-            value_bytes = struct.pack(">H", value_int)
-            payload = cmd + value_bytes
-        else:
-            # Get-Kommando
-            payload = cmd
-        
-        # CRC anhängen
-        crc = CRCCalculator.calculate(payload)
-        crc_bytes = struct.pack("<H", crc)
-        
-        return payload + crc_bytes
+        data = None if value is None else ViessmannProtocol.encode_value(datapoint, value)
+        return ViessmannProtocol.encode_request(
+            datapoint.address, datapoint.length, framing, data
+        )
     
     @staticmethod
-    def parse_response(data: bytes) -> Optional[float]:
-        """Parse Temperaturwert aus Response."""
-        if len(data) < 4:
-            return None
-        
-        if data[0:1] == ViessmannProtocol.RESPONSE_ERROR:
-            return None
-        
-        if data[0:1] == ViessmannProtocol.RESPONSE_OK:
-            try:
-                # Temperatur in Bytes 1-2 (Big Endian)
-                temp_raw = struct.unpack(">H", data[1:3])[0]
-                # Auflösung: 0.5°C
-                temp = temp_raw / 2.0
-                return temp
-            except struct.error:
-                return None
+    def encode_value(datapoint: Datapoint, value: Any) -> bytes:
+        """Kodiere Wert gemäß Typ und Skalierung des Datenpunkts."""
+        codec = datapoint_codec(datapoint)
+        if codec is None:
+            raise ValueError(f"Kein Codec für {datapoint}")
+        return codec.encode(value)
+    
+    @staticmethod
+    def parse_value(datapoint: Datapoint, data, offset: int = 0) -> Optional[Any]:
+        """Dekodiere Rohdaten gemäß Datenpunkt-Typ (siehe ``datapoint_types``).
         
-        return None
+        ``data`` darf ein ``memoryview`` auf einen ganzen Block sein - gelesen
+        wird ab ``offset`` ohne Kopie.
+        """
+        codec = datapoint_codec(datapoint)
+        return codec.decode(data, offset) if codec is not None else None
 
 
-class ViessmannHeatingController:
-    """Direkte Kommunikation mit Viessmann Heizung via serielle Schnittstelle."""
+class ViessmannHeatingController(HeatingBackend):
+    """Direkte Kommunikation mit Viessmann Heizung via serielle Schnittstelle.
+    
+    asyncio-nativ: die Schnittstelle wird über die fd-Readiness des Event
+    Loops bedient (``serial_transport``) und gehört exklusiv einem Worker-Task
+    (``SerialWorker``); alle Bus-Zugriffe laufen priorisiert über dessen Queue.
+    """
     
     def __init__(
         self,
         port: str = "/dev/ttyUSB0",
-        baudrate: int = 9600,
+        baudrate: int = 4800,
         timeout: int = 10,
         framing: Framing = Framing.KW,
         cache_ttl: int = 30,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        registry: Optional[CommandRegistry] = None,
     ):
         """Initialisiere Controller.
         
         Args:
             port: Serieller Port (z.B. /dev/ttyUSB0, COM3)
-            baudrate: Baud-Rate (Standard: 9600)
-            timeout: Socket Timeout in Sekunden
+            baudrate: Baud-Rate (Standard: 4800, Optolink)
+            timeout: Antwort-Timeout in Sekunden
             framing: Protokoll-Variante (RAW, FRAMING, KW)
             cache_ttl: Cache TTL in Sekunden
+            cache_ttls: Cache TTL pro Befehl (Standard: CACHE_TTLS)
+            registry: Befehls-Registry (Standard: eingebaute Datenpunkte)
         """
+        super().__init__()
+        self.registry = registry or CommandRegistry.builtin()
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.framing = framing
         self.cache_ttl = cache_ttl
         
-        self._serial: Optional[serial.Serial] = None
-        self._connected = False
+        self._protocol: Optional[OptolinkProtocol] = None
+        self._connect_lock = asyncio.Lock()
+        self._reconnects = 0
         
-        # Cache
-        self._cache: Dict[str, Any] = {}
-        self._cache_time: Dict[str, datetime] = {}
+        # Cache (TTL pro Befehl, Stale-While-Revalidate)
+        self._cache = DatapointCache(
+            default_ttl=cache_ttl,
+            ttls=CACHE_TTLS if cache_ttls is None else cache_ttls,
+        )
+        
+        # Laufende Reads (Single-Flight)
+        self._coalescer = AsyncRequestCoalescer()
+        # Datenpunkt -> Worker-Schlüssel der wartenden Hintergrund-Auffrischung
+        self._refresh_keys: Dict[str, tuple] = {}
+        
+        # Adressen, deren Block-Read die Heizung ablehnt - werden einzeln gelesen
+        self._isolated: Set[int] = set()
+        
+        # Einziger Besitzer der Schnittstelle
+        self._worker = SerialWorker(f"vcontrold-serial-{port}")
+        
+        # KW: Sync-Takt und offene Sitzung
+        self._kw_sync = KwSyncTracker()
+    
+    @property
+    def bad_frames(self) -> int:
+        """Verworfene (fehlerhafte) Frames."""
+        return self._protocol.bad_frames if self._protocol is not None else 0
     
-    def connect(self) -> bool:
+    def _new_decoder(self):
+        """Decoder passend zur Protokoll-Variante."""
+        return Vs2Decoder() if self.framing is Framing.FRAMING else KwDecoder()
+    
+    async def connect(self) -> bool:
         """Verbinde zur Heizung."""
-        try:
-            self._serial = serial.Serial(
-                port=self.port,
-                baudrate=self.baudrate,
-                timeout=self.timeout,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_EVEN,
-                stopbits=serial.STOPBITS_TWO,
-            )
-            self._connected = True
+        async with self._connect_lock:
+            if self.is_connected():
+                return True
+            if self._protocol is not None:
+                self._reconnects += 1
+            
+            loop = asyncio.get_running_loop()
+            decoder = self._new_decoder()
+            try:
+                _, protocol = await create_serial_connection(
+                    loop,
+                    lambda: OptolinkProtocol(decoder, self._kw_sync.on_sync),
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    bytesize=serial.EIGHTBITS,
+                    parity=serial.PARITY_EVEN,
+                    stopbits=serial.STOPBITS_TWO,
+                )
+            except (serial.SerialException, OSError) as e:
+                _LOGGER.error(f"Fehler beim Verbinden zu {self.port}: {e}")
+                return False
+            
+            # connection_made läuft per call_soon
+            await asyncio.sleep(0)
+            self._protocol = protocol
+            
+            try:
+                if self.framing is Framing.FRAMING and not await self._vs2_handshake():
+                    _LOGGER.error(f"VS2 Initialisierung auf {self.port} fehlgeschlagen")
+                    self.disconnect()
+                    return False
+            except ConnectionError as e:
+                _LOGGER.error(f"Fehler bei der Initialisierung auf {self.port}: {e}")
+                self.disconnect()
+                return False
+            
             _LOGGER.info(f"Verbunden zu Heizung auf {self.port}")
             return True
-        except serial.SerialException as e:
-            _LOGGER.error(f"Fehler beim Verbinden zu {self.port}: {e}")
-            self._connected = False
+    
+    async def _vs2_handshake(self) -> bool:
+        """Schalte die Heizung in den VS2 Modus.
+        
+        0x04 setzt auf KW zurück, die Heizung antwortet mit 0x05; danach
+        aktiviert 0x16 0x00 0x00 das Protokoll 300 (Antwort 0x06).
+        """
+        protocol = self._protocol
+        protocol.reset()
+        protocol.send(bytes([optolink.RESET]))
+        if await protocol.next_event({Event.SYNC}, SYNC_TIMEOUT) is None:
             return False
+        protocol.send(optolink.VS2_SYNC)
+        return await protocol.next_event({Event.ACK}, self.timeout) is not None
     
     def disconnect(self) -> None:
         """Trenne Verbindung."""
-        if self._serial:
+        if self._protocol is not None and self._protocol.transport is not None:
             try:
-                self._serial.close()
+                self._protocol.transport.close()
             except Exception:
                 pass
-        self._connected = False
         _LOGGER.debug("Verbindung getrennt")
     
     def is_connected(self) -> bool:
         """Prüfe Verbindungsstatus."""
-        return self._connected and self._serial is not None and self._serial.is_open
+        return self._protocol is not None and self._protocol.is_connected
     
-    def _send_recv(self, cmd_bytes: bytes, read_bytes: int = 4) -> Optional[bytes]:
-        """Sende Kommando und empfange Response."""
-        if not self.is_connected():
-            if not self.connect():
+    async def is_available(self) -> bool:
+        """Prüfe Verfügbarkeit der Heizung (VS2: inkl. Handshake)."""
+        return await self.connect()
+    
+    async def _transact_vs2(self, telegram: bytes) -> Optional[Vs2Frame]:
+        """VS2 Transaktion: Telegramm senden, ACK und Antwort-Telegramm lesen."""
+        protocol = self._protocol
+        for _ in range(1 + NAK_RETRIES):
+            protocol.reset()
+            protocol.send(telegram)
+            
+            event = await protocol.next_event({Event.ACK, Event.NAK}, self.timeout)
+            if event is None:
+                _LOGGER.warning("Keine Antwort von Heizung")
+                return None
+            if event[0] is Event.NAK:
+                _LOGGER.debug("NAK von Heizung")
+                continue
+            
+            event = await protocol.next_event({Event.FRAME, Event.ERROR}, self.timeout)
+            if event is None or event[0] is Event.ERROR:
+                # Kein Retry: ein gestörter Frame soll keine Wiederholungsflut auslösen
+                _LOGGER.warning("Keine gültige Antwort von Heizung")
                 return None
-        
-        try:
-            # Leere Buffer
-            self._serial.reset_input_buffer()
-            self._serial.reset_output_buffer()
             
-            # Sende Kommando
-            self._serial.write(cmd_bytes)
+            frame = event[1]
+            if frame.is_error:
+                _LOGGER.warning(f"Fehlertelegramm von Heizung: {frame}")
+                return None
+            return frame
+        
+        _LOGGER.warning("Heizung lehnt Telegramm ab (NAK)")
+        return None
+    
+    async def _transact_kw(
+        self, address: int, length: int, data: Optional[bytes] = None
+    ) -> Optional[bytes]:
+        """KW Transaktion im Sync-Fenster.
+        
+        In offener Sitzung geht der Befehl sofort (ohne 0x01) raus, sonst
+        direkt nach einem gerade empfangenen Sync-Byte oder erst nach dem
+        nächsten. Antwortet die Heizung auf einen Folgebefehl nicht, war die
+        Sitzung abgelaufen - dann einmal regulär nach dem Sync wiederholen.
+        """
+        protocol = self._protocol
+        sync = self._kw_sync
+        reply_length = length if data is None else 1
+        
+        for _ in range(2):
+            protocol.reset()
+            continued = self.framing is Framing.KW and sync.session_open()
+            if self.framing is Framing.KW and not continued and not sync.in_window():
+                if await protocol.next_event({Event.SYNC}, sync.sync_timeout()) is None:
+                    _LOGGER.warning("Kein Sync-Byte von Heizung")
+                    return None
             
-            # Lese Response
-            response = self._serial.read(read_bytes)
+            command = ViessmannProtocol.encode_request(
+                address, length, self.framing, data, first=not continued
+            )
+            protocol.decoder.expect(reply_length)
+            protocol.send(command)
+            event = await protocol.next_event(
+                {Event.DATA}, KW_CONTINUE_TIMEOUT if continued else self.timeout
+            )
+            if event is not None:
+                sync.on_reply(continued)
+                return event[1]
             
-            if not response:
-                _LOGGER.warning("Keine Antwort von Heizung")
+            protocol.decoder.reset()
+            sync.on_timeout()
+            if not continued:
+                break
+            _LOGGER.debug("KW Sitzung abgelaufen - warte auf Sync")
+        
+        _LOGGER.warning("Keine Antwort von Heizung")
+        return None
+    
+    async def _request(
+        self, address: int, length: int, data: Optional[bytes] = None
+    ) -> Optional[bytes]:
+        """Lese ``length`` Bytes ab ``address`` oder schreibe ``data``.
+        
+        Returns:
+            Rohdaten beim Lesen, ``b""`` bei bestätigtem Schreiben, sonst None
+        """
+        if not self.is_connected():
+            if not await self.connect():
                 return None
+        
+        try:
+            if self.framing is Framing.FRAMING:
+                frame = await self._transact_vs2(
+                    ViessmannProtocol.encode_request(address, length, self.framing, data)
+                )
+                if frame is None:
+                    return None
+                if frame.address != address:
+                    _LOGGER.warning(
+                        f"Antwort für 0x{frame.address:04X} statt 0x{address:04X}"
+                    )
+                    return None
+                return frame.data
             
-            _LOGGER.debug(f"Response: {response.hex()}")
-            return response
+            reply = await self._transact_kw(address, length, data)
+            if reply is None:
+                return None
+            if data is not None:
+                return b"" if reply[0] == optolink.KW_WRITE_OK else None
+            return reply
         
-        except serial.SerialException as e:
+        except ConnectionError as e:
             _LOGGER.error(f"Serielle Fehler: {e}")
-            self._connected = False
-            return None
-        except Exception as e:
-            _LOGGER.error(f"Fehler beim Kommando: {e}")
             return None
     
-    def _is_cache_valid(self, key: str) -> bool:
-        """Prüfe ob Cache noch gültig ist."""
-        if key not in self._cache_time:
-            return False
-        
-        time_diff = datetime.now() - self._cache_time[key]
-        return time_diff < timedelta(seconds=self.cache_ttl)
-    
-    def get_temperature(self, sensor_type: str) -> Optional[float]:
+    async def get_temperature(self, sensor_type: str) -> Optional[float]:
         """Lese Temperaturwert mit Caching."""
         # Prüfe Cache
-        if self._is_cache_valid(sensor_type):
-            return self._cache.get(sensor_type)
+        value, state = self._cache.lookup(sensor_type)
+        if state is CacheState.FRESH:
+            return value
+        
+        if state is CacheState.STALE:
+            # Letzten Wert sofort liefern, im Hintergrund neu lesen
+            self._schedule_refresh([sensor_type])
+            return value
+        
+        # Gleichzeitige Anfragen für denselben Sensor teilen sich einen Read;
+        # eine wartende Hintergrund-Auffrischung wird dabei vorgezogen
+        self._promote_refresh([sensor_type], Priority.USER)
+        return await self._coalescer.run(
+            sensor_type,
+            lambda: self._worker.submit(
+                Priority.USER, self._read_temperature, sensor_type, key=sensor_type
+            ),
+        )
+    
+    async def _read_temperature(self, sensor_type: str) -> Optional[float]:
+        """Lese Temperaturwert von der Heizung (ohne Cache)."""
+        datapoint = self.registry.get(sensor_type)
+        if datapoint is None:
+            _LOGGER.error(f"Unbekanntes Kommando: {sensor_type}")
+            return None
         
         try:
-            # Erstelle Kommando
-            cmd = ViessmannProtocol.create_command(sensor_type)
-            
             # Sende & empfange
-            response = self._send_recv(cmd)
+            response = await self._request(datapoint.address, datapoint.length)
             
             if response is None:
                 return None
             
             # Parse Response
-            temp = ViessmannProtocol.parse_response(response)
+            temp = ViessmannProtocol.parse_value(datapoint, response)
             
             if temp is not None:
                 # Cache aktualisieren
-                self._cache[sensor_type] = temp
-                self._cache_time[sensor_type] = datetime.now()
+                self._cache.put(sensor_type, temp)
                 _LOGGER.debug(f"{sensor_type}: {temp}°C")
             
             return temp
@@ -252,54 +407,261 @@ class ViessmannHeatingController:
             _LOGGER.error(f"Fehler beim Auslesen {sensor_type}: {e}")
             return None
     
-    def set_temperature(self, command: str, value: float) -> bool:
-        """Setze Temperaturwert."""
-        if value < 20 or value > 80:
-            _LOGGER.error(f"Temperatur {value}°C außerhalb Bereich (20-80°C)")
-            return False
+    async def read_many(
+        self,
+        sensor_types: List[str],
+        use_cache: bool = True,
+        priority: Priority = Priority.POLL,
+    ) -> Dict[str, Optional[Any]]:
+        """Lese mehrere Datenpunkte mit möglichst wenigen Telegrammen.
         
-        try:
-            # Erstelle Kommando mit Wert
-            cmd = ViessmannProtocol.create_command(command, value)
+        Frische Cache-Werte werden direkt geliefert (abgelaufene im
+        Hintergrund aufgefrischt), alle übrigen Datenpunkte zu Block-Reads
+        über zusammenhängende Adressen gebündelt (siehe ``planner``).
+        
+        Args:
+            sensor_types: Zu lesende Sensoren
+            use_cache: False = immer vom Bus lesen
+            priority: Priorität in der Bus-Queue (Standard: Hintergrund-Polling)
+        
+        Returns:
+            Dict Sensor -> Wert (None bei Fehler oder unbekanntem Sensor)
+        """
+        results: Dict[str, Optional[Any]] = {}
+        pending: List[str] = []
+        stale: List[str] = []
+        
+        for sensor_type in sensor_types:
+            if sensor_type not in self.registry:
+                _LOGGER.error(f"Unbekannter Sensor: {sensor_type}")
+                results[sensor_type] = None
+                continue
             
-            # Sende & empfange
-            response = self._send_recv(cmd)
+            if not use_cache:
+                pending.append(sensor_type)
+                continue
             
-            if response is None:
-                return False
+            value, state = self._cache.lookup(sensor_type)
+            if state is CacheState.MISS:
+                pending.append(sensor_type)
+                continue
             
-            # Prüfe OK Response
-            is_ok = response[0:1] == ViessmannProtocol.RESPONSE_OK
+            results[sensor_type] = value
+            if state is CacheState.STALE:
+                stale.append(sensor_type)
+        
+        if stale:
+            self._schedule_refresh(stale)
+        
+        if pending:
+            self._promote_refresh(pending, priority)
+            results.update(
+                await self._coalescer.run_many(
+                    pending,
+                    lambda missing: self._worker.submit(priority, self._read_blocks, missing),
+                )
+            )
+        
+        return results
+    
+    def _schedule_refresh(self, sensor_types: List[str]) -> None:
+        """Frische abgelaufene Werte im Hintergrund auf (Stale-While-Revalidate).
+        
+        Läuft über den Coalescer: ein Vordergrund-Read desselben Datenpunkts,
+        der während der Auffrischung kommt, hängt sich an statt eine zweite
+        Bus-Transaktion zu starten.
+        """
+        futures = self._coalescer.start_many(
+            [sensor_type for sensor_type in sensor_types if not self._coalescer.in_flight(sensor_type)],
+            self._submit_refresh,
+        )
+        for future in futures.values():
+            # Fehler landen im Log von _read_blocks - hier nur abholen
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    
+    def _submit_refresh(self, sensor_types: List[str]) -> asyncio.Future:
+        """Auffrischung mit festem Schlüssel einreihen (siehe ``_promote_refresh``)."""
+        key = ("refresh", tuple(sensor_types))
+        for sensor_type in sensor_types:
+            self._refresh_keys[sensor_type] = key
+        
+        def _done(_) -> None:
+            for sensor_type in sensor_types:
+                if self._refresh_keys.get(sensor_type) == key:
+                    del self._refresh_keys[sensor_type]
+        
+        future = self._worker.submit(Priority.POLL, self._read_blocks, sensor_types, key=key)
+        future.add_done_callback(_done)
+        return future
+    
+    def _promote_refresh(self, sensor_types: Iterable[str], priority: Priority) -> None:
+        """Wartende Auffrischungen dieser Datenpunkte auf ``priority`` vorziehen.
+        
+        Ein Vordergrund-Read hängt sich über den Coalescer an die
+        Auffrischung an - ohne Vorziehen würde er hinter dem Polling warten.
+        """
+        if priority >= Priority.POLL:
+            return
+        keys = {self._refresh_keys[name] for name in sensor_types if name in self._refresh_keys}
+        for key in keys:
+            self._worker.promote(key, priority)
+    
+    def submit_read(
+        self, sensor_types: Iterable[str], priority: Priority = Priority.USER
+    ) -> asyncio.Future:
+        """Reihe einen Read ein (ohne Cache).
+        
+        Returns:
+            Future mit Dict Sensor -> Wert
+        """
+        return self._worker.submit(priority, self._read_blocks, list(sensor_types))
+    
+    def submit_write(self, command: str, value: float) -> asyncio.Future:
+        """Reihe einen Schreibbefehl ein (überholt alle Reads).
+        
+        Returns:
+            Future mit True bei bestätigtem Schreiben
+        """
+        return self._worker.submit(Priority.WRITE, self._write_value, command, value)
+    
+    async def _read_blocks(self, sensor_types: List[str]) -> Dict[str, Optional[Any]]:
+        """Lese Datenpunkte gebündelt als Block-Reads (ohne Cache)."""
+        results: Dict[str, Optional[Any]] = dict.fromkeys(sensor_types)
+        datapoints = [self.registry.get(sensor_type) for sensor_type in sensor_types]
+        blocks = plan_reads(
+            (datapoint for datapoint in datapoints if datapoint is not None),
+            isolated=self._isolated,
+        )
+        _LOGGER.debug(f"{len(sensor_types)} Datenpunkte in {len(blocks)} Block-Reads")
+        
+        for block in blocks:
+            values = await self._read_block(block)
+            if values is None and len(block.datapoints) > 1:
+                values = await self._read_block_split(block)
+            if values is None:
+                continue
+            for name, value in values.items():
+                results[name] = value
+                if value is not None:
+                    self._cache.put(name, value)
+        
+        return results
+    
+    async def _read_block(self, block: BlockRead) -> Optional[Dict[str, Optional[Any]]]:
+        """Ein Block-Read - None wenn die Heizung ihn ablehnt oder nicht antwortet."""
+        try:
+            response = await self._request(block.address, block.length)
+        except Exception as e:
+            _LOGGER.error(f"Fehler beim Block-Read {block}: {e}")
+            return None
+        if response is None:
+            return None
+        
+        # Alle Werte in einem Durchgang aus dem Puffer dekodieren
+        layout = BlockLayout(
+            (datapoint.name, datapoint_codec(datapoint), block.offset(datapoint))
+            for datapoint in block.datapoints
+        )
+        return layout.decode(response)
+    
+    async def _read_block_split(self, block: BlockRead) -> Optional[Dict[str, Optional[Any]]]:
+        """Fehlgeschlagenen Block einzeln lesen.
+        
+        Gelingt dabei mindestens ein Datenpunkt, lag es am Block (z.B. NAK
+        für eine undefinierte Adresse in der Lücke): seine Datenpunkte
+        werden ab jetzt nicht mehr gebündelt. Scheitern alle, war es eher
+        ein Bus-Problem - dann bleibt der Block für den nächsten Versuch.
+        """
+        values: Dict[str, Optional[Any]] = {}
+        for datapoint in block.datapoints:
+            single = await self._read_block(
+                BlockRead(datapoint.address, datapoint.length, [datapoint])
+            )
+            if single is not None:
+                values.update(single)
+        
+        if not values:
+            return None
+        _LOGGER.warning(
+            f"⚠️ Block-Read {block} abgelehnt - {len(block.datapoints)} Datenpunkte werden einzeln gelesen"
+        )
+        self._isolated.update(datapoint.address for datapoint in block.datapoints)
+        return values
+    
+    async def set_temperature(self, command: str, value: float) -> bool:
+        """Setze Temperaturwert (Bereich laut Datenpunkt, sonst laut Typ)."""
+        datapoint = self.registry.get(command)
+        if datapoint is None:
+            _LOGGER.error(f"Unbekanntes Kommando: {command}")
+            return False
+        
+        if (datapoint.minimum is not None and value < datapoint.minimum) or (
+            datapoint.maximum is not None and value > datapoint.maximum
+        ):
+            _LOGGER.error(
+                f"Temperatur {value}°C außerhalb Bereich "
+                f"({datapoint.minimum}-{datapoint.maximum}°C) für {command}"
+            )
+            return False
+        
+        return await self.submit_write(command, value)
+    
+    async def _write_value(self, command: str, value: float) -> bool:
+        """Sende Schreibbefehl und aktualisiere Getter-Cache (Write-Through).
+        
+        Im Cache landet der Wert, den ein Read des Getters aus denselben
+        Bytes dekodieren würde - der Typ hängt nicht davon ab, ob zuletzt
+        geschrieben oder gelesen wurde.
+        """
+        getter = SETTER_GETTER_MAP.get(command) or self.registry.getter_for(command)
+        
+        datapoint = self.registry.get(command)
+        if datapoint is None:
+            _LOGGER.error(f"Unbekanntes Kommando: {command}")
+            return False
+        
+        try:
+            # Sende Wert & prüfe Bestätigung
+            data = ViessmannProtocol.encode_value(datapoint, value)
+            response = await self._request(datapoint.address, datapoint.length, data)
+            is_ok = response is not None
             
             if is_ok:
-                # Cache invalidieren
-                self._cache.pop(command.replace("set", "get"), None)
-                _LOGGER.info(f"{command} {value}°C erfolgreich gesetzt")
+                # Cache mit geschriebenem Wert aktualisieren (so dekodiert wie ein Read)
+                if getter:
+                    written = ViessmannProtocol.parse_value(
+                        self.registry.get(getter) or datapoint, data
+                    )
+                    if written is None:
+                        self._cache.invalidate(getter)
+                    else:
+                        self._cache.put(getter, written)
+                _LOGGER.info(f"{command} {value} erfolgreich gesetzt")
             else:
-                _LOGGER.error(f"{command} fehlgeschlagen: {response.hex()}")
+                if getter:
+                    self._cache.invalidate(getter)
+                _LOGGER.error(f"{command} fehlgeschlagen")
             
             return is_ok
         
         except Exception as e:
+            if getter:
+                self._cache.invalidate(getter)
             _LOGGER.error(f"Fehler beim Setzen: {e}")
             return False
+        
+        finally:
+            if getter:
+                self._notify_write(getter)
     
-    def set_operating_mode(self, mode: str) -> bool:
+    async def set_operating_mode(self, mode: str) -> bool:
         """Setze Betriebsart."""
-        mode_map = {
-            "auto": 0x00,
-            "standby": 0x01,
-            "party": 0x02,
-            "eco": 0x03,
-        }
-        
-        if mode not in mode_map:
+        if mode not in MODE_VALUES:
             _LOGGER.error(f"Unbekannte Betriebsart: {mode}")
             return False
         
         try:
-            mode_value = float(mode_map[mode])
-            result = self.set_temperature("setBetriebsart", mode_value)
+            result = await self.submit_write("setBetriebsart", MODE_VALUES[mode])
             
             if result:
                 _LOGGER.info(f"Betriebsart auf {mode} gesetzt")
@@ -329,10 +691,17 @@ class ViessmannHeatingController:
             "baudrate": self.baudrate,
             "framing": self.framing.value,
             "connected": self.is_connected(),
-            "cache_size": len(self._cache),
+            "cache": self._cache.get_stats(),
             "cache_ttl": self.cache_ttl,
+            "reconnects": self._reconnects,
+            "coalesced_reads": self._coalescer.coalesced,
+            "bad_frames": self.bad_frames,
+            "worker": self._worker.get_stats(),
+            "kw_sync": self._kw_sync.get_stats() if self.framing is Framing.KW else None,
         }
     
-    def cleanup(self) -> None:
+    async def cleanup(self) -> None:
         """Räume auf."""
+        # Laufenden Bus-Zugriff abschließen lassen, erst dann schließen
+        await self._worker.stop(timeout=self.timeout)
         self.disconnect()
@@ -0,0 +1,99 @@
+"""Sync-Fenster Verwaltung für das KW-Protokoll.
+
+Im KW-Modus sendet die Heizung im Leerlauf etwa alle 2 s ein Sync-Byte 0x05.
+Ein Befehl muss direkt danach beginnen (mit 0x01). Solange der Host dann
+zügig weitere Befehle schickt, bleibt die Sitzung offen: Folgebefehle gehen
+ohne 0x01 und ohne erneutes Warten auf den Sync raus. Erst wenn die Queue
+leer ist und die Sitzung abläuft, fällt die Heizung zurück auf 0x05.
+
+``KwSyncTracker`` merkt sich Takt und Zeitpunkt der Sync-Bytes sowie die
+offene Sitzung und entscheidet pro Befehl, ob sofort gesendet werden darf.
+"""
+import logging
+import time
+from typing import Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Nach einer Antwort bleibt die Sitzung so lange offen (Sekunden)
+KW_SESSION_IDLE = 0.5
+
+# So kurz nach einem Sync-Byte darf noch mit 0x01 begonnen werden (Sekunden)
+KW_SYNC_WINDOW = 0.05
+
+# Standard-Abstand der Sync-Bytes, bis ein Takt gemessen wurde (Sekunden)
+KW_SYNC_INTERVAL = 2.0
+
+
+class KwSyncTracker:
+    """Verfolgt Sync-Takt und offene Sitzung einer KW Heizung."""
+
+    def __init__(
+        self,
+        session_idle: float = KW_SESSION_IDLE,
+        sync_window: float = KW_SYNC_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialisiere Tracker.
+
+        Args:
+            session_idle: Maximale Pause zwischen Antwort und Folgebefehl
+            sync_window: Maximale Verzögerung nach dem Sync-Byte
+            clock: Zeitquelle (monoton)
+        """
+        self.session_idle = session_idle
+        self.sync_window = sync_window
+        self._clock = clock
+        self.interval = KW_SYNC_INTERVAL
+        self.last_sync: Optional[float] = None
+        self.last_reply: Optional[float] = None
+        self.syncs = 0
+        self.sessions = 0
+        self.commands = 0
+
+    def on_sync(self, now: Optional[float] = None) -> None:
+        """Sync-Byte empfangen - Heizung ist im Leerlauf, Sitzung beendet."""
+        now = self._clock() if now is None else now
+        if self.last_sync is not None:
+            gap = now - self.last_sync
+            # Abstände über eine Sitzung hinweg nicht in den Takt einrechnen
+            if gap < 2 * self.interval:
+                self.interval = 0.8 * self.interval + 0.2 * gap
+        self.last_sync = now
+        self.last_reply = None
+        self.syncs += 1
+
+    def on_reply(self, continued: bool, now: Optional[float] = None) -> None:
+        """Antwort empfangen - Sitzung bleibt für Folgebefehle offen."""
+        self.last_reply = self._clock() if now is None else now
+        self.commands += 1
+        if not continued:
+            self.sessions += 1
+
+    def on_timeout(self) -> None:
+        """Keine Antwort - Sitzung als beendet betrachten."""
+        self.last_reply = None
+
+    def session_open(self, now: Optional[float] = None) -> bool:
+        """Darf der nächste Befehl ohne Sync (und ohne 0x01) gesendet werden?"""
+        now = self._clock() if now is None else now
+        return self.last_reply is not None and now - self.last_reply < self.session_idle
+
+    def in_window(self, now: Optional[float] = None) -> bool:
+        """Liegt das letzte Sync-Byte noch im Sende-Fenster?"""
+        now = self._clock() if now is None else now
+        return self.last_sync is not None and now - self.last_sync < self.sync_window
+
+    def sync_timeout(self) -> float:
+        """Wartezeit auf das nächste Sync-Byte (gemessener Takt plus Reserve)."""
+        return 1.5 * self.interval
+
+    def get_stats(self) -> dict:
+        """Hole Sync-Statistik."""
+        return {
+            "sync_interval": round(self.interval, 2),
+            "syncs": self.syncs,
+            "sessions": self.sessions,
+            "commands": self.commands,
+            "commands_per_session": round(self.commands / self.sessions, 1) if self.sessions else 0,
+        }
@@ -0,0 +1,252 @@
+"""Optolink Telegramm-Codec für Viessmann VS2 (Protokoll 300) und KW.
+
+VS2 / 300 Telegramm (Host -> Heizung und zurück)::
+
+    0x41 | Länge | Typ | Funktion | Adresse (2, BE) | Datenlänge | Daten... | Prüfsumme
+
+``Länge`` zählt die Bytes von ``Typ`` bis zum Ende der Daten, die Prüfsumme
+ist die Summe aller Bytes ab ``Länge`` modulo 256. Die Heizung quittiert
+jedes Telegramm mit 0x06 (ACK) oder 0x15 (NAK), bevor die Antwort folgt.
+
+KW: Die Heizung sendet etwa alle 2 s ein Sync-Byte 0x05. Direkt danach
+beginnt der Host mit 0x01, gefolgt von ``0xF7 Adresse Länge`` (lesen) bzw.
+``0xF4 Adresse Länge Daten`` (schreiben). Lesen liefert die Rohdaten,
+Schreiben ein 0x00.
+
+Die Decoder sind inkrementelle Zustandsautomaten: sie werden mit beliebig
+zerteilten Bytes gefüttert, liefern vollständige Ereignisse und
+synchronisieren sich nach fehlerhaften Frames selbst neu, ohne Exceptions.
+"""
+import logging
+import struct
+from enum import Enum
+from typing import List, Tuple, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+# Steuerzeichen
+ACK = 0x06
+NAK = 0x15
+ENQ = 0x05  # Sync-Byte der Heizung (KW) / Bereitschaft (VS2)
+RESET = 0x04
+VS2_START = 0x41
+VS2_SYNC = b"\x16\x00\x00"
+
+# VS2 Telegrammtypen und Funktionen
+VS2_REQUEST = 0x00
+VS2_RESPONSE = 0x01
+VS2_ERROR = 0x03
+VS2_READ = 0x01
+VS2_WRITE = 0x02
+VS2_RPC = 0x07
+
+# KW Befehle
+KW_START = 0x01
+KW_READ = 0xF7
+KW_WRITE = 0xF4
+KW_WRITE_OK = 0x00
+
+# Maximale Datenlänge eines Telegramms (Längenfeld ist ein Byte)
+MAX_DATA_LENGTH = 0xFF - 5
+
+# Vorkompilierte Layouts
+_VS2_HEADER = struct.Struct(">BBBBHB")  # Start, Länge, Typ, Funktion, Adresse, Datenlänge
+_VS2_BODY = struct.Struct(">BBHB")  # Typ, Funktion, Adresse, Datenlänge
+_KW_COMMAND = struct.Struct(">BHB")  # Befehl, Adresse, Länge
+
+
+class Event(Enum):
+    """Ereignisse der Decoder."""
+    ACK = "ack"
+    NAK = "nak"
+    SYNC = "sync"
+    FRAME = "frame"
+    DATA = "data"
+    ERROR = "error"
+
+
+class Vs2Frame:
+    """Dekodiertes VS2 Telegramm."""
+
+    __slots__ = ("type", "function", "address", "data")
+
+    def __init__(self, type: int, function: int, address: int, data: bytes):
+        self.type = type
+        self.function = function
+        self.address = address
+        self.data = data
+
+    @property
+    def is_error(self) -> bool:
+        """Fehlertelegramm der Heizung?"""
+        return self.type == VS2_ERROR
+
+    def __repr__(self) -> str:
+        return (
+            f"Vs2Frame(type=0x{self.type:02X}, function=0x{self.function:02X}, "
+            f"address=0x{self.address:04X}, data={self.data.hex()})"
+        )
+
+
+DecoderEvent = Tuple[Event, Union[None, Vs2Frame, bytes, str]]
+
+
+def _checksum(data) -> int:
+    """Additive Prüfsumme (modulo 256)."""
+    return sum(data) & 0xFF
+
+
+# ======================= ENCODER =======================
+
+def encode_vs2(function: int, address: int, length: int, data: bytes = b"") -> bytes:
+    """Erstelle VS2 Anfrage-Telegramm."""
+    if length > MAX_DATA_LENGTH:
+        raise ValueError(f"Datenlänge {length} zu groß (max. {MAX_DATA_LENGTH})")
+    telegram = bytearray(_VS2_HEADER.size + len(data) + 1)
+    _VS2_HEADER.pack_into(
+        telegram, 0, VS2_START, 5 + len(data), VS2_REQUEST, function, address, length
+    )
+    telegram[_VS2_HEADER.size:-1] = data
+    telegram[-1] = _checksum(memoryview(telegram)[1:-1])
+    return bytes(telegram)
+
+
+def encode_vs2_read(address: int, length: int) -> bytes:
+    """VS2 Lese-Telegramm."""
+    return encode_vs2(VS2_READ, address, length)
+
+
+def encode_vs2_write(address: int, data: bytes) -> bytes:
+    """VS2 Schreib-Telegramm."""
+    return encode_vs2(VS2_WRITE, address, len(data), data)
+
+
+def encode_kw_read(address: int, length: int, first: bool = True) -> bytes:
+    """KW Lesebefehl (``first``: erster Befehl nach dem Sync-Byte)."""
+    command = _KW_COMMAND.pack(KW_READ, address, length)
+    return bytes([KW_START]) + command if first else command
+
+
+def encode_kw_write(address: int, data: bytes, first: bool = True) -> bytes:
+    """KW Schreibbefehl (``first``: erster Befehl nach dem Sync-Byte)."""
+    command = _KW_COMMAND.pack(KW_WRITE, address, len(data)) + data
+    return bytes([KW_START]) + command if first else command
+
+
+# ======================= DECODER =======================
+
+class Vs2Decoder:
+    """Inkrementeller Zustandsautomat für empfangene VS2 Bytes.
+
+    Liefert ACK/NAK/SYNC Ereignisse für Einzelbytes außerhalb eines
+    Telegramms, FRAME für vollständige Telegramme mit gültiger Prüfsumme
+    und ERROR (mit Grund) für verworfene Frames.
+    """
+
+    _IDLE, _LENGTH, _BODY = range(3)
+
+    def __init__(self):
+        """Initialisiere Decoder."""
+        self._state = self._IDLE
+        self._body = bytearray()
+        self._expected = 0
+
+    def reset(self) -> None:
+        """Verwerfe ein begonnenes Telegramm."""
+        self._state = self._IDLE
+        self._body.clear()
+        self._expected = 0
+
+    def feed(self, data: bytes) -> List[DecoderEvent]:
+        """Verarbeite empfangene Bytes."""
+        events: List[DecoderEvent] = []
+        for byte in data:
+            if self._state == self._IDLE:
+                if byte == VS2_START:
+                    self._state = self._LENGTH
+                elif byte == ACK:
+                    events.append((Event.ACK, None))
+                elif byte == NAK:
+                    events.append((Event.NAK, None))
+                elif byte == ENQ:
+                    events.append((Event.SYNC, None))
+                # Alles andere ist Leitungsrauschen - ignorieren
+            elif self._state == self._LENGTH:
+                if byte < _VS2_BODY.size:
+                    events.append((Event.ERROR, f"ungültige Länge {byte}"))
+                    self.reset()
+                    continue
+                self._expected = byte + 1  # plus Prüfsumme
+                self._body.clear()
+                self._state = self._BODY
+            else:
+                self._body.append(byte)
+                if len(self._body) == self._expected:
+                    events.append(self._finish())
+        return events
+
+    def _finish(self) -> DecoderEvent:
+        """Prüfe und dekodiere ein vollständiges Telegramm."""
+        body = memoryview(self._body)
+        length = len(body) - 1
+        try:
+            if _checksum(body[:-1]) + length & 0xFF != body[-1]:
+                return (Event.ERROR, "Prüfsummenfehler")
+            type_, function, address, data_length = _VS2_BODY.unpack_from(body)
+            data = bytes(body[_VS2_BODY.size:-1])
+            # Nur Lese-Antworten tragen Daten, Schreib-Antworten nur die Länge
+            if type_ == VS2_RESPONSE and function == VS2_READ and len(data) != data_length:
+                return (Event.ERROR, f"Datenlänge {len(data)} statt {data_length}")
+            return (Event.FRAME, Vs2Frame(type_, function, address, data))
+        finally:
+            body.release()
+            self.reset()
+
+
+class KwDecoder:
+    """Inkrementeller Zustandsautomat für empfangene KW Bytes.
+
+    KW Antworten haben kein Framing - der Decoder muss wissen, wie viele
+    Bytes erwartet werden (``expect``). Außerhalb einer Antwort gelten
+    0x05 Bytes als Sync-Signal der Heizung.
+    """
+
+    def __init__(self):
+        """Initialisiere Decoder."""
+        self._buffer = bytearray()
+        self._expected = 0
+
+    @property
+    def busy(self) -> bool:
+        """Wartet der Decoder auf eine Antwort?"""
+        return self._expected > 0
+
+    def expect(self, length: int) -> None:
+        """Erwarte eine Antwort mit ``length`` Bytes."""
+        self._buffer.clear()
+        self._expected = length
+
+    def reset(self) -> None:
+        """Verwerfe eine begonnene Antwort."""
+        self._buffer.clear()
+        self._expected = 0
+
+    def feed(self, data: bytes) -> List[DecoderEvent]:
+        """Verarbeite empfangene Bytes."""
+        events: List[DecoderEvent] = []
+        view = memoryview(data)
+        position = 0
+        while position < len(view):
+            if not self._expected:
+                if view[position] == ENQ:
+                    events.append((Event.SYNC, None))
+                position += 1
+                continue
+            take = min(self._expected - len(self._buffer), len(view) - position)
+            self._buffer += view[position:position + take]
+            position += take
+            if len(self._buffer) == self._expected:
+                events.append((Event.DATA, bytes(self._buffer)))
+                self.reset()
+        return events
+
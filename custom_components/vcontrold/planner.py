@@ -0,0 +1,89 @@
+"""Block-Read Planer für den seriellen Optolink-Bus.
+
+Viele Datenpunkte liegen im Adressraum der Vitotronic direkt nebeneinander
+(z.B. 0x0800-0x0830 für die Temperaturfühler). Statt ein Telegramm pro
+Datenpunkt zu senden, fasst der Planer angefragte Adressen zu möglichst
+wenigen Block-Reads zusammen. Kleine Lücken werden mitgelesen, weil ein
+zusätzliches Telegramm (Anfrage, ACK, Antwort, Latenz der Heizung) deutlich
+teurer ist als ein paar Bytes mehr.
+
+Manche Steuerungen lehnen Reads über undefinierte Adressen ab (NAK). Solche
+Datenpunkte gibt der Aufrufer als ``isolated`` an - sie werden wieder
+einzeln gelesen.
+"""
+import logging
+from typing import Collection, Iterable, List
+
+from .registry import Datapoint
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximale Länge eines Block-Reads in Bytes
+MAX_BLOCK_LENGTH = 32
+
+# Maximale Lücke zwischen zwei Datenpunkten, die noch mitgelesen wird
+MAX_BLOCK_GAP = 8
+
+
+class BlockRead:
+    """Ein zusammenhängender Lesezugriff über mehrere Datenpunkte."""
+
+    __slots__ = ("address", "length", "datapoints")
+
+    def __init__(self, address: int, length: int, datapoints: List[Datapoint]):
+        self.address = address
+        self.length = length
+        self.datapoints = datapoints
+
+    @property
+    def end(self) -> int:
+        """Erste Adresse hinter dem Block."""
+        return self.address + self.length
+
+    def offset(self, datapoint: Datapoint) -> int:
+        """Position des Datenpunkts innerhalb der Blockdaten."""
+        return datapoint.address - self.address
+
+    def __repr__(self) -> str:
+        return f"BlockRead(0x{self.address:04X}, len={self.length}, {len(self.datapoints)} Datenpunkte)"
+
+
+def plan_reads(
+    datapoints: Iterable[Datapoint],
+    max_length: int = MAX_BLOCK_LENGTH,
+    max_gap: int = MAX_BLOCK_GAP,
+    isolated: Collection[int] = (),
+) -> List[BlockRead]:
+    """Gruppiere Datenpunkte zu möglichst wenigen Block-Reads.
+
+    Args:
+        datapoints: Zu lesende Datenpunkte (Reihenfolge egal)
+        max_length: Maximale Blocklänge in Bytes
+        max_gap: Maximale ungenutzte Lücke zwischen zwei Datenpunkten
+        isolated: Adressen, die nie mit anderen Datenpunkten gebündelt werden
+
+    Returns:
+        Block-Reads aufsteigend nach Adresse; Datenpunkte länger als
+        ``max_length`` bilden einen eigenen Block.
+    """
+    blocks: List[BlockRead] = []
+    current = None
+
+    for datapoint in sorted(datapoints, key=lambda dp: (dp.address, -dp.length)):
+        end = datapoint.address + datapoint.length
+        alone = datapoint.address in isolated
+        if (
+            current is not None
+            and not alone
+            and datapoint.address <= current.end + max_gap
+            and max(end, current.end) - current.address <= max_length
+        ):
+            current.length = max(end, current.end) - current.address
+            current.datapoints.append(datapoint)
+            continue
+
+        block = BlockRead(datapoint.address, datapoint.length, [datapoint])
+        blocks.append(block)
+        current = None if alone else block
+
+    return blocks
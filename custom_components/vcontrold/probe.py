@@ -0,0 +1,207 @@
+"""Automatische Erkennung von Protokoll, Baud-Rate und Geräte-ID.
+
+Statt Framing und Baud-Rate von Hand zu wählen (ein Fehler zeigt sich sonst
+nur als Timeout), probiert der Probe mit knappen Timeouts:
+
+1. 0x04 senden und auf das Sync-Byte 0x05 warten - kommt keins, stimmt die
+   Baud-Rate nicht (oder es hängt nichts an der Schnittstelle)
+2. 0x16 0x00 0x00 senden - antwortet die Heizung mit 0x06, spricht sie VS2
+   (Protokoll 300), sonst KW
+3. Geräte-ID (Adresse 0x00F8) im erkannten Protokoll lesen
+
+Das Ergebnis wird pro Schnittstelle als JSON gespeichert, spätere Starts
+überspringen den Probe.
+"""
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import serial
+
+from . import optolink
+from .heating_controller import Framing
+from .kw_sync import KW_SYNC_INTERVAL
+from .optolink import Event, KwDecoder, Vs2Decoder
+from .serial_transport import OptolinkProtocol, create_serial_connection
+
+_LOGGER = logging.getLogger(__name__)
+
+# Zu probierende Baud-Raten (Optolink: 4800 8E2)
+PROBE_BAUDRATES = (4800, 9600)
+
+# Antwort-Timeout für ACK und Geräte-ID (Sekunden)
+PROBE_TIMEOUT = 0.5
+
+# Wartezeit auf das Sync-Byte (etwas mehr als ein Sync-Takt)
+PROBE_SYNC_TIMEOUT = 1.25 * KW_SYNC_INTERVAL
+
+# Adresse und Länge der Geräte-ID (z.B. 0x20CB für Vitotronic 300)
+DEVICE_ID_ADDRESS = 0x00F8
+DEVICE_ID_LENGTH = 2
+
+
+class ProbeResult:
+    """Erkannte Einstellungen einer Heizung."""
+
+    __slots__ = ("framing", "baudrate", "device_id")
+
+    def __init__(self, framing: Framing, baudrate: int, device_id: Optional[str] = None):
+        self.framing = framing
+        self.baudrate = baudrate
+        self.device_id = device_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisiere für den JSON-Cache."""
+        return {
+            "framing": self.framing.value,
+            "baudrate": self.baudrate,
+            "device_id": self.device_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProbeResult":
+        """Lade aus dem JSON-Cache."""
+        return cls(Framing(data["framing"]), int(data["baudrate"]), data.get("device_id"))
+
+    def __repr__(self) -> str:
+        return f"ProbeResult({self.framing.value}, {self.baudrate} Baud, ID {self.device_id})"
+
+
+def load_probe_result(cache_file: Path, port: str) -> Optional[ProbeResult]:
+    """Gespeichertes Ergebnis für ``port`` (blockierend)."""
+    try:
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        entry = cached.get(port)
+        return ProbeResult.from_dict(entry) if entry else None
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        _LOGGER.debug(f"Probe-Cache unbrauchbar: {e}")
+        return None
+
+
+def save_probe_result(cache_file: Path, port: str, result: ProbeResult) -> None:
+    """Speichere Ergebnis für ``port`` (blockierend)."""
+    try:
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = {}
+    cached[port] = result.to_dict()
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(cached), encoding="utf-8")
+    except OSError as e:
+        _LOGGER.warning(f"Konnte Probe-Ergebnis nicht speichern: {e}")
+
+
+async def _read_device_id(protocol: OptolinkProtocol, framing: Framing) -> Optional[str]:
+    """Lese die Geräte-ID im erkannten Protokoll."""
+    protocol.reset()
+    if framing is Framing.FRAMING:
+        protocol.send(optolink.encode_vs2_read(DEVICE_ID_ADDRESS, DEVICE_ID_LENGTH))
+        event = await protocol.next_event({Event.ACK, Event.NAK}, PROBE_TIMEOUT)
+        if event is None or event[0] is Event.NAK:
+            return None
+        event = await protocol.next_event({Event.FRAME, Event.ERROR}, PROBE_TIMEOUT)
+        if event is None or event[0] is Event.ERROR or event[1].is_error:
+            return None
+        data = event[1].data
+    else:
+        protocol.decoder.expect(DEVICE_ID_LENGTH)
+        protocol.send(optolink.encode_kw_read(DEVICE_ID_ADDRESS, DEVICE_ID_LENGTH))
+        event = await protocol.next_event({Event.DATA}, PROBE_TIMEOUT)
+        if event is None:
+            return None
+        data = event[1]
+    return data[:DEVICE_ID_LENGTH].hex().upper()
+
+
+async def _probe_baudrate(port: str, baudrate: int) -> Optional[ProbeResult]:
+    """Probiere eine Baud-Rate."""
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await create_serial_connection(
+            loop,
+            lambda: OptolinkProtocol(Vs2Decoder()),
+            port=port,
+            baudrate=baudrate,
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_EVEN,
+            stopbits=serial.STOPBITS_TWO,
+        )
+    except (serial.SerialException, OSError) as e:
+        _LOGGER.error(f"Fehler beim Öffnen von {port}: {e}")
+        return None
+
+    # connection_made läuft per call_soon
+    await asyncio.sleep(0)
+    try:
+        protocol.reset()
+        protocol.send(bytes([optolink.RESET]))
+        if await protocol.next_event({Event.SYNC}, PROBE_SYNC_TIMEOUT) is None:
+            _LOGGER.debug(f"{port} @ {baudrate}: kein Sync-Byte")
+            return None
+
+        protocol.send(optolink.VS2_SYNC)
+        if await protocol.next_event({Event.ACK}, PROBE_TIMEOUT) is not None:
+            return ProbeResult(
+                Framing.FRAMING, baudrate, await _read_device_id(protocol, Framing.FRAMING)
+            )
+
+        # Kein VS2 - zurück in den KW Modus, auf Sync warten und ID lesen
+        protocol.decoder = KwDecoder()
+        protocol.reset()
+        protocol.send(bytes([optolink.RESET]))
+        if await protocol.next_event({Event.SYNC}, PROBE_SYNC_TIMEOUT) is None:
+            return None
+        device_id = await _read_device_id(protocol, Framing.KW)
+        if device_id is None:
+            # Ein zufälliges 0x05 bei falscher Baud-Rate reicht nicht
+            _LOGGER.debug(f"{port} @ {baudrate}: keine KW Antwort")
+            return None
+        return ProbeResult(Framing.KW, baudrate, device_id)
+
+    except ConnectionError as e:
+        _LOGGER.debug(f"{port} @ {baudrate}: {e}")
+        return None
+    finally:
+        transport.close()
+
+
+async def async_detect(
+    port: str,
+    cache_file: Optional[Path] = None,
+    baudrates: Iterable[int] = PROBE_BAUDRATES,
+    force: bool = False,
+) -> Optional[ProbeResult]:
+    """Erkenne Protokoll, Baud-Rate und Geräte-ID einer Heizung.
+
+    Args:
+        port: Serieller Port (z.B. /dev/ttyUSB0)
+        cache_file: JSON-Datei für gespeicherte Ergebnisse
+        baudrates: Zu probierende Baud-Raten (in dieser Reihenfolge)
+        force: Gespeichertes Ergebnis ignorieren und neu proben
+
+    Returns:
+        Erkannte Einstellungen oder None, wenn keine Heizung antwortet
+    """
+    loop = asyncio.get_running_loop()
+    if cache_file is not None and not force:
+        cached = await loop.run_in_executor(None, load_probe_result, cache_file, port)
+        if cached is not None:
+            _LOGGER.debug(f"Probe-Ergebnis für {port} aus Cache: {cached}")
+            return cached
+
+    for baudrate in baudrates:
+        result = await _probe_baudrate(port, baudrate)
+        if result is None:
+            continue
+        _LOGGER.info(f"✅ Heizung auf {port} erkannt: {result}")
+        if cache_file is not None:
+            await loop.run_in_executor(None, save_probe_result, cache_file, port, result)
+        return result
+
+    _LOGGER.warning(f"Keine Heizung auf {port} erkannt")
+    return None
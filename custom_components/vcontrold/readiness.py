@@ -0,0 +1,80 @@
+"""Readiness-Probe für den vcontrold Daemon.
+
+Statt fest zu warten wird der TCP Port mit kurzem, wachsendem Abstand
+abgefragt, bis vcontrold mit seinem ``vctrld>`` Prompt antwortet - oder die
+Frist abläuft bzw. der Prozess sich vorher beendet.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from .vcontrold_manager import PROMPT
+
+_LOGGER = logging.getLogger(__name__)
+
+INITIAL_BACKOFF = 0.05  # Sekunden
+MAX_BACKOFF = 1.0  # Sekunden
+
+
+async def _prompt_answers(host: str, port: int, timeout: float) -> bool:
+    """Ein Versuch: verbinden und auf den Prompt warten."""
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout
+        )
+        await asyncio.wait_for(reader.readuntil(PROMPT), timeout)
+        return True
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return False
+    finally:
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+async def wait_until_ready(
+    host: str,
+    port: int,
+    timeout: float,
+    process: Optional[asyncio.subprocess.Process] = None,
+) -> bool:
+    """Warte bis vcontrold auf ``host:port`` den Prompt sendet.
+
+    Args:
+        host: Daemon Host
+        port: Daemon Port
+        timeout: Gesamtfrist in Sekunden
+        process: Gestarteter Daemon - beendet er sich, wird sofort abgebrochen
+
+    Returns:
+        True sobald der Prompt kommt, False bei Fristablauf oder Prozessende
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    backoff = INITIAL_BACKOFF
+    attempts = 0
+
+    while True:
+        if process is not None and process.returncode is not None:
+            _LOGGER.error(f"❌ vcontrold beendet sich beim Start (Exit Code: {process.returncode})")
+            return False
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _LOGGER.error(f"❌ vcontrold antwortet nach {timeout:.0f}s nicht auf {host}:{port} ({attempts} Versuche)")
+            return False
+
+        attempts += 1
+        if await _prompt_answers(host, port, min(remaining, MAX_BACKOFF * 2)):
+            _LOGGER.debug(
+                f"vcontrold bereit nach {time.monotonic() - start:.2f}s ({attempts} Versuche)"
+            )
+            return True
+
+        await asyncio.sleep(min(backoff, max(deadline - time.monotonic(), 0)))
+        backoff = min(backoff * 2, MAX_BACKOFF)
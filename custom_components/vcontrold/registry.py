@@ -0,0 +1,342 @@
+"""Befehls-Registry - datengetrieben aus vcontrolds vito.xml / vcontrold.xml.
+
+Die Definitionen (Adresse, Länge, Einheit, Typ, Geräte-ID) werden einmal
+geparst, in eine indizierte In-Memory Tabelle überführt (O(1) Lookups nach
+Name und Adresse) und als JSON auf der Platte gecacht. Ohne XML-Dateien
+greift ein eingebauter Satz an Vitotronic 300 Datenpunkten.
+"""
+import json
+import logging
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version des Cache-Formats - bei Änderungen hochzählen
+CACHE_VERSION = 3
+
+# vcontrold Einheit -> Datenpunkt-Typ (Fallback ohne vcontrold.xml)
+DEFAULT_UNITS = {
+    "UT": {"type": "short", "scale": 10.0, "unit": "°C"},
+    "UT1": {"type": "char", "scale": 2.0, "unit": "°C"},
+    "UT1U": {"type": "uchar", "scale": 1.0, "unit": "°C"},
+    "UTI": {"type": "short", "scale": 10.0, "unit": "°C"},
+    "PR": {"type": "uchar", "scale": 2.0, "unit": "%"},
+    "CO": {"type": "uint", "scale": 1.0, "unit": None},
+    "CS": {"type": "uint", "scale": 3600.0, "unit": "h"},
+    "BA": {"type": "uchar", "scale": 1.0, "unit": None},
+    "ST": {"type": "uchar", "scale": 1.0, "unit": None},
+    "RT": {"type": "uchar", "scale": 1.0, "unit": None},
+    "TI": {"type": "systime", "scale": 1.0, "unit": None},
+    "CT": {"type": "cycletime", "scale": 1.0, "unit": None},
+    "ES": {"type": "errstate", "scale": 1.0, "unit": None},
+}
+
+# Eingebaute Datenpunkte (Vitotronic 300), falls keine vito.xml vorliegt
+BUILTIN_DATAPOINTS = [
+    {"name": "getTempAussen", "address": 0x0800, "length": 2, "unit": "UT",
+     "description": "Außentemperatur"},
+    {"name": "getTempKessel", "address": 0x0802, "length": 2, "unit": "UT",
+     "description": "Kesseltemperatur"},
+    {"name": "getTempWWist", "address": 0x0804, "length": 2, "unit": "UT",
+     "description": "Warmwasser Isttemperatur"},
+    {"name": "getTempVorlaufHK1", "address": 0x2900, "length": 2, "unit": "UT",
+     "description": "Heizkreis 1 Vorlauftemperatur"},
+    {"name": "getTempWWsoll", "address": 0x6300, "length": 1, "unit": "UT1U",
+     "description": "Warmwasser Solltemperatur"},
+    {"name": "setTempWWsoll", "address": 0x6300, "length": 1, "unit": "UT1U",
+     "minimum": 20, "maximum": 80, "description": "Warmwasser Solltemperatur setzen"},
+    {"name": "getBetriebsart", "address": 0x2323, "length": 1, "unit": "BA",
+     "description": "Betriebsart"},
+    {"name": "setBetriebsart", "address": 0x2323, "length": 1, "unit": "BA",
+     "description": "Betriebsart setzen"},
+    {"name": "getBrennerStarts", "address": 0x088A, "length": 4, "unit": "CO",
+     "description": "Brennerstarts"},
+    {"name": "getBrennerStunden1", "address": 0x08A7, "length": 4, "unit": "CS",
+     "description": "Brennerstunden Stufe 1"},
+    {"name": "getSystemTime", "address": 0x088E, "length": 8, "unit": "TI",
+     "description": "Systemzeit"},
+    {"name": "getTimerWW", "address": 0x2100, "length": 56, "unit": "CT",
+     "description": "Schaltzeiten Warmwasser"},
+    {"name": "getFehlerHistorie", "address": 0x7507, "length": 90, "unit": "ES",
+     "description": "Fehlerhistorie (10 Einträge)"},
+]
+
+_CALC_RE = re.compile(r"^\s*V\s*([*/])\s*([0-9.]+)\s*$")
+
+
+class Datapoint:
+    """Definition eines Datenpunkts / Befehls."""
+
+    __slots__ = ("name", "address", "length", "unit", "type", "scale", "unit_text",
+                 "description", "device_ids", "enum", "minimum", "maximum")
+
+    def __init__(
+        self,
+        name: str,
+        address: int,
+        length: int,
+        unit: Optional[str] = None,
+        type: Optional[str] = None,
+        scale: float = 1.0,
+        unit_text: Optional[str] = None,
+        description: str = "",
+        device_ids: Optional[List[str]] = None,
+        enum: Optional[Dict[str, str]] = None,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+    ):
+        """Initialisiere Datenpunkt."""
+        self.name = name
+        self.address = address
+        self.length = length
+        self.unit = unit
+        self.type = type
+        self.scale = scale
+        self.unit_text = unit_text
+        self.description = description
+        self.device_ids = device_ids or []
+        self.enum = enum
+        # Zulässiger Bereich für Schreibbefehle (None = nur durch den Typ begrenzt)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def writable(self) -> bool:
+        """Schreibbefehl?"""
+        return self.name.startswith("set")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisiere für den JSON-Cache."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Datapoint":
+        """Lade aus dem JSON-Cache."""
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return f"Datapoint({self.name}, 0x{self.address:04X}, len={self.length}, {self.unit})"
+
+
+class CommandRegistry:
+    """Indizierte Tabelle aller bekannten Datenpunkte."""
+
+    def __init__(self, datapoints: Iterable[Datapoint], device_id: Optional[str] = None):
+        """Initialisiere Registry."""
+        self.device_id = device_id
+        self._by_name: Dict[str, Datapoint] = {}
+        self._by_address: Dict[int, List[Datapoint]] = {}
+        for datapoint in datapoints:
+            self._by_name[datapoint.name] = datapoint
+            self._by_address.setdefault(datapoint.address, []).append(datapoint)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[Datapoint]:
+        return iter(self._by_name.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def get(self, name: str) -> Optional[Datapoint]:
+        """Datenpunkt nach Befehlsname."""
+        return self._by_name.get(name)
+
+    def by_address(self, address: int) -> List[Datapoint]:
+        """Alle Datenpunkte (Getter/Setter) an einer Adresse."""
+        return self._by_address.get(address, [])
+
+    def getter_for(self, setter: str) -> Optional[str]:
+        """Getter mit derselben Adresse wie der Setter."""
+        datapoint = self._by_name.get(setter)
+        if datapoint is None:
+            return None
+        for candidate in self.by_address(datapoint.address):
+            if not candidate.writable:
+                return candidate.name
+        return None
+
+    @classmethod
+    def builtin(cls) -> "CommandRegistry":
+        """Registry aus den eingebauten Datenpunkten."""
+        datapoints = []
+        for entry in BUILTIN_DATAPOINTS:
+            unit = DEFAULT_UNITS.get(entry["unit"], {})
+            datapoints.append(
+                Datapoint(
+                    type=unit.get("type"),
+                    scale=unit.get("scale", 1.0),
+                    unit_text=unit.get("unit"),
+                    **entry,
+                )
+            )
+        return cls(datapoints)
+
+
+def _parse_units(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Lese Einheiten aus vcontrold.xml."""
+    units = {abbrev: dict(unit) for abbrev, unit in DEFAULT_UNITS.items()}
+    root = ET.parse(path).getroot()
+
+    for element in root.iter("unit"):
+        abbrev = element.findtext("abbrev")
+        if not abbrev:
+            continue
+        unit: Dict[str, Any] = {
+            "type": element.findtext("type"),
+            "scale": 1.0,
+            "unit": element.findtext("entity"),
+        }
+        calc = element.find("calc")
+        if calc is not None:
+            match = _CALC_RE.match(calc.get("get", ""))
+            if match:
+                factor = float(match.group(2))
+                unit["scale"] = factor if match.group(1) == "/" else 1.0 / factor
+        enum = {
+            item.get("bytes", "").replace(" ", "").lower(): item.get("text", "")
+            for item in element.iter("enum")
+            if item.get("bytes") is not None
+        }
+        if enum:
+            unit["enum"] = enum
+        units[abbrev.strip()] = unit
+
+    return units
+
+
+def _parse_commands(
+    path: Path, units: Dict[str, Dict[str, Any]], device_id: Optional[str]
+) -> List[Datapoint]:
+    """Lese Befehle aus vito.xml.
+
+    Unterstützt Adresse/Länge/Einheit direkt am ``<command>`` sowie
+    gerätespezifische Überschreibungen in ``<device ID="...">``.
+    """
+    root = ET.parse(path).getroot()
+    datapoints = []
+
+    for element in root.iter("command"):
+        name = element.get("name")
+        if not name:
+            continue
+
+        fields = {
+            "addr": element.findtext("addr"),
+            "len": element.findtext("len"),
+            "unit": element.findtext("unit"),
+        }
+        device_ids = []
+        for device in element.findall("device"):
+            device_ids.append(device.get("ID", ""))
+            if device_id is not None and device.get("ID", "").lower() == device_id.lower():
+                for key in fields:
+                    fields[key] = device.get(key) or device.findtext(key) or fields[key]
+
+        if device_id is not None and device_ids and device_id.lower() not in (
+            known.lower() for known in device_ids
+        ):
+            continue  # Befehl gibt es für dieses Gerät nicht
+        if not fields["addr"] or not fields["len"]:
+            continue  # z.B. reine Protokollbefehle ohne Adresse
+
+        try:
+            address = int(fields["addr"].strip(), 16)
+            length = int(fields["len"].strip())
+        except ValueError:
+            _LOGGER.debug(f"Überspringe Befehl {name}: ungültige Adresse/Länge")
+            continue
+
+        abbrev = (fields["unit"] or "").strip() or None
+        unit = units.get(abbrev, {}) if abbrev else {}
+        datapoints.append(
+            Datapoint(
+                name=name,
+                address=address,
+                length=length,
+                unit=abbrev,
+                type=unit.get("type"),
+                scale=unit.get("scale", 1.0),
+                unit_text=unit.get("unit"),
+                description=(element.findtext("description") or "").strip(),
+                device_ids=device_ids,
+                enum=unit.get("enum"),
+            )
+        )
+
+    return datapoints
+
+
+def load_registry(
+    search_dirs: Iterable[Path],
+    cache_file: Optional[Path] = None,
+    device_id: Optional[str] = None,
+) -> CommandRegistry:
+    """Lade Registry aus vito.xml (mit Platten-Cache) oder eingebaut.
+
+    Blockierend (Datei-I/O und XML-Parsing) - in Home Assistant über den
+    Executor aufrufen.
+
+    Args:
+        search_dirs: Verzeichnisse, in denen vito.xml / vcontrold.xml gesucht werden
+        cache_file: JSON-Cache für das Parse-Ergebnis
+        device_id: Geräte-ID (z.B. "20CB") für gerätespezifische Befehle
+    """
+    vito_xml = None
+    for directory in search_dirs:
+        candidate = Path(directory) / "vito.xml"
+        if candidate.is_file():
+            vito_xml = candidate
+            break
+
+    if vito_xml is None:
+        _LOGGER.debug("Keine vito.xml gefunden - nutze eingebaute Datenpunkte")
+        return CommandRegistry.builtin()
+
+    units_xml = vito_xml.with_name("vcontrold.xml")
+    sources = [vito_xml] + ([units_xml] if units_xml.is_file() else [])
+    cache_key = {
+        "version": CACHE_VERSION,
+        "device_id": device_id,
+        "sources": [[str(path), path.stat().st_mtime_ns, path.stat().st_size] for path in sources],
+    }
+
+    if cache_file is not None and cache_file.is_file():
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            if cached.get("key") == cache_key:
+                datapoints = [Datapoint.from_dict(entry) for entry in cached["datapoints"]]
+                _LOGGER.debug(f"Registry aus Cache geladen ({len(datapoints)} Datenpunkte)")
+                return CommandRegistry(datapoints, device_id)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _LOGGER.debug(f"Registry-Cache unbrauchbar: {e}")
+
+    try:
+        units = _parse_units(units_xml) if units_xml.is_file() else DEFAULT_UNITS
+        datapoints = _parse_commands(vito_xml, units, device_id)
+    except (OSError, ET.ParseError) as e:
+        _LOGGER.error(f"Fehler beim Lesen von {vito_xml}: {e} - nutze eingebaute Datenpunkte")
+        return CommandRegistry.builtin()
+
+    # Eingebaute Namen, die die Integration selbst nutzt, bleiben verfügbar
+    names = {datapoint.name for datapoint in datapoints}
+    datapoints.extend(
+        datapoint for datapoint in CommandRegistry.builtin() if datapoint.name not in names
+    )
+    _LOGGER.info(f"✅ {len(datapoints)} Datenpunkte aus {vito_xml} geladen")
+
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(
+                json.dumps({"key": cache_key, "datapoints": [dp.to_dict() for dp in datapoints]}),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            _LOGGER.warning(f"Konnte Registry-Cache nicht schreiben: {e}")
+
+    return CommandRegistry(datapoints, device_id)
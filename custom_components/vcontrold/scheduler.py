@@ -0,0 +1,143 @@
+"""Gestaffelter, adaptiver Polling-Scheduler für den Coordinator.
+
+Jeder Datenpunkt gehört zu einer Polling-Stufe (z.B. 10 s für Vorlauf und
+Brenner, 15 min für Sollwerte). Innerhalb einer Stufe werden die Reads über
+das Intervall verteilt statt gebündelt. Ändert sich ein Wert über mehrere
+Reads nicht, rutscht er eine Stufe langsamer; ändert er sich, eine schneller.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _PollState:
+    """Polling-Zustand eines Datenpunkts."""
+
+    __slots__ = ("base_tier", "tier", "phase", "next_due", "last_value", "stable_reads", "reads")
+
+    def __init__(self, tier: int):
+        self.base_tier = tier
+        self.tier = tier
+        self.phase = 1.0  # Anteil des Intervalls bis zum zweiten Read
+        self.next_due: Optional[float] = None  # None = sofort fällig
+        self.last_value: Any = None
+        self.stable_reads = 0
+        self.reads = 0
+
+
+class PollScheduler:
+    """Entscheidet pro Tick, welche Datenpunkte gelesen werden."""
+
+    def __init__(
+        self,
+        tiers: Sequence[int],
+        intervals: Dict[str, int],
+        default_interval: int,
+        stable_reads: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialisiere Scheduler.
+
+        Args:
+            tiers: Verfügbare Polling-Intervalle in Sekunden (aufsteigend)
+            intervals: Start-Intervall pro Datenpunkt
+            default_interval: Intervall für Datenpunkte ohne Eintrag
+            stable_reads: Unveränderte Reads bis zur nächst langsameren Stufe
+            clock: Zeitquelle (monoton)
+        """
+        self.tiers = sorted(tiers)
+        self.intervals = intervals
+        self.default_interval = default_interval
+        self.stable_reads = stable_reads
+        self._clock = clock
+        self._states: Dict[str, _PollState] = {}
+
+    def _tier_for(self, interval: int) -> int:
+        """Finde die Stufe, die zum Intervall passt (nächst schnellere)."""
+        for index, tier in enumerate(self.tiers):
+            if interval <= tier:
+                return index
+        return len(self.tiers) - 1
+
+    def set_datapoints(self, keys: Iterable[str]) -> None:
+        """Lege die zu pollenden Datenpunkte fest.
+
+        Bereits bekannte Datenpunkte behalten ihren Zustand, neue sind sofort
+        fällig. Innerhalb jeder Stufe werden die Reads gleichmäßig über das
+        Intervall verteilt.
+        """
+        keys = list(dict.fromkeys(keys))
+        self._states = {
+            key: self._states.get(key)
+            or _PollState(self._tier_for(self.intervals.get(key, self.default_interval)))
+            for key in keys
+        }
+        self._spread()
+
+    def _spread(self) -> None:
+        """Verteile die Datenpunkte jeder Stufe über deren Intervall."""
+        by_tier: Dict[int, List[_PollState]] = {}
+        for state in self._states.values():
+            by_tier.setdefault(state.tier, []).append(state)
+        for states in by_tier.values():
+            for index, state in enumerate(states):
+                state.phase = (index + 1) / len(states)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Liefere alle Datenpunkte, die jetzt gelesen werden sollen."""
+        now = self._clock() if now is None else now
+        return [
+            key for key, state in self._states.items()
+            if state.next_due is None or state.next_due <= now
+        ]
+
+    def record(self, key: str, value: Any, now: Optional[float] = None) -> None:
+        """Verbuche einen Read und passe die Stufe an."""
+        state = self._states.get(key)
+        if state is None:
+            return
+        now = self._clock() if now is None else now
+
+        first_read = state.reads == 0
+        state.reads += 1
+        tier = state.tier
+
+        if value is not None and not first_read:
+            if value == state.last_value:
+                state.stable_reads += 1
+                # Wert stabil - langsamer pollen (höchstens 2 Stufen)
+                if state.stable_reads >= self.stable_reads:
+                    tier = min(tier + 1, state.base_tier + 2, len(self.tiers) - 1)
+                    state.stable_reads = 0
+            else:
+                # Wert ändert sich - schneller pollen (höchstens 1 Stufe)
+                tier = max(tier - 1, state.base_tier - 1, 0)
+                state.stable_reads = 0
+        if value is not None:
+            state.last_value = value
+
+        interval = self.tiers[tier]
+        if tier != state.tier:
+            _LOGGER.debug(f"{key}: Polling-Intervall {self.tiers[state.tier]}s -> {interval}s")
+            state.tier = tier
+            self._spread()
+        elif first_read:
+            # Erster Read: Folgereads über das Intervall staffeln
+            interval *= state.phase
+        state.next_due = now + interval
+
+    def expedite(self, key: str) -> None:
+        """Datenpunkt beim nächsten Tick lesen (z.B. nach einem Schreibbefehl)."""
+        state = self._states.get(key)
+        if state is not None:
+            state.next_due = None
+
+    def get_stats(self) -> dict:
+        """Hole Scheduler-Statistik."""
+        return {
+            "datapoints": len(self._states),
+            "intervals": {key: self.tiers[state.tier] for key, state in self._states.items()},
+            "reads": sum(state.reads for state in self._states.values()),
+        }
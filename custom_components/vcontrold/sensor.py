@@ -1,7 +1,9 @@
 """Sensoren für vcontrold Integration."""
 import asyncio
 import logging
+import time
 from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -9,9 +11,11 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTemperature, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
@@ -19,12 +23,42 @@ from homeassistant.helpers.update_coordinator import (
 )
 
 from . import DOMAIN
-from .const import DEFAULT_UPDATE_INTERVAL
-from .heating_controller import ViessmannHeatingController
+from .backend import HeatingBackend
+from .const import (
+    CONF_UPDATE_INTERVAL,
+    DAEMON_LOG_SENSORS,
+    DEFAULT_DEADBAND,
+    DEFAULT_UPDATE_INTERVAL,
+    MAX_REPORT_INTERVAL,
+    MIN_REPORT_INTERVAL,
+    MODE_VALUES,
+    POLL_INTERVALS,
+    POLL_TIERS,
+    SCHEDULER_TICK,
+    SENSOR_DEADBANDS,
+    VITOTRONIC_300_SENSORS,
+)
+from .daemon_manager import VcontroledDaemonManager
+from .datapoint_types import datapoint_codec
+from .registry import CommandRegistry
+from .scheduler import PollScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=DEFAULT_UPDATE_INTERVAL)
+# Getter der Betriebsart (Zahl -> Name in ``VcontroledModeSensor``)
+MODE_GETTER = "getBetriebsart"
+
+SCAN_INTERVAL = timedelta(seconds=SCHEDULER_TICK)
+
+# Einheiten aus vcontrold.xml -> Home Assistant
+UNIT_MAP = {
+    "°C": UnitOfTemperature.CELSIUS,
+    "Grad Celsius": UnitOfTemperature.CELSIUS,
+    "%": PERCENTAGE,
+    "Prozent": PERCENTAGE,
+    "h": UnitOfTime.HOURS,
+    "Stunden": UnitOfTime.HOURS,
+}
 
 
 async def async_setup_entry(
@@ -35,56 +69,123 @@ async def async_setup_entry(
     """Richte Sensoren ein."""
     _LOGGER.debug("Richte Sensoren ein")
     
-    controller: ViessmannHeatingController = hass.data[DOMAIN][entry.entry_id]
+    controller: HeatingBackend = hass.data[DOMAIN][entry.entry_id]
     
     # Erstelle Coordinator für Datenupdates
-    coordinator = VcontroledDataUpdateCoordinator(hass, controller)
+    update_interval = entry.options.get(
+        CONF_UPDATE_INTERVAL,
+        entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+    )
+    coordinator = VcontroledDataUpdateCoordinator(hass, controller, update_interval)
+    
+    # Nach einem Schreibbefehl den Getter im nächsten Tick lesen - nicht
+    # erst im regulären Intervall (Sollwerte: bis zu 15 min)
+    entry.async_on_unload(controller.add_write_listener(coordinator.scheduler.expedite))
+    
+    # Erstelle Sensor-Entities aus dem Befehlskatalog des Geräts
+    sensors = _build_sensors(coordinator, controller.registry)
+    
+    # Gepollt werden nur aktivierte Entities - danach halten die Entities
+    # den Read-Set beim Aktivieren/Deaktivieren selbst aktuell
+    entity_registry = er.async_get(hass)
+    
+    def _is_enabled(sensor: "VcontroledSensor") -> bool:
+        entity_id = entity_registry.async_get_entity_id("sensor", DOMAIN, sensor.unique_id)
+        if entity_id is None:
+            return sensor.entity_registry_enabled_default
+        return not entity_registry.async_get(entity_id).disabled
+    
+    coordinator.async_set_datapoints(
+        sensor.sensor_type for sensor in sensors if _is_enabled(sensor)
+    )
     
     # Hole erste Daten
     await coordinator.async_config_entry_first_refresh()
     
-    # Erstelle Sensor-Entities
-    sensors = [
-        VcontroledTemperatureSensor(
-            coordinator,
-            "getTempKessel",
-            "Kesseltemperatur",
-            "kesseltemperatur",
-        ),
-        VcontroledTemperatureSensor(
-            coordinator,
-            "getTempAussen",
-            "Außentemperatur",
-            "aussentemperatur",
-        ),
-        VcontroledTemperatureSensor(
-            coordinator,
-            "getTempWWsoll",
-            "Warmwasser-Solltemperatur",
-            "warmwasser_solltemperatur",
-        ),
-        VcontroledTemperatureSensor(
-            coordinator,
-            "getTempWWist",
-            "Warmwasser-Isttemperatur",
-            "warmwasser_isttemperatur",
-        ),
-        VcontroledTemperatureSensor(
-            coordinator,
-            "getTempVorlaufHK1",
-            "Heizkreis Vorlauftemperatur",
-            "heizkreis_vorlauftemperatur",
-        ),
-    ]
+    # Diagnose-Zähler aus dem Log des integrierten Daemons
+    daemon_manager = hass.data[DOMAIN].get("daemon_manager")
+    diagnostics = []
+    if daemon_manager is not None:
+        diagnostics = [
+            VcontroledDaemonLogSensor(
+                coordinator, daemon_manager, counter, definition["name"], definition["icon"]
+            )
+            for counter, definition in DAEMON_LOG_SENSORS.items()
+        ]
     
-    async_add_entities(sensors)
-    _LOGGER.debug(f"{len(sensors)} Sensoren hinzugefügt")
+    async_add_entities(sensors + diagnostics)
+    _LOGGER.debug(f"{len(sensors)} Sensoren und {len(diagnostics)} Diagnose-Zähler hinzugefügt")
+
+
+def _build_sensors(
+    coordinator: "VcontroledDataUpdateCoordinator", registry: CommandRegistry
+) -> list:
+    """Erzeuge Entities für alle lesbaren Datenpunkte der Registry.
+
+    Die typischen Vitotronic 300 Sensoren sind aktiviert, alle übrigen
+    Datenpunkte werden deaktiviert angelegt und kosten erst Buszeit, wenn
+    der Benutzer sie aktiviert. Tabellen (Schaltzeiten, Fehlerhistorie)
+    passen in keinen Sensor-Zustand und bekommen keine Entity.
+    """
+    sensors = []
+    for datapoint in registry:
+        if datapoint.writable:
+            continue
+        codec = datapoint_codec(datapoint)
+        if codec is not None and not codec.scalar:
+            continue
+        
+        definition = VITOTRONIC_300_SENSORS.get(datapoint.name)
+        if definition is not None:
+            sensors.append(
+                VcontroledTemperatureSensor(
+                    coordinator,
+                    datapoint.name,
+                    definition["name"],
+                    definition["key"],
+                )
+            )
+            continue
+        
+        unit = UNIT_MAP.get(datapoint.unit_text)
+        if datapoint.name == MODE_GETTER:
+            sensor_cls = VcontroledModeSensor
+        elif unit == UnitOfTemperature.CELSIUS:
+            sensor_cls = VcontroledTemperatureSensor
+        else:
+            sensor_cls = VcontroledSensor
+        sensors.append(
+            sensor_cls(
+                coordinator,
+                datapoint.name,
+                datapoint.description or datapoint.name,
+                datapoint.name.lower(),
+                unit=unit,
+                numeric=(codec is None or codec.numeric) and sensor_cls is not VcontroledModeSensor,
+                enabled_default=False,
+            )
+        )
+    return sensors
 
 
 class VcontroledDataUpdateCoordinator(DataUpdateCoordinator):
-    """Coordinator für Datenupdates."""
+    """Coordinator für Datenupdates.
+
+    Läuft im kurzen ``SCHEDULER_TICK`` und liest pro Tick nur die Sensoren,
+    die laut ``PollScheduler`` fällig sind; ein geschriebener Datenpunkt wird
+    im nächsten Tick neu gelesen. Ticks ohne fällige Sensoren
+    benachrichtigen keine Entities. Ob ein neuer Wert tatsächlich in die
+    State Machine geschrieben wird, entscheiden die Entities selbst (Deadband
+    und Heartbeat); unterdrückte Writes gelesener Datenpunkte werden hier
+    gezählt.
+    """
 
-    def __init__(self, hass: HomeAssistant, controller: ViessmannHeatingController):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        controller: HeatingBackend,
+        update_interval: int = DEFAULT_UPDATE_INTERVAL,
+    ):
         """Initialisiere Coordinator."""
         super().__init__(
             hass,
@@ -93,45 +194,112 @@ class VcontroledDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=SCAN_INTERVAL,
         )
         self.controller = controller
+        self.state_writes = 0
+        self.suppressed_writes = 0
+        # Im letzten Tick gelesene Datenpunkte (leer = nichts fällig)
+        self.last_read: Set[str] = set()
+        self._failing = False
+        self._notified_success = True
+        self._tick_listeners: List[CALLBACK_TYPE] = []
+        # Konfiguriertes Intervall skaliert alle Stufen - 120 s statt 60 s
+        # pollt jeden Datenpunkt halb so oft
+        scale = update_interval / DEFAULT_UPDATE_INTERVAL
+        self.scheduler = PollScheduler(
+            tiers=[max(round(tier * scale), SCHEDULER_TICK) for tier in POLL_TIERS],
+            intervals={key: interval * scale for key, interval in POLL_INTERVALS.items()},
+            default_interval=update_interval,
+        )
+        self._datapoints: Dict[str, None] = {}
+
+    @callback
+    def async_set_datapoints(self, sensor_types: Iterable[str]) -> None:
+        """Lege die zu pollenden Datenpunkte fest."""
+        self._datapoints = dict.fromkeys(sensor_types)
+        self.scheduler.set_datapoints(self._datapoints)
+        _LOGGER.debug(f"Polling für {len(self._datapoints)} Datenpunkte")
+
+    @callback
+    def async_add_datapoint(self, sensor_type: str) -> None:
+        """Datenpunkt in den Read-Set aufnehmen (Entity aktiviert)."""
+        if sensor_type not in self._datapoints:
+            self.async_set_datapoints([*self._datapoints, sensor_type])
+
+    @callback
+    def async_remove_datapoint(self, sensor_type: str) -> None:
+        """Datenpunkt aus dem Read-Set nehmen (Entity deaktiviert/entfernt)."""
+        if sensor_type in self._datapoints:
+            self.async_set_datapoints(
+                [other for other in self._datapoints if other != sensor_type]
+            )
+
+    @callback
+    def async_add_tick_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listener für jeden Tick - auch ohne Read und während Fehlern.
+        
+        Returns:
+            Callback zum Abmelden
+        """
+        self._tick_listeners.append(listener)
+        return lambda: self._tick_listeners.remove(listener)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Entities nur benachrichtigen, wenn gelesen wurde oder sich der Zustand änderte."""
+        if self.last_read or self.last_update_success != self._notified_success:
+            self._notified_success = self.last_update_success
+            super().async_update_listeners()
 
     async def _async_update_data(self):
         """Hole Daten von vcontrold."""
+        for listener in self._tick_listeners:
+            listener()
+        
+        # Nur fällige Sensoren lesen
+        sensors = self.scheduler.due()
+        self.last_read = set()
+        if not sensors:
+            return self.data
+        
         try:
-            _LOGGER.debug("Aktualisiere Daten von Heizung")
-            
-            # Lese alle Sensoren
-            data = {}
-            sensors = [
-                "getTempKessel",
-                "getTempAussen",
-                "getTempWWsoll",
-                "getTempWWist",
-                "getTempVorlaufHK1",
-            ]
-            
-            for sensor in sensors:
-                try:
-                    temp = await self.hass.async_add_executor_job(
-                        self.controller.get_temperature, sensor
-                    )
-                    data[sensor] = temp
-                except Exception as e:
-                    _LOGGER.warning(f"Fehler beim Auslesen von {sensor}: {e}")
-                    data[sensor] = None
-            
-            return data
+            _LOGGER.debug(f"Aktualisiere {sensors} von Heizung")
             
+            # Ein gebündelter Round Trip für alle fälligen Sensoren
+            values = await self.controller.read_many(sensors, use_cache=False)
         except Exception as e:
-            _LOGGER.error(f"Fehler beim Aktualisieren der Daten: {e}")
-            raise UpdateFailed(f"vcontrold Datenfehler: {e}")
+            # Einmal melden (z.B. Daemon-Neustart), danach nur noch Debug -
+            # der Coordinator loggt den Wechsel auf "nicht verfügbar" selbst
+            if not self._failing:
+                _LOGGER.warning(f"⚠️ Fehler beim Aktualisieren der Daten: {e}")
+            else:
+                _LOGGER.debug(f"Aktualisierung weiterhin fehlgeschlagen: {e}")
+            self._failing = True
+            raise UpdateFailed(f"vcontrold Datenfehler: {e}") from e
+        
+        if self._failing:
+            _LOGGER.info("✅ Heizung wieder erreichbar")
+            self._failing = False
+        
+        for sensor, value in values.items():
+            self.scheduler.record(sensor, value)
+        self.last_read = set(values)
+        
+        data = dict(self.data or {})
+        data.update(values)
+        return data
 
+    def get_stats(self) -> dict:
+        """Hole Coordinator-Statistik."""
+        return {
+            "scheduler": self.scheduler.get_stats(),
+            "state_writes": self.state_writes,
+            "suppressed_writes": self.suppressed_writes,
+        }
 
-class VcontroledTemperatureSensor(CoordinatorEntity, SensorEntity):
-    """Temperatur-Sensor Entity."""
 
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
+class VcontroledSensor(CoordinatorEntity, SensorEntity):
+    """Sensor Entity für einen Datenpunkt."""
+
     _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
     _attr_has_entity_name = True
 
     def __init__(
@@ -140,28 +308,241 @@ class VcontroledTemperatureSensor(CoordinatorEntity, SensorEntity):
         sensor_type: str,
         name: str,
         key: str,
+        deadband: Optional[float] = None,
+        min_report_interval: float = MIN_REPORT_INTERVAL,
+        max_report_interval: float = MAX_REPORT_INTERVAL,
+        unit: Optional[str] = None,
+        numeric: bool = True,
+        enabled_default: bool = True,
     ):
-        """Initialisiere Sensor."""
+        """Initialisiere Sensor.
+        
+        Args:
+            deadband: Minimale Änderung, die einen State-Write auslöst
+                (Standard: SENSOR_DEADBANDS bzw. DEFAULT_DEADBAND)
+            min_report_interval: Mindestabstand zwischen zwei Writes (Sekunden)
+            max_report_interval: Heartbeat - spätestens dann wird geschrieben
+            unit: Einheit (Standard: Einheit der Klasse)
+            numeric: False für Text-/Enum-Werte (ohne State Class)
+            enabled_default: Entity standardmäßig aktiviert
+        """
         super().__init__(coordinator)
         self._sensor_type = sensor_type
         self._name = name
         self._key = key
+        self._deadband = (
+            SENSOR_DEADBANDS.get(sensor_type, DEFAULT_DEADBAND)
+            if deadband is None
+            else deadband
+        )
+        self._min_report_interval = min_report_interval
+        self._max_report_interval = max_report_interval
+        
+        # Zuletzt geschriebener Zustand
+        self._reported_value = None
+        self._reported_available = False
+        self._last_report: Optional[float] = None
+        # Geplanter Write für eine Änderung innerhalb von min_report_interval
+        self._deferred_write: Optional[CALLBACK_TYPE] = None
         
         # Eindeutige ID
         self._attr_unique_id = f"vcontrold_{key}"
         self._attr_name = name
+        self._attr_entity_registry_enabled_default = enabled_default
+        if unit is not None:
+            self._attr_native_unit_of_measurement = unit
+        if not numeric:
+            self._attr_state_class = None
 
     @property
-    def native_value(self):
-        """Rückgabe aktueller Wert."""
+    def sensor_type(self) -> str:
+        """Befehl/Datenpunkt dieses Sensors."""
+        return self._sensor_type
+
+    def _current_value(self):
+        """Aktueller Wert aus dem Coordinator."""
         if self.coordinator.data is None:
             return None
         return self.coordinator.data.get(self._sensor_type)
 
+    @property
+    def native_value(self):
+        """Rückgabe des zuletzt gemeldeten Werts."""
+        if self._last_report is None:
+            return self._current_value()
+        return self._reported_value
+
+    async def async_added_to_hass(self) -> None:
+        """Entity hinzugefügt - initialer State wird von HA geschrieben."""
+        await super().async_added_to_hass()
+        self.coordinator.async_add_datapoint(self._sensor_type)
+        self._mark_reported(time.monotonic())
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Entity entfernt/deaktiviert - Datenpunkt nicht mehr pollen."""
+        self._cancel_deferred_write()
+        self.coordinator.async_remove_datapoint(self._sensor_type)
+        await super().async_will_remove_from_hass()
+
+    def _mark_reported(self, now: float) -> None:
+        """Merke den geschriebenen Zustand."""
+        self._reported_value = self._current_value()
+        self._reported_available = self._is_available(self._reported_value)
+        self._last_report = now
+
+    def _is_available(self, value) -> bool:
+        """Verfügbarkeit für einen Wert."""
+        return self.coordinator.last_update_success and value is not None
+
+    def _should_report(self, value, now: float) -> bool:
+        """Entscheide ob ein State-Write nötig ist."""
+        if self._last_report is None:
+            return True
+        
+        # Verfügbarkeitswechsel immer sofort melden
+        if self._is_available(value) != self._reported_available:
+            return True
+        
+        elapsed = now - self._last_report
+        if elapsed >= self._max_report_interval:
+            return True  # Heartbeat
+        if elapsed < self._min_report_interval:
+            return False
+        return self._changed(value)
+
+    def _changed(self, value) -> bool:
+        """Weicht der Wert (um mindestens die Deadband) vom gemeldeten ab?"""
+        if value is None:
+            return False
+        if isinstance(value, (int, float)) and isinstance(self._reported_value, (int, float)):
+            return abs(value - self._reported_value) >= self._deadband
+        return value != self._reported_value
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Schreibe State nur bei echter Änderung oder Heartbeat."""
+        now = time.monotonic()
+        value = self._current_value()
+        if not self._should_report(value, now):
+            if self._sensor_type in self.coordinator.last_read:
+                self.coordinator.suppressed_writes += 1
+            if self._deferred_write is None and self._changed(value):
+                # Echte Änderung, nur zu früh - nach Ablauf des Mindestabstands
+                # schreiben statt bis zum nächsten Read/Heartbeat zu warten
+                self._deferred_write = async_call_later(
+                    self.hass,
+                    self._last_report + self._min_report_interval - now,
+                    self._async_write_deferred,
+                )
+            return
+        
+        self._write_state(now)
+
+    @callback
+    def _async_write_deferred(self, _now) -> None:
+        """Zurückgehaltene Änderung schreiben (falls sie noch gilt)."""
+        self._deferred_write = None
+        value = self._current_value()
+        if self._changed(value) or self._is_available(value) != self._reported_available:
+            self._write_state(time.monotonic())
+
+    def _cancel_deferred_write(self) -> None:
+        """Geplanten Write verwerfen."""
+        if self._deferred_write is not None:
+            self._deferred_write()
+            self._deferred_write = None
+
+    def _write_state(self, now: float) -> None:
+        """State schreiben und merken."""
+        self._cancel_deferred_write()
+        self._mark_reported(now)
+        self.coordinator.state_writes += 1
+        self.async_write_ha_state()
+
     @property
     def available(self) -> bool:
         """Prüfe ob Entity verfügbar ist."""
-        return (
-            self.coordinator.last_update_success
-            and self.native_value is not None
+        if self._last_report is None:
+            return self._is_available(self._current_value())
+        return self._reported_available
+
+
+class VcontroledTemperatureSensor(VcontroledSensor):
+    """Temperatur-Sensor Entity."""
+
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+
+
+class VcontroledModeSensor(VcontroledSensor):
+    """Betriebsart - Rohwert der Heizung als Name (auto, standby, ...).
+
+    Backend und Cache führen den dekodierten Wert (ohne vito.xml Enum eine
+    Zahl); übersetzt wird erst hier. Texte aus einem Enum bleiben, wie sie sind.
+    """
+
+    _MODE_NAMES = {value: mode for mode, value in MODE_VALUES.items()}
+
+    def _current_value(self):
+        """Aktueller Wert als Betriebsart."""
+        value = super()._current_value()
+        if isinstance(value, int):
+            return self._MODE_NAMES.get(value, value)
+        return value
+
+
+class VcontroledDaemonLogSensor(CoordinatorEntity, SensorEntity):
+    """Diagnose-Zähler aus der Ausgabe des vcontrold Daemons.
+
+    Nutzt den Coordinator nur als Takt (jeder Tick, auch ohne Read): die
+    Zähler stammen aus dem Daemon Manager, bleiben auch bei fehlgeschlagenem
+    Polling verfügbar und werden nur geschrieben, wenn sie sich geändert haben.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: VcontroledDataUpdateCoordinator,
+        daemon_manager: VcontroledDaemonManager,
+        counter: str,
+        name: str,
+        icon: str,
+    ):
+        """Initialisiere Zähler-Sensor."""
+        super().__init__(coordinator)
+        self._daemon_manager = daemon_manager
+        self._counter = counter
+        self._reported_value: Optional[int] = None
+        self._attr_unique_id = f"vcontrold_daemon_{counter}"
+        self._attr_name = name
+        self._attr_icon = icon
+
+    @property
+    def native_value(self) -> int:
+        """Aktueller Zählerstand (Log Stats können beim Reload wechseln)."""
+        return self._daemon_manager.log_stats.counters[self._counter]
+
+    @property
+    def available(self) -> bool:
+        """Zähler sind auch verfügbar, wenn der Daemon gerade nicht antwortet."""
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        """Entity hinzugefügt - initialer State wird von HA geschrieben."""
+        await super().async_added_to_hass()
+        self._reported_value = self.native_value
+        self.async_on_remove(
+            self.coordinator.async_add_tick_listener(self._handle_coordinator_update)
         )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Schreibe State nur bei geändertem Zählerstand."""
+        value = self.native_value
+        if value == self._reported_value:
+            return
+        self._reported_value = value
+        self.async_write_ha_state()
@@ -0,0 +1,245 @@
+"""asyncio Transport für serielle Schnittstellen (im Stil von pyserial-asyncio).
+
+Die Schnittstelle wird nicht-blockierend geöffnet und über die fd-Readiness
+des Event Loops (``add_reader``/``add_writer``) bedient - im Leerlauf kostet
+eine Heizung damit keinen Thread. Empfangene Bytes gehen sofort an das
+Protokoll (``OptolinkProtocol``), das sie inkrementell zu Frames dekodiert.
+
+Benötigt einen Event Loop mit fd-Unterstützung (POSIX, wie Home Assistant OS).
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Callable, Collection, Deque, Optional, Tuple
+
+import serial
+
+from .optolink import DecoderEvent, Event
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximale Bytes pro Read-Callback
+MAX_READ_SIZE = 1024
+
+
+class SerialTransport(asyncio.Transport):
+    """Transport über eine nicht-blockierende ``serial.Serial`` Instanz."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        protocol: asyncio.Protocol,
+        serial_instance: serial.Serial,
+    ):
+        """Initialisiere Transport und melde den fd beim Event Loop an."""
+        super().__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self._serial = serial_instance
+        self._fd = serial_instance.fileno()
+        self._write_buffer = bytearray()
+        self._closing = False
+
+        # Nicht-blockierend: Reads liefern nur bereits empfangene Bytes
+        # (nur umkonfigurieren wenn nötig - manche Treiber lehnen das ab)
+        if self._serial.timeout != 0:
+            self._serial.timeout = 0
+        if self._serial.write_timeout != 0:
+            self._serial.write_timeout = 0
+
+        loop.call_soon(protocol.connection_made, self)
+        loop.call_soon(loop.add_reader, self._fd, self._read_ready)
+
+    @property
+    def serial(self) -> serial.Serial:
+        """Die zugrunde liegende Schnittstelle."""
+        return self._serial
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        return self._protocol
+
+    def set_protocol(self, protocol: asyncio.BaseProtocol) -> None:
+        self._protocol = protocol
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def get_write_buffer_size(self) -> int:
+        return len(self._write_buffer)
+
+    def can_write_eof(self) -> bool:
+        return False
+
+    def _read_ready(self) -> None:
+        """Bytes liegen an - an das Protokoll weiterreichen."""
+        try:
+            data = self._serial.read(MAX_READ_SIZE)
+        except serial.SerialException as e:
+            self._fatal_error(e)
+            return
+        if data:
+            self._protocol.data_received(data)
+
+    def write(self, data: bytes) -> None:
+        """Sende Bytes (sofort, Rest über ``add_writer``)."""
+        if self._closing or not data:
+            return
+        if not self._write_buffer:
+            try:
+                written = os.write(self._fd, data)
+            except (BlockingIOError, InterruptedError):
+                written = 0
+            except OSError as e:
+                self._fatal_error(e)
+                return
+            if written == len(data):
+                return
+            data = data[written:]
+            self._loop.add_writer(self._fd, self._write_ready)
+        self._write_buffer += data
+
+    def _write_ready(self) -> None:
+        """Schnittstelle wieder beschreibbar - Puffer weiter leeren."""
+        try:
+            written = os.write(self._fd, self._write_buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._fatal_error(e)
+            return
+        del self._write_buffer[:written]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._fd)
+            if self._closing:
+                self._call_connection_lost(None)
+
+    def close(self) -> None:
+        """Schließe nach dem Senden des Puffers."""
+        if self._closing:
+            return
+        self._closing = True
+        self._loop.remove_reader(self._fd)
+        if not self._write_buffer:
+            self._loop.call_soon(self._call_connection_lost, None)
+
+    def abort(self) -> None:
+        """Schließe sofort und verwerfe den Puffer."""
+        self._abort(None)
+
+    def _fatal_error(self, exc: Exception) -> None:
+        _LOGGER.warning(f"Fehler auf serieller Schnittstelle {self._serial.port}: {exc}")
+        self._abort(exc)
+
+    def _abort(self, exc: Optional[Exception]) -> None:
+        if self._closing and not self._write_buffer:
+            return
+        self._closing = True
+        self._write_buffer.clear()
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        self._loop.call_soon(self._call_connection_lost, exc)
+
+    def _call_connection_lost(self, exc: Optional[Exception]) -> None:
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        try:
+            self._serial.close()
+        except serial.SerialException:
+            pass
+        self._protocol.connection_lost(exc)
+
+
+async def create_serial_connection(
+    loop: asyncio.AbstractEventLoop, protocol_factory, **kwargs: Any
+) -> Tuple[SerialTransport, asyncio.Protocol]:
+    """Öffne eine serielle Schnittstelle und verbinde sie mit einem Protokoll.
+
+    ``kwargs`` gehen an ``serial.Serial`` (immer nicht-blockierend geöffnet).
+    """
+    serial_instance = serial.Serial(**{**kwargs, "timeout": 0, "write_timeout": 0})
+    protocol = protocol_factory()
+    transport = SerialTransport(loop, protocol, serial_instance)
+    return transport, protocol
+
+
+class OptolinkProtocol(asyncio.Protocol):
+    """Dekodiert empfangene Bytes sofort in Optolink-Ereignisse."""
+
+    def __init__(self, decoder, on_sync: Optional[Callable[[], None]] = None):
+        """Initialisiere Protokoll.
+
+        Args:
+            decoder: ``Vs2Decoder`` oder ``KwDecoder``
+            on_sync: Wird beim Empfang eines Sync-Bytes sofort aufgerufen
+        """
+        self.decoder = decoder
+        self.on_sync = on_sync
+        self.transport: Optional[SerialTransport] = None
+        self._events: Deque[DecoderEvent] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._lost = False
+        self.bad_frames = 0
+
+    @property
+    def is_connected(self) -> bool:
+        """Ist die Schnittstelle offen?"""
+        return self.transport is not None and not self._lost and not self.transport.is_closing()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        events = self.decoder.feed(data)
+        if self.on_sync is not None and any(event[0] is Event.SYNC for event in events):
+            self.on_sync()
+        self._events.extend(events)
+        self._wake()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._lost = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def reset(self) -> None:
+        """Verwerfe Restbytes und Decoder-Zustand vor einer Transaktion."""
+        self.decoder.reset()
+        self._events.clear()
+
+    def send(self, data: bytes) -> None:
+        """Sende Bytes zur Heizung."""
+        if not self.is_connected:
+            raise ConnectionError("Serielle Verbindung getrennt")
+        self.transport.write(data)
+
+    async def next_event(
+        self, wanted: Collection[Event], timeout: float
+    ) -> Optional[DecoderEvent]:
+        """Warte auf ein gewünschtes Decoder-Ereignis (None bei Timeout)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            while self._events:
+                event = self._events.popleft()
+                if event[0] is Event.ERROR:
+                    self.bad_frames += 1
+                    _LOGGER.debug(f"Frame verworfen: {event[1]}")
+                if event[0] in wanted:
+                    return event
+
+            if self._lost:
+                raise ConnectionError("Serielle Verbindung getrennt")
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+
+            self._waiter = loop.create_future()
+            try:
+                await asyncio.wait_for(self._waiter, remaining)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
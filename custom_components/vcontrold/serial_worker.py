@@ -0,0 +1,145 @@
+"""Serieller I/O Worker - ein Task als alleiniger Besitzer der Schnittstelle.
+
+Alle Bus-Zugriffe laufen über eine Prioritäts-Queue und werden von genau
+einem asyncio Task nacheinander ausgeführt. Schreibbefehle und explizite
+Reads des Benutzers überholen das Hintergrund-Polling; Aufrufer erhalten ein
+``asyncio.Future`` zurück. Im Leerlauf wartet der Task nur auf die Queue und
+belegt keinen Thread.
+"""
+import asyncio
+import itertools
+import logging
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priorität eines Bus-Zugriffs (kleiner = früher)."""
+    STOP = -1
+    WRITE = 0
+    USER = 1
+    POLL = 2
+
+
+class SerialWorker:
+    """Führt Bus-Zugriffe priorisiert in einem eigenen Task aus."""
+
+    def __init__(self, name: str = "vcontrold-serial"):
+        """Initialisiere Worker (der Task startet beim ersten Auftrag)."""
+        self.name = name
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()  # FIFO innerhalb einer Priorität
+        # Wartende Aufträge mit Schlüssel: Future, Funktion, Argumente
+        self._pending: Dict[Hashable, Tuple[asyncio.Future, Callable[..., Awaitable[Any]], tuple]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.deduplicated = 0
+
+    @property
+    def running(self) -> bool:
+        """Läuft der Worker-Task?"""
+        return self._task is not None and not self._task.done()
+
+    def submit(
+        self,
+        priority: Priority,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        key: Optional[Hashable] = None,
+    ) -> asyncio.Future:
+        """Reihe einen Bus-Zugriff ein.
+
+        Args:
+            priority: Priorität des Auftrags
+            func: Auszuführende Coroutine-Funktion (läuft im Worker-Task;
+                darf selbst keine Aufträge einreihen und abwarten)
+            key: Optionaler Schlüssel - ein noch wartender Auftrag mit
+                demselben Schlüssel wird mitgenutzt (und ggf. vorgezogen)
+        """
+        loop = asyncio.get_running_loop()
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+
+        if key is not None and key in self._pending:
+            future = self._pending[key][0]
+            self.deduplicated += 1
+        else:
+            future = loop.create_future()
+            if key is not None:
+                self._pending[key] = (future, func, args)
+        self._queue.put_nowait((priority, next(self._sequence), future, func, args, key))
+
+        if not self.running:
+            self._task = loop.create_task(self._run(), name=self.name)
+
+        return future
+
+    def promote(self, key: Hashable, priority: Priority) -> bool:
+        """Ziehe einen noch wartenden Auftrag vor.
+
+        Returns:
+            False wenn kein Auftrag mit ``key`` mehr wartet (läuft bereits
+            oder ist fertig)
+        """
+        job = self._pending.get(key)
+        if job is None:
+            return False
+        future, func, args = job
+        self.submit(priority, func, *args, key=key)
+        return True
+
+    async def _run(self) -> None:
+        """Arbeite die Queue ab, bis ein Stop-Auftrag kommt."""
+        while True:
+            _, _, future, func, args, key = await self._queue.get()
+            if future is None:
+                break
+
+            if key is not None and self._pending.get(key, (None,))[0] is future:
+                del self._pending[key]
+
+            # Doppelt eingereihte (vorgezogene) oder abgebrochene Aufträge überspringen
+            if future.done():
+                continue
+            try:
+                result = await func(*args)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            self.processed += 1
+
+        # Wartende Aufträge nach dem Stop abbrechen
+        while not self._queue.empty():
+            _, _, future, _, _, _ = self._queue.get_nowait()
+            if future is not None:
+                future.cancel()
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Beende den Worker nach dem laufenden Auftrag."""
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        self._queue.put_nowait((Priority.STOP, next(self._sequence), None, None, (), None))
+        self._pending.clear()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning(f"Worker {self.name} reagiert nicht - abgebrochen")
+        _LOGGER.debug(f"Worker {self.name} beendet")
+
+    def get_stats(self) -> dict:
+        """Hole Worker-Statistik."""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "processed": self.processed,
+            "deduplicated": self.deduplicated,
+        }
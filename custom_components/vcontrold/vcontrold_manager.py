@@ -1,26 +1,139 @@
-"""vcontrold TCP Socket Manager."""
+"""vcontrold TCP Client (asyncio-nativ)."""
 import asyncio
 import logging
-import socket
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Any, Optional, Dict, Deque, List, Set
+
+from .backend import HeatingBackend
+from .cache import CacheState, DatapointCache
+from .coalescer import AsyncRequestCoalescer
+from .const import CACHE_TTLS, SETTER_GETTER_MAP
+from .registry import CommandRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
-# vcontrold Befehle
-VCONTROLD_COMMANDS = {
-    "getTempKessel": "getTempKessel",
-    "getTempAussen": "getTempAussen",
-    "getTempWWsoll": "getTempWWsoll",
-    "getTempWWist": "getTempWWist",
-    "getTempVorlaufHK1": "getTempVorlaufHK1",
-    "setBetriebsart": "setBetriebsart",
-    "setTempWWsoll": "setTempWWsoll",
-}
+# Prompt mit dem vcontrold jede Antwort abschließt
+PROMPT = b"vctrld>"
+
+# Empfangspuffer (wird wiederverwendet, wächst nur bei Bedarf)
+BUFFER_SIZE = 4096
+MAX_REPLY_SIZE = 65536
+
+
+class VcontroldProtocol(asyncio.BufferedProtocol):
+    """Inkrementelles Framing für das vcontrold Textprotokoll.
+
+    Empfangene Bytes landen direkt in einem wiederverwendeten Puffer
+    (``get_buffer``/``buffer_updated``), ohne Zwischenkopien pro Paket.
+    Jede vollständige Antwort endet mit dem Prompt und wird in Reihenfolge
+    an die wartenden Futures verteilt. Antworten ohne wartenden Empfänger
+    (Begrüßungsprompt, verspätete Antwort nach Timeout) werden verworfen,
+    statt als Antwort auf den nächsten Befehl gelesen zu werden.
+    """
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        """Initialisiere Protokoll."""
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # Beginn der aktuellen (unvollständigen) Antwort
+        self._end = 0  # Ende der gültigen Daten
+        self._scan = 0  # Ab hier wurde noch nicht nach dem Prompt gesucht
+        self._pending: Deque[asyncio.Future] = deque()
+        self.transport: Optional[asyncio.Transport] = None
+        self.greeting: Optional[asyncio.Future] = None
+        self.stale_replies = 0
+        self.replies = 0
+
+    def connection_made(self, transport) -> None:
+        """Verbindung hergestellt."""
+        self.transport = transport
+        # vcontrold begrüßt jede neue Verbindung mit dem Prompt
+        self.greeting = self.expect_reply()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Verbindung verloren - alle wartenden Anfragen abbrechen."""
+        self.transport = None
+        error = exc or ConnectionResetError("Verbindung von vcontrold geschlossen")
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    @property
+    def is_connected(self) -> bool:
+        """Prüfe ob der Transport offen ist."""
+        return self.transport is not None and not self.transport.is_closing()
 
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Liefere freien Bereich des Empfangspuffers."""
+        if self._start and self._end == len(self._buffer):
+            # Verarbeitete Daten verwerfen, Rest an den Anfang schieben
+            length = self._end - self._start
+            self._buffer[:length] = self._view[self._start:self._end]
+            self._scan -= self._start
+            self._start = 0
+            self._end = length
+        if self._end == len(self._buffer):
+            if len(self._buffer) >= MAX_REPLY_SIZE:
+                raise RuntimeError("vcontrold Antwort überschreitet maximale Größe")
+            # Puffer vergrößern (nur bei ungewöhnlich langen Antworten)
+            buffer = bytearray(len(self._buffer) * 2)
+            buffer[:self._end] = self._view[:self._end]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        return self._view[self._end:]
 
-class VcontroledManager:
-    """Manager für vcontrold Daemon Kommunikation."""
+    def buffer_updated(self, nbytes: int) -> None:
+        """Neue Daten im Puffer - vollständige Antworten ausliefern."""
+        self._end += nbytes
+        while True:
+            index = self._buffer.find(PROMPT, self._scan, self._end)
+            if index < 0:
+                # Prompt kann über Paketgrenzen verteilt sein
+                self._scan = max(self._start, self._end - len(PROMPT) + 1)
+                break
+            reply = str(self._view[self._start:index], "utf-8", "replace").strip()
+            self._start = self._scan = index + len(PROMPT)
+            self._dispatch(reply)
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+
+    def _dispatch(self, reply: str) -> None:
+        """Übergib Antwort an die älteste wartende Anfrage."""
+        self.replies += 1
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_result(reply)
+                return
+            # Anfrage wurde abgebrochen (Timeout) - Antwort gehört ihr noch
+            _LOGGER.debug(f"Verspätete vcontrold Antwort verworfen: {reply!r}")
+            self.stale_replies += 1
+            return
+        _LOGGER.debug(f"vcontrold Antwort ohne Anfrage verworfen: {reply!r}")
+        self.stale_replies += 1
+
+    def expect_reply(self) -> asyncio.Future:
+        """Registriere Erwartung einer Antwort (z.B. Begrüßungsprompt)."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        return future
+
+    def send(self, commands: List[str]) -> List[asyncio.Future]:
+        """Sende Befehle in einem Write, liefert ein Future je Antwort."""
+        futures = [self.expect_reply() for _ in commands]
+        payload = "".join(f"{command}\n" for command in commands)
+        self.transport.write(payload.encode("utf-8"))
+        return futures
+
+
+class VcontroledManager(HeatingBackend):
+    """Manager für vcontrold Daemon Kommunikation.
+
+    Nutzt einen asyncio Transport mit ``VcontroldProtocol`` statt
+    blockierender Sockets - alle Methoden sind Coroutinen und laufen direkt
+    im Event Loop, ohne einen Executor-Thread pro Befehl zu belegen.
+    """
 
     def __init__(
         self,
@@ -28,120 +141,291 @@ class VcontroledManager:
         port: int = 3002,
         timeout: int = 10,
         cache_ttl: int = 30,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        registry: Optional[CommandRegistry] = None,
     ):
         """Initialisiere Manager."""
+        super().__init__()
+        self.registry = registry or CommandRegistry.builtin()
         self.host = host
         self.port = port
         self.timeout = timeout
         self.cache_ttl = cache_ttl
         
-        # Cache
-        self._cache: Dict[str, Any] = {}
-        self._cache_time: Dict[str, datetime] = {}
+        # Cache (TTL pro Befehl, Stale-While-Revalidate)
+        self._cache = DatapointCache(
+            default_ttl=cache_ttl,
+            ttls=CACHE_TTLS if cache_ttls is None else cache_ttls,
+        )
+        self._refresh_tasks: Set[asyncio.Task] = set()
         
         # Verbindungsstatus
-        self._connected = False
-        self._socket: Optional[socket.socket] = None
-
-    def _is_cache_valid(self, key: str) -> bool:
-        """Prüfe ob Cache noch gültig ist."""
-        if key not in self._cache_time:
-            return False
+        self._protocol: Optional[VcontroldProtocol] = None
+        self._connect_lock = asyncio.Lock()
+        self._reconnects = 0
+        
+        # Laufende Reads (Single-Flight)
+        self._coalescer = AsyncRequestCoalescer()
         
-        time_diff = datetime.now() - self._cache_time[key]
-        return time_diff < timedelta(seconds=self.cache_ttl)
+        # Vom Daemon-Supervisor gesetzt: solange vcontrold neu startet, ist
+        # das Polling pausiert und Aufrufe scheitern sofort statt im Timeout
+        self._daemon_available = True
 
-    def _send_command(self, command: str) -> str:
-        """Sende Befehl an vcontrold via TCP Socket."""
-        try:
-            if self._socket is None:
-                self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self._socket.settimeout(self.timeout)
+    def set_daemon_available(self, available: bool) -> None:
+        """Polling pausieren (False) oder fortsetzen (True)."""
+        if available != self._daemon_available:
+            _LOGGER.info(
+                "▶️ vcontrold wieder verfügbar - Polling läuft"
+                if available
+                else "⏸️ vcontrold nicht verfügbar - Polling pausiert"
+            )
+        self._daemon_available = available
+
+    def _check_daemon_available(self) -> None:
+        """Sofort scheitern, solange der Daemon nicht läuft."""
+        if not self._daemon_available:
+            raise RuntimeError("vcontrold Daemon nicht verfügbar (Neustart ausstehend)")
+
+    @property
+    def _connected(self) -> bool:
+        """Prüfe ob eine Verbindung besteht."""
+        return self._protocol is not None and self._protocol.is_connected
+
+    async def _connect(self) -> VcontroldProtocol:
+        """Baue TCP Verbindung zu vcontrold auf (falls nötig)."""
+        async with self._connect_lock:
+            if self._connected:
+                return self._protocol
             
-            # Verbindung aufbauen
-            if not self._connected:
-                self._socket.connect((self.host, self.port))
-                self._connected = True
-                _LOGGER.debug(f"Verbunden zu vcontrold auf {self.host}:{self.port}")
+            if self._protocol is not None:
+                self._reconnects += 1
             
-            # Befehl senden
-            self._socket.sendall(f"{command}\n".encode("utf-8"))
+            loop = asyncio.get_running_loop()
+            _, protocol = await asyncio.wait_for(
+                loop.create_connection(VcontroldProtocol, self.host, self.port),
+                timeout=self.timeout,
+            )
+            self._protocol = protocol
+            await asyncio.wait_for(protocol.greeting, timeout=self.timeout)
+            _LOGGER.debug(f"Verbunden zu vcontrold auf {self.host}:{self.port}")
+            return protocol
+
+    async def _send_commands(self, commands: List[str]) -> List[str]:
+        """Sende mehrere Befehle gebündelt und lese die Antworten in Reihenfolge.
+
+        Alle Befehle gehen in einem einzigen Write raus (Pipelining);
+        vcontrold arbeitet sie nacheinander ab und schließt jede Antwort
+        mit dem Prompt ab. So kostet ein ganzer Poll etwa eine Round Trip
+        Latenz statt einer pro Befehl.
+        """
+        if not commands:
+            return []
+        
+        self._check_daemon_available()
+        
+        try:
+            # Verbindung aufbauen
+            protocol = await self._connect()
             
-            # Antwort empfangen
-            response = self._socket.recv(1024).decode("utf-8").strip()
+            # Befehle senden
+            futures = protocol.send(commands)
             
-            _LOGGER.debug(f"vcontrold Antwort auf '{command}': {response}")
-            return response
+            # Antworten empfangen
+            responses = []
+            for command, future in zip(commands, futures):
+                response = await asyncio.wait_for(future, timeout=self.timeout)
+                _LOGGER.debug(f"vcontrold Antwort auf '{command}': {response}")
+                responses.append(response)
+            return responses
             
-        except socket.timeout:
-            _LOGGER.error(f"Timeout beim Senden von '{command}' an vcontrold")
-            self._disconnect()
-            raise RuntimeError(f"vcontrold Timeout: {command}")
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"Timeout beim Senden von {commands} an vcontrold")
+            await self._disconnect()
+            raise RuntimeError(f"vcontrold Timeout: {', '.join(commands)}")
             
         except ConnectionRefusedError:
             _LOGGER.error(f"Verbindung zu vcontrold ({self.host}:{self.port}) verweigert")
-            self._disconnect()
+            await self._disconnect()
             raise RuntimeError("vcontrold nicht erreichbar")
             
         except Exception as e:
             _LOGGER.error(f"Fehler beim Kommunizieren mit vcontrold: {e}")
-            self._disconnect()
+            await self._disconnect()
             raise RuntimeError(f"vcontrold Fehler: {str(e)}")
 
-    def _disconnect(self):
+    async def _send_command(self, command: str) -> str:
+        """Sende Befehl an vcontrold via TCP."""
+        responses = await self._send_commands([command])
+        return responses[0]
+
+    async def _disconnect(self):
         """Trenne Verbindung."""
-        self._connected = False
-        if self._socket:
+        if self._protocol and self._protocol.transport:
             try:
-                self._socket.close()
+                self._protocol.transport.close()
             except Exception:
                 pass
-            self._socket = None
 
-    def get_temperature(self, sensor_type: str) -> Optional[float]:
-        """Lese Temperatur mit Caching."""
-        if self._is_cache_valid(sensor_type):
-            return self._cache.get(sensor_type)
+    def _parse_temperature(self, sensor_type: str, response: str) -> Optional[Any]:
+        """Parse Wert aus vcontrold Antwort und aktualisiere Cache."""
+        # Erwartet: "OK\n23.5" oder "23.500000 Grad Celsius"
+        lines = response.split("\n")
+        if lines[0].startswith("ERR"):
+            _LOGGER.error(f"vcontrold Fehler für {sensor_type}: {response}")
+            return None
         
+        value = lines[1] if len(lines) >= 2 and lines[0] == "OK" else lines[0]
         try:
-            command = VCONTROLD_COMMANDS.get(sensor_type)
-            if not command:
-                _LOGGER.error(f"Unbekannter Sensor: {sensor_type}")
-                return None
-            
-            response = self._send_command(command)
-            
-            # Parsen der Antwort (erwarten: "OK\n23.5" oder ähnlich)
-            lines = response.split("\n")
-            if len(lines) >= 2 and lines[0] == "OK":
-                try:
-                    temp = float(lines[1])
-                    # Cache aktualisieren
-                    self._cache[sensor_type] = temp
-                    self._cache_time[sensor_type] = datetime.now()
-                    return temp
-                except ValueError:
-                    _LOGGER.error(f"Konnte Temperatur nicht parsen: {response}")
-                    return None
-            else:
+            temp = float(value.split()[0])
+        except (ValueError, IndexError):
+            datapoint = self.registry.get(sensor_type)
+            if datapoint is None or not datapoint.enum or not value.strip():
                 _LOGGER.error(f"Unerwartete Antwort von vcontrold: {response}")
                 return None
+            # Enum-Datenpunkte (z.B. Betriebsart) liefern Text
+            temp = value.strip()
+        
+        # Cache aktualisieren
+        self._cache.put(sensor_type, temp)
+        return temp
+
+    async def get_temperature(self, sensor_type: str) -> Optional[float]:
+        """Lese Temperatur mit Caching."""
+        value, state = self._cache.lookup(sensor_type)
+        if state is CacheState.FRESH:
+            return value
+        
+        if sensor_type not in self.registry:
+            _LOGGER.error(f"Unbekannter Sensor: {sensor_type}")
+            return None
+        
+        if state is CacheState.STALE:
+            # Letzten Wert sofort liefern, im Hintergrund neu lesen
+            self._schedule_refresh([sensor_type])
+            return value
+        
+        # Gleichzeitige Anfragen für denselben Sensor teilen sich einen Read
+        return await self._coalescer.run(
+            sensor_type, lambda: self._read_temperature(sensor_type)
+        )
+
+    async def _read_temperature(self, sensor_type: str) -> Optional[float]:
+        """Lese Temperatur von vcontrold (ohne Cache)."""
+        try:
+            response = await self._send_command(sensor_type)
+            return self._parse_temperature(sensor_type, response)
                 
         except RuntimeError as e:
             _LOGGER.error(f"Fehler beim Auslesen von {sensor_type}: {e}")
             return None
 
-    def set_temperature(self, command: str, value: float) -> bool:
+    async def read_many(
+        self, sensor_types: List[str], use_cache: bool = True
+    ) -> Dict[str, Optional[float]]:
+        """Lese mehrere Temperaturen mit einem gebündelten Round Trip.
+
+        Gecachte Werte werden direkt geliefert (abgelaufene werden im
+        Hintergrund aufgefrischt), bereits laufende Reads mitgenutzt und alle
+        übrigen Befehle gemeinsam über den Socket geschickt (siehe
+        ``_send_commands``).
+
+        Args:
+            sensor_types: Zu lesende Sensoren
+            use_cache: False = immer vom Bus lesen (z.B. für den Scheduler,
+                der selbst über die Aktualität entscheidet)
+
+        Returns:
+            Dict Sensor -> Wert (None bei Fehler oder unbekanntem Sensor)
+        """
+        self._check_daemon_available()
+        
+        results: Dict[str, Optional[float]] = {}
+        pending: List[str] = []
+        stale: List[str] = []
+        
+        for sensor_type in sensor_types:
+            if sensor_type not in self.registry:
+                _LOGGER.error(f"Unbekannter Sensor: {sensor_type}")
+                results[sensor_type] = None
+                continue
+            
+            if not use_cache:
+                pending.append(sensor_type)
+                continue
+            
+            value, state = self._cache.lookup(sensor_type)
+            if state is CacheState.MISS:
+                pending.append(sensor_type)
+                continue
+            
+            results[sensor_type] = value
+            if state is CacheState.STALE:
+                stale.append(sensor_type)
+        
+        if stale:
+            self._schedule_refresh(stale)
+        
+        if pending:
+            results.update(await self._coalescer.run_many(pending, self._read_batch))
+        
+        return results
+
+    def _schedule_refresh(self, sensor_types: List[str]) -> None:
+        """Frische abgelaufene Werte im Hintergrund auf."""
+        sensor_types = [
+            sensor_type for sensor_type in sensor_types
+            if not self._coalescer.in_flight(sensor_type)
+        ]
+        if not sensor_types:
+            return
+        
+        task = asyncio.create_task(
+            self._coalescer.run_many(sensor_types, self._read_batch)
+        )
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _read_batch(self, sensor_types: List[str]) -> Dict[str, Optional[float]]:
+        """Lese Temperaturen per Pipelining von vcontrold (ohne Cache)."""
+        try:
+            responses = await self._send_commands(sensor_types)
+        except RuntimeError as e:
+            _LOGGER.error(f"Fehler beim Auslesen von {sensor_types}: {e}")
+            return {sensor_type: None for sensor_type in sensor_types}
+        
+        return {
+            sensor_type: self._parse_temperature(sensor_type, response)
+            for sensor_type, response in zip(sensor_types, responses)
+        }
+
+    def _update_cache_after_write(self, command: str, value, success: bool) -> None:
+        """Write-Through: Getter-Cache nach Schreibbefehl aktualisieren.
+        
+        Gecacht wird nur, was ein Read genauso liefern würde (Zahlen als
+        float, siehe ``_parse_temperature``). Texte wie die Betriebsart
+        ("auto") übersetzt erst vcontrold in seinen Enum-Text ("H+WW") -
+        dann wird der Getter stattdessen neu gelesen.
+        """
+        getter = SETTER_GETTER_MAP.get(command) or self.registry.getter_for(command)
+        if getter is None:
+            return
+        
+        if success and isinstance(value, (int, float)) and not isinstance(value, bool):
+            self._cache.put(getter, float(value))
+        else:
+            # Zustand der Heizung unklar oder Lese-Format unbekannt - neu lesen
+            self._cache.invalidate(getter)
+        self._notify_write(getter)
+
+    async def set_temperature(self, command: str, value: float) -> bool:
         """Setze Temperatur."""
         try:
             full_command = f"{command} {value}"
-            response = self._send_command(full_command)
+            response = await self._send_command(full_command)
+            success = response.startswith("OK")
+            self._update_cache_after_write(command, value, success)
             
-            # Cache invalidieren
-            if command == "setTempWWsoll":
-                self._cache.pop("getTempWWsoll", None)
-            
-            if response.startswith("OK"):
+            if success:
                 _LOGGER.info(f"Erfolgreich: {full_command}")
                 return True
             else:
@@ -149,16 +433,19 @@ class VcontroledManager:
                 return False
                 
         except RuntimeError as e:
+            self._update_cache_after_write(command, value, False)
             _LOGGER.error(f"Fehler beim Setzen: {e}")
             return False
 
-    def set_operating_mode(self, mode: str) -> bool:
+    async def set_operating_mode(self, mode: str) -> bool:
         """Setze Betriebsart."""
         try:
             command = f"setBetriebsart {mode}"
-            response = self._send_command(command)
+            response = await self._send_command(command)
+            success = response.startswith("OK")
+            self._update_cache_after_write("setBetriebsart", mode, success)
             
-            if response.startswith("OK"):
+            if success:
                 _LOGGER.info(f"Betriebsart geändert auf: {mode}")
                 return True
             else:
@@ -166,17 +453,36 @@ class VcontroledManager:
                 return False
                 
         except RuntimeError as e:
+            self._update_cache_after_write("setBetriebsart", mode, False)
             _LOGGER.error(f"Fehler beim Setzen der Betriebsart: {e}")
             return False
 
-    def is_available(self) -> bool:
+    async def is_available(self) -> bool:
         """Prüfe Verfügbarkeit von vcontrold."""
         try:
-            response = self._send_command("ping")
+            response = await self._send_command("ping")
             return response.startswith("OK")
         except Exception:
             return False
 
-    def cleanup(self):
+    def get_info(self) -> dict:
+        """Hole Informationen über die Verbindung."""
+        protocol = self._protocol
+        return {
+            "host": self.host,
+            "port": self.port,
+            "connected": self._connected,
+            "daemon_available": self._daemon_available,
+            "reconnects": self._reconnects,
+            "replies": protocol.replies if protocol else 0,
+            "stale_replies": protocol.stale_replies if protocol else 0,
+            "coalesced_reads": self._coalescer.coalesced,
+            "cache": self._cache.get_stats(),
+            "cache_ttl": self.cache_ttl,
+        }
+
+    async def cleanup(self):
         """Räume auf."""
-        self._disconnect()
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        await self._disconnect()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Virtuelle Optolink-Heizung über ein Pseudo-Terminal (pty)
+Spricht KW und VS2 (Protokoll 300) wie eine Vitotronic - zum Testen und
+Benchmarken von ViessmannHeatingController ohne echten Kessel.
+
+Beispiel:
+    python optolink_simulator.py --protocol vs2 --nak-rate 0.05
+    # -> gibt den pty-Pfad aus, z.B. /dev/pts/3 als Port verwenden
+
+Bewusst unabhängig von der Integration implementiert (nur Standardbibliothek),
+damit Fehler im Codec der Integration nicht im Simulator gespiegelt werden.
+"""
+
+import json
+import logging
+import os
+import pty
+import random
+import select
+import struct
+import termios
+import threading
+import time
+import tty
+from typing import Dict, Iterable, Optional
+
+# Setup Logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Steuerzeichen
+ACK = 0x06
+NAK = 0x15
+ENQ = 0x05
+RESET = 0x04
+VS2_START = 0x41
+VS2_SYNC = b"\x16\x00\x00"
+KW_START = 0x01
+KW_READ = 0xF7
+KW_WRITE = 0xF4
+
+# Bits pro Byte bei 8E2 (Start + 8 Daten + Parität + 2 Stop)
+BITS_PER_BYTE = 12
+
+# Standard-Speicherbelegung (Vitotronic 300, Adresse -> Rohdaten)
+DEFAULT_MEMORY = {
+    0x00F8: b"\x20\xCB",                        # Geräte-ID
+    0x0800: struct.pack("<hhh", 52, 612, 480),  # Außen, Kessel, WW ist (/10)
+    0x2323: b"\x00",                            # Betriebsart
+    0x2900: struct.pack("<h", 355),             # Vorlauf HK1 (/10)
+    0x6300: b"\x32",                            # WW soll
+}
+
+
+def load_memory(path: str) -> Dict[int, bytes]:
+    """Lade Speicherbelegung aus JSON ({"0x0800": "3400", ...})."""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return {int(address, 16): bytes.fromhex(data) for address, data in raw.items()}
+
+
+class OptolinkSimulator:
+    """Simulierte Heizung am Slave-Ende eines Pseudo-Terminals"""
+
+    def __init__(
+        self,
+        protocol: str = "vs2",
+        memory: Optional[Dict[int, bytes]] = None,
+        undefined: Optional[Iterable[int]] = None,
+        baudrate: int = 4800,
+        latency: float = 0.02,
+        sync_interval: float = 2.0,
+        session_timeout: float = 0.5,
+        drop_rate: float = 0.0,
+        nak_rate: float = 0.0,
+        sync_loss_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            protocol: "vs2" (kann VS2 und KW) oder "kw" (nur KW)
+            memory: Speicherbelegung Adresse -> Rohdaten
+            undefined: Adressen, deren Lesen die Heizung ablehnt (VS2:
+                Fehlertelegramm, KW: keine Antwort) - auch als Lücke
+                innerhalb eines Block-Reads
+            baudrate: Simulierte Leitungsgeschwindigkeit (0 = ohne Verzögerung)
+            latency: Verarbeitungszeit der Heizung vor jeder Antwort (Sekunden)
+            sync_interval: Abstand der 0x05 Sync-Bytes im Leerlauf
+            session_timeout: KW Sitzung endet nach dieser Pause
+            drop_rate: Wahrscheinlichkeit, dass ein gesendetes Byte verloren geht
+            nak_rate: Wahrscheinlichkeit für ein NAK auf ein gültiges VS2 Telegramm
+            sync_loss_rate: Wahrscheinlichkeit, dass ein Sync-Byte ausfällt
+            seed: Zufalls-Seed für reproduzierbare Fehler
+        """
+        if protocol not in ("vs2", "kw"):
+            raise ValueError(f"Unbekanntes Protokoll: {protocol}")
+        self.protocol = protocol
+        self.undefined = frozenset(undefined or ())
+        self.baudrate = baudrate
+        self.latency = latency
+        self.sync_interval = sync_interval
+        self.session_timeout = session_timeout
+        self.drop_rate = drop_rate
+        self.nak_rate = nak_rate
+        self.sync_loss_rate = sync_loss_rate
+        self._random = random.Random(seed)
+
+        self._memory: Dict[int, int] = {}
+        for address, data in (DEFAULT_MEMORY if memory is None else memory).items():
+            self.store(address, data)
+
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._buffer = bytearray()
+
+        # Protokoll-Zustand
+        self._vs2 = False
+        self._session_until = 0.0
+        self._next_sync = 0.0
+
+        self.stats = {
+            "telegrams": 0, "reads": 0, "writes": 0, "naks": 0,
+            "dropped_bytes": 0, "syncs": 0, "lost_syncs": 0, "bad_checksums": 0,
+            "rejected": 0,
+        }
+
+    # ======================= SPEICHER =======================
+
+    def store(self, address: int, data: bytes) -> None:
+        """Schreibe Rohdaten in den simulierten Speicher"""
+        for offset, byte in enumerate(data):
+            self._memory[address + offset] = byte
+
+    def read(self, address: int, length: int) -> bytes:
+        """Lese Rohdaten (unbelegte Adressen liefern 0x00)"""
+        return bytes(self._memory.get(address + offset, 0) for offset in range(length))
+
+    def defined(self, address: int, length: int) -> bool:
+        """Liegt der Bereich vollständig auf definierten Adressen?"""
+        return not any(address + offset in self.undefined for offset in range(length))
+
+    # ======================= LEBENSZYKLUS =======================
+
+    @property
+    def port(self) -> Optional[str]:
+        """Pfad des pty (als serieller Port verwendbar)"""
+        return os.ttyname(self._slave) if self._slave is not None else None
+
+    def start(self) -> str:
+        """Öffne pty und starte Simulation; liefert den Port-Pfad"""
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self._running = True
+        self._next_sync = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="optolink-sim", daemon=True)
+        self._thread.start()
+        logger.info(f"🔌 Simulator ({self.protocol}) auf {self.port}")
+        return self.port
+
+    def stop(self) -> None:
+        """Beende Simulation und schließe pty"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self) -> "OptolinkSimulator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ======================= I/O =======================
+
+    def _send(self, data: bytes) -> None:
+        """Sende Antwort mit Verarbeitungszeit, Leitungsgeschwindigkeit und Byte-Verlust"""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.drop_rate:
+            kept = bytearray()
+            for byte in data:
+                if self._random.random() < self.drop_rate:
+                    self.stats["dropped_bytes"] += 1
+                else:
+                    kept.append(byte)
+            data = bytes(kept)
+        if self.baudrate:
+            time.sleep(len(data) * BITS_PER_BYTE / self.baudrate)
+        if data:
+            self._reset_line()
+            os.write(self._master, data)
+
+    def _run(self) -> None:
+        """Hauptschleife: Bytes empfangen, verarbeiten, Sync senden"""
+        while self._running:
+            try:
+                readable, _, _ = select.select([self._master], [], [], 0.01)
+                if readable:
+                    self._buffer += os.read(self._master, 1024)
+                    self._handle()
+                self._maybe_sync()
+            except (OSError, termios.error) as e:
+                if self._running:
+                    logger.error(f"❌ Simulator Fehler: {e}")
+                break
+
+    def _reset_line(self) -> None:
+        """Baud-Rate des pty neutral setzen.
+
+        Pseudo-Terminals kennen keine Parität. Manche Kernel lehnen daher ein
+        erneutes Öffnen mit 8E2 ab, wenn sich sonst nichts ändert - mit
+        zurückgesetzter Baud-Rate ändert jeder Client wieder etwas. Läuft vor
+        jedem Senden, also bevor ein Client auf die Antwort reagieren kann.
+        """
+        attrs = termios.tcgetattr(self._slave)
+        if attrs[4] != termios.B38400:
+            attrs[4] = attrs[5] = termios.B38400
+            termios.tcsetattr(self._slave, termios.TCSANOW, attrs)
+
+    def _maybe_sync(self) -> None:
+        """KW Leerlauf: periodisch 0x05 senden"""
+        now = time.monotonic()
+        if self._vs2 or now < self._session_until or now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+        if self._random.random() < self.sync_loss_rate:
+            self.stats["lost_syncs"] += 1
+            return
+        self.stats["syncs"] += 1
+        self._send(bytes([ENQ]))
+
+    # ======================= PROTOKOLL =======================
+
+    def _handle(self) -> None:
+        """Verarbeite alle vollständigen Befehle im Empfangspuffer"""
+        buffer = self._buffer
+        while buffer:
+            if buffer[0] == RESET:
+                # Zurück in den KW Modus, Sync-Byte folgt sofort
+                del buffer[:1]
+                self._vs2 = False
+                self._session_until = 0.0
+                self._next_sync = 0.0
+                continue
+
+            if self._vs2:
+                if not self._handle_vs2():
+                    return
+                continue
+
+            if buffer[:3] == VS2_SYNC[:len(buffer)] and len(buffer) < 3:
+                return  # Handshake noch unvollständig
+            if buffer[:3] == VS2_SYNC:
+                del buffer[:3]
+                if self.protocol == "vs2":
+                    self._vs2 = True
+                    self._send(bytes([ACK]))
+                continue
+
+            if not self._handle_kw():
+                return
+
+    def _handle_kw(self) -> bool:
+        """KW Befehl verarbeiten; False = auf weitere Bytes warten"""
+        buffer = self._buffer
+        now = time.monotonic()
+        in_session = now < self._session_until
+
+        if buffer[0] == KW_START:
+            # Beginn direkt nach dem Sync (oder in laufender Sitzung)
+            del buffer[:1]
+            self._session_until = now + self.session_timeout
+            return True
+        if buffer[0] not in (KW_READ, KW_WRITE) or not in_session:
+            del buffer[:1]  # Außerhalb einer Sitzung ignoriert die Heizung alles
+            return True
+        if len(buffer) < 4:
+            return False
+
+        command, address, length = buffer[0], struct.unpack(">H", buffer[1:3])[0], buffer[3]
+        if command == KW_READ:
+            del buffer[:4]
+            if not self.defined(address, length):
+                self.stats["rejected"] += 1
+                return True
+            self.stats["reads"] += 1
+            self._send(self.read(address, length))
+        else:
+            if len(buffer) < 4 + length:
+                return False
+            self.store(address, bytes(buffer[4:4 + length]))
+            del buffer[:4 + length]
+            self.stats["writes"] += 1
+            self._send(b"\x00")
+
+        self.stats["telegrams"] += 1
+        self._session_until = time.monotonic() + self.session_timeout
+        self._next_sync = self._session_until
+        return True
+
+    def _handle_vs2(self) -> bool:
+        """VS2 Telegramm verarbeiten; False = auf weitere Bytes warten"""
+        buffer = self._buffer
+        if buffer[0] != VS2_START:
+            del buffer[:1]
+            return True
+        if len(buffer) < 2 or len(buffer) < buffer[1] + 3:
+            return False
+
+        telegram = bytes(buffer[:buffer[1] + 3])
+        del buffer[:len(telegram)]
+
+        if sum(telegram[1:-1]) & 0xFF != telegram[-1] or telegram[1] < 5:
+            self.stats["bad_checksums"] += 1
+            self.stats["naks"] += 1
+            self._send(bytes([NAK]))
+            return True
+        if self._random.random() < self.nak_rate:
+            self.stats["naks"] += 1
+            self._send(bytes([NAK]))
+            return True
+
+        function = telegram[3]
+        address = struct.unpack(">H", telegram[4:6])[0]
+        length = telegram[6]
+        if function == 0x01 and not self.defined(address, length):
+            body = bytes([0x03, function]) + telegram[4:7]
+            self.stats["rejected"] += 1
+        elif function == 0x01:
+            body = bytes([0x01, 0x01]) + telegram[4:7] + self.read(address, length)
+            self.stats["reads"] += 1
+        elif function == 0x02:
+            self.store(address, telegram[7:-1])
+            body = bytes([0x01, 0x02]) + telegram[4:7]
+            self.stats["writes"] += 1
+        else:
+            body = bytes([0x03, function]) + telegram[4:7]
+
+        reply = bytes([VS2_START, len(body)]) + body
+        reply += bytes([sum(reply[1:]) & 0xFF])
+        self.stats["telegrams"] += 1
+        self._send(bytes([ACK]) + reply)
+        return True
+
+
+def main():
+    """Hauptprogramm"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Virtuelle Optolink-Heizung (pty)")
+    parser.add_argument("--protocol", choices=["vs2", "kw"], default="vs2", help="Protocol")
+    parser.add_argument("--memory", help="JSON memory map ({\"0x0800\": \"3400\"})")
+    parser.add_argument("--undefined", nargs="*", default=[], type=lambda value: int(value, 16),
+                        help="Addresses whose reads are rejected (hex, e.g. 0x0803)")
+    parser.add_argument("--baudrate", type=int, default=4800, help="Simulated line speed (0 = instant)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Response latency in seconds")
+    parser.add_argument("--sync-interval", type=float, default=2.0, help="KW sync byte interval")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probability of a dropped byte")
+    parser.add_argument("--nak-rate", type=float, default=0.0, help="Probability of a VS2 NAK")
+    parser.add_argument("--sync-loss-rate", type=float, default=0.0, help="Probability of a lost sync byte")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible faults")
+
+    args = parser.parse_args()
+
+    simulator = OptolinkSimulator(
+        protocol=args.protocol,
+        memory=load_memory(args.memory) if args.memory else None,
+        undefined=args.undefined,
+        baudrate=args.baudrate,
+        latency=args.latency,
+        sync_interval=args.sync_interval,
+        drop_rate=args.drop_rate,
+        nak_rate=args.nak_rate,
+        sync_loss_rate=args.sync_loss_rate,
+        seed=args.seed,
+    )
+    port = simulator.start()
+    print(port, flush=True)
+
+    logger.info("Press Ctrl+C to stop...")
+    try:
+        while True:
+            time.sleep(10)
+            logger.info(f"📊 {simulator.stats}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
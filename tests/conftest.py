@@ -0,0 +1,71 @@
+"""Gemeinsame Fixtures für die Tests der vcontrold Integration.
+
+Die Module unter ``custom_components/vcontrold`` werden ohne Home Assistant
+geladen: das Paket wird registriert, ohne ``__init__.py`` auszuführen, so
+dass z.B. ``custom_components.vcontrold.heating_controller`` direkt
+importierbar ist. Gegenstellen sind die beiden Simulatoren aus dem
+Repository (``optolink_simulator.py`` und ``vcontrold_simulator.py``).
+"""
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = ROOT / "custom_components" / "vcontrold"
+
+sys.path.insert(0, str(ROOT))
+
+if "custom_components.vcontrold" not in sys.modules:
+    _namespace = types.ModuleType("custom_components")
+    _namespace.__path__ = [str(PACKAGE.parent)]
+    _package = types.ModuleType("custom_components.vcontrold")
+    _package.__path__ = [str(PACKAGE)]
+    _namespace.vcontrold = _package
+    sys.modules["custom_components"] = _namespace
+    sys.modules["custom_components.vcontrold"] = _package
+
+from optolink_simulator import OptolinkSimulator  # noqa: E402
+
+
+class FakeClock:
+    """Manuell weitergestellte monotone Uhr für Cache und Scheduler."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Uhr, die nur der Test weiterstellt."""
+    return FakeClock()
+
+
+@pytest.fixture
+def optolink_simulator():
+    """Fabrik für simulierte Heizungen am pty (ohne Leitungsverzögerung).
+
+    Alle gestarteten Simulatoren werden nach dem Test beendet.
+    """
+    simulators = []
+
+    def start(protocol: str = "vs2", **kwargs) -> OptolinkSimulator:
+        kwargs.setdefault("baudrate", 0)
+        kwargs.setdefault("latency", 0)
+        kwargs.setdefault("sync_interval", 0.2)
+        simulator = OptolinkSimulator(protocol=protocol, **kwargs)
+        simulator.start()
+        simulators.append(simulator)
+        return simulator
+
+    yield start
+
+    for simulator in simulators:
+        simulator.stop()
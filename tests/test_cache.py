@@ -0,0 +1,119 @@
+"""Datenpunkt-Cache: TTL, Stale-While-Revalidate und Ablauf in beiden Backends."""
+import asyncio
+
+from vcontrold_simulator import VcontroldSimulator
+
+from custom_components.vcontrold.cache import CacheState, DatapointCache
+from custom_components.vcontrold.heating_controller import Framing, ViessmannHeatingController
+from custom_components.vcontrold.serial_worker import Priority
+from custom_components.vcontrold.vcontrold_manager import VcontroledManager
+
+
+def test_lookup_fresh_stale_miss(clock):
+    cache = DatapointCache(default_ttl=10, stale_factor=3, clock=clock)
+    cache.put("getTempKessel", 61.2)
+
+    assert cache.lookup("getTempKessel") == (61.2, CacheState.FRESH)
+    clock.advance(10)
+    assert cache.lookup("getTempKessel") == (61.2, CacheState.STALE)
+    clock.advance(19.9)
+    assert cache.lookup("getTempKessel") == (61.2, CacheState.STALE)
+    clock.advance(0.1)
+    assert cache.lookup("getTempKessel") == (None, CacheState.MISS)
+
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["stale_hits"] == 2
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_ttl_per_command(clock):
+    cache = DatapointCache(default_ttl=10, ttls={"getTempAussen": 300}, clock=clock)
+    cache.put("getTempAussen", 5.2)
+    cache.put("getTempKessel", 61.2)
+    clock.advance(60)
+
+    assert cache.lookup("getTempAussen")[1] is CacheState.FRESH
+    assert cache.lookup("getTempKessel")[1] is CacheState.MISS
+
+
+def test_invalidate(clock):
+    cache = DatapointCache(clock=clock)
+    cache.put("getTempWWsoll", 50.0)
+    cache.invalidate("getTempWWsoll")
+
+    assert cache.lookup("getTempWWsoll") == (None, CacheState.MISS)
+    assert len(cache) == 0
+
+
+def test_manager_serves_stale_and_refreshes(clock):
+    async def scenario():
+        async with VcontroldSimulator() as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            manager._cache = DatapointCache(default_ttl=30, stale_factor=4, clock=clock)
+            try:
+                assert await manager.get_temperature("getTempKessel") == 61.2
+                commands = simulator.stats["commands"]
+
+                # Frisch: kein Round Trip
+                assert await manager.get_temperature("getTempKessel") == 61.2
+                assert simulator.stats["commands"] == commands
+
+                # Abgelaufen: alter Wert sofort, Auffrischung im Hintergrund
+                simulator.values["getTempKessel"] = (63.0, "Grad Celsius")
+                clock.advance(30)
+                assert await manager.get_temperature("getTempKessel") == 61.2
+                await asyncio.gather(*manager._refresh_tasks)
+                assert await manager.get_temperature("getTempKessel") == 63.0
+
+                # Über die Stale-Zeit hinaus: wieder ein blockierender Read
+                simulator.values["getTempKessel"] = (64.0, "Grad Celsius")
+                clock.advance(120)
+                assert await manager.get_temperature("getTempKessel") == 64.0
+            finally:
+                await manager.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_manager_read_many_without_cache(clock):
+    async def scenario():
+        async with VcontroldSimulator() as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            manager._cache = DatapointCache(default_ttl=30, clock=clock)
+            try:
+                await manager.read_many(["getTempKessel", "getTempAussen"])
+                commands = simulator.stats["commands"]
+                await manager.read_many(["getTempKessel", "getTempAussen"])
+                cached = simulator.stats["commands"] - commands
+                await manager.read_many(["getTempKessel", "getTempAussen"], use_cache=False)
+                return cached, simulator.stats["commands"] - commands
+            finally:
+                await manager.cleanup()
+
+    cached, uncached = asyncio.run(scenario())
+    assert (cached, uncached) == (0, 2)
+
+
+def test_controller_refresh_replaces_stale_value(optolink_simulator, clock):
+    simulator = optolink_simulator("vs2")
+
+    async def scenario():
+        controller = ViessmannHeatingController(port=simulator.port, framing=Framing.FRAMING, timeout=1)
+        controller._cache = DatapointCache(default_ttl=30, clock=clock)
+        try:
+            assert await controller.get_temperature("getTempVorlaufHK1") == 35.5
+            simulator.store(0x2900, (372).to_bytes(2, "little"))
+            clock.advance(30)
+
+            assert await controller.get_temperature("getTempVorlaufHK1") == 35.5
+            # Die Auffrischung läuft über den Coalescer - ein Vordergrund-Read hängt sich an
+            assert controller._coalescer.in_flight("getTempVorlaufHK1")
+            values = await controller.read_many(["getTempVorlaufHK1"], use_cache=False, priority=Priority.USER)
+            assert values == {"getTempVorlaufHK1": 37.2}
+            assert controller._cache.lookup("getTempVorlaufHK1") == (37.2, CacheState.FRESH)
+            assert controller.get_info()["coalesced_reads"] == 1
+            assert simulator.stats["reads"] == 2
+        finally:
+            await controller.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,153 @@
+"""Daemon-Supervisor und Health Check mit einem vcontrold-Ersatz.
+
+Als Binary dient ein Skript, das ``vcontrold_simulator.py`` mit den
+Argumenten von vcontrold (``-l host -p port -d device``) startet.
+"""
+import asyncio
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from vcontrold_simulator import VcontroldSimulator
+
+from custom_components.vcontrold import daemon_manager
+from custom_components.vcontrold.daemon_manager import VcontroledDaemonManager
+from custom_components.vcontrold.health import HEALTH_DOWN, HEALTH_HEALTHY
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FAKE_VCONTROLD = f"""#!{sys.executable}
+import sys
+sys.path.insert(0, {str(ROOT)!r})
+import vcontrold_simulator
+args = sys.argv[1:]
+sys.argv = [sys.argv[0], "--host", args[args.index("-l") + 1], "--port", args[args.index("-p") + 1]]
+vcontrold_simulator.main()
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for(condition, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Zeitüberschreitung"
+        await asyncio.sleep(0.05)
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Home Assistant Konfigurationsverzeichnis mit vcontrold-Ersatz."""
+    binary = tmp_path / "vcontrold_daemon" / "vcontrold"
+    binary.parent.mkdir()
+    binary.write_text(FAKE_VCONTROLD)
+    binary.chmod(0o755)
+    return tmp_path
+
+
+def _manager(config_dir, port: int) -> VcontroledDaemonManager:
+    return VcontroledDaemonManager(str(config_dir), device="/dev/null", host="127.0.0.1", port=port)
+
+
+def test_supervisor_restarts_crashed_daemon(config_dir, monkeypatch):
+    monkeypatch.setattr(daemon_manager, "RESTART_BACKOFF_MIN", 0.2)
+    manager = _manager(config_dir, _free_port())
+    availability = []
+    manager.add_availability_listener(availability.append)
+
+    async def scenario():
+        assert await manager.start_daemon()
+        first_pid = manager._process.pid
+        assert manager.daemon_state.exists()
+
+        os.kill(first_pid, signal.SIGKILL)
+        await _wait_for(lambda: availability == [True, False, True])
+        assert manager.is_running()
+        assert manager._process.pid != first_pid
+        assert manager.get_daemon_status()["restarts"] == 1
+
+        # Gewollter Stopp: kein Neustart
+        assert await manager.stop_daemon()
+        await asyncio.sleep(0.5)
+        assert not manager.is_running()
+        assert not manager.daemon_state.exists()
+        assert availability == [True, False, True, False]
+
+    asyncio.run(scenario())
+
+
+def test_restart_backoff_and_crash_loop(config_dir):
+    manager = _manager(config_dir, _free_port())
+    minimum, maximum = daemon_manager.RESTART_BACKOFF_MIN, daemon_manager.RESTART_BACKOFF_MAX
+
+    assert 0.5 * minimum <= manager._restart_delay(1) <= minimum
+    assert 2 * minimum <= manager._restart_delay(3) <= 4 * minimum
+    assert manager._restart_delay(30) <= maximum
+
+    now = time.monotonic()
+    manager._crashes.extend([now] * daemon_manager.CRASH_LOOP_THRESHOLD)
+    assert manager._crash_loop()
+    assert manager._restart_delay(1) >= 0.5 * maximum
+
+    # Alte Abstürze fallen aus dem Fenster
+    manager._crashes.clear()
+    manager._crashes.extend([now - daemon_manager.CRASH_LOOP_WINDOW - 1] * daemon_manager.CRASH_LOOP_THRESHOLD)
+    assert not manager._crash_loop()
+
+
+def test_health_check_reads_a_datapoint(config_dir):
+    async def scenario():
+        async with VcontroldSimulator() as simulator:
+            manager = _manager(config_dir, simulator.port)
+            try:
+                assert await manager.health_check()
+                assert manager._health.state == HEALTH_HEALTHY
+
+                # Port offen, aber vcontrold meldet Fehler - das ist kein gesunder Daemon
+                simulator.errors["getTempAussen"] = "ERR: >FRAMER: Error 0x15 != 0x06 (P300_NOT_OK)"
+                for _ in range(daemon_manager.HEALTH_WINDOW):
+                    healthy = await manager.health_check()
+                assert not healthy
+                assert manager._health.state == HEALTH_DOWN
+            finally:
+                await manager._stop_supervisor()
+
+    asyncio.run(scenario())
+
+
+def test_reload_adopts_running_daemon(config_dir):
+    port = _free_port()
+
+    async def scenario():
+        first = _manager(config_dir, port)
+        assert await first.start_daemon()
+        pid = first._process.pid
+        await first.detach()
+
+        # Reload: derselbe Daemon wird übernommen statt neu gestartet
+        second = _manager(config_dir, port)
+        assert await second.start_daemon()
+        assert second._process.pid == pid
+        assert not second.spawned
+        await second.detach()
+
+        # Geänderte Argumente: alter Daemon wird beendet, neuer gestartet
+        third = _manager(config_dir, port)
+        assert await third.start_daemon(log_level="DEBUG")
+        assert third._process.pid != pid
+        assert third.spawned
+        await _wait_for(lambda: not os.path.exists(f"/proc/{pid}"))
+
+        assert await third.stop_daemon()
+        assert not third.daemon_state.exists()
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+"""Typisierte Datenpunkt-Codecs und Block-Layouts."""
+import struct
+from datetime import datetime
+
+import pytest
+
+from custom_components.vcontrold.datapoint_types import (
+    BlockLayout,
+    Codec,
+    EnumCodec,
+    ErrorHistoryCodec,
+    ScheduleCodec,
+    TimestampCodec,
+    codec_for,
+    datapoint_codec,
+)
+from custom_components.vcontrold.registry import CommandRegistry
+
+
+def test_number_codec_scaling_and_sign():
+    codec = codec_for("short", 2, 10.0)
+    assert codec.decode(struct.pack("<h", -35)) == -3.5
+    assert codec.encode(-3.5) == struct.pack("<h", -35)
+    assert codec_for("uchar", 1, 2.0).decode(b"\x65") == 50.5
+
+
+def test_number_codec_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        codec_for("uchar", 1).encode(300)
+
+
+def test_unknown_type_falls_back_to_length():
+    assert codec_for(None, 4).decode(struct.pack("<i", 12345)) == 12345
+    assert codec_for(None, 3) is None
+
+
+def test_short_data_decodes_to_none():
+    assert codec_for("short", 2).decode(b"\x01") is None
+
+
+def test_timestamp_roundtrip():
+    codec = TimestampCodec()
+    stamp = datetime(2024, 3, 17, 6, 45, 30)
+    raw = codec.encode(stamp)
+
+    assert raw == bytes([0x20, 0x24, 0x03, 0x17, 0x07, 0x06, 0x45, 0x30])
+    assert codec.decode(raw) == stamp
+    assert codec.decode(bytes(8)) is None
+
+
+def test_schedule_roundtrip():
+    codec = ScheduleCodec()
+    schedule = {"mo": [("05:30", "08:00"), ("16:00", "22:10")], "sa": [("07:00", "23:00")]}
+    decoded = codec.decode(codec.encode(schedule))
+
+    assert decoded["mo"] == schedule["mo"]
+    assert decoded["sa"] == schedule["sa"]
+    assert decoded["di"] == []
+    with pytest.raises(ValueError):
+        codec.encode({"mo": [("05:35", "08:00")]})
+
+
+def test_error_history_skips_empty_entries():
+    codec = ErrorHistoryCodec(3)
+    stamp = TimestampCodec().encode(datetime(2024, 1, 2, 3, 4, 5))
+    raw = bytes([0xB7]) + stamp + bytes(9) + bytes([0x30]) + stamp
+
+    assert codec.decode(raw) == [
+        {"code": 0xB7, "time": datetime(2024, 1, 2, 3, 4, 5)},
+        {"code": 0x30, "time": datetime(2024, 1, 2, 3, 4, 5)},
+    ]
+
+
+def test_enum_codec_text_and_fallback():
+    codec = EnumCodec({"00": "WW", "03": "H+WW"}, codec_for("uchar", 1), 1)
+
+    assert codec.decode(b"\x03") == "H+WW"
+    assert codec.decode(b"\x07") == 7
+    assert codec.encode("WW") == b"\x00"
+    assert codec.encode(2) == b"\x02"
+
+
+def test_incomplete_codec_fails_on_creation():
+    class Incomplete(Codec):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(1)
+
+
+def test_builtin_datapoints_have_codecs():
+    for datapoint in CommandRegistry.builtin():
+        codec = datapoint_codec(datapoint)
+        assert codec is not None, datapoint.name
+        assert codec.size == datapoint.length
+
+
+def test_block_layout_decodes_numbers_and_others():
+    registry = CommandRegistry.builtin()
+    aussen, wwist = registry.get("getTempAussen"), registry.get("getTempWWist")
+    stamp = datetime(2024, 5, 6, 7, 8, 9)
+    data = struct.pack("<hhh", -12, 612, 480) + TimestampCodec().encode(stamp)
+    layout = BlockLayout([
+        ("getTempWWist", datapoint_codec(wwist), 4),
+        ("getTempAussen", datapoint_codec(aussen), 0),
+        ("getSystemTime", TimestampCodec(), 6),
+    ])
+
+    assert layout.decode(data) == {"getTempAussen": -1.2, "getTempWWist": 48.0, "getSystemTime": stamp}
+    # Verkürzte Antwort: was fehlt, ist None
+    assert layout.decode(memoryview(data)[:4]) == {
+        "getTempAussen": -1.2, "getTempWWist": None, "getSystemTime": None,
+    }
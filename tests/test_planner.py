@@ -0,0 +1,99 @@
+"""Block-Reads: Planer und Rückfall auf Einzel-Reads gegen den Optolink-Simulator."""
+import asyncio
+
+import pytest
+
+from custom_components.vcontrold.heating_controller import Framing, ViessmannHeatingController
+from custom_components.vcontrold.planner import plan_reads
+from custom_components.vcontrold.registry import Datapoint
+
+
+def _datapoint(name: str, address: int, length: int = 2) -> Datapoint:
+    return Datapoint(name, address, length, "UT")
+
+
+def test_plan_merges_contiguous_datapoints():
+    datapoints = [_datapoint("c", 0x0804), _datapoint("a", 0x0800), _datapoint("b", 0x0802)]
+    blocks = plan_reads(datapoints)
+
+    assert len(blocks) == 1
+    assert (blocks[0].address, blocks[0].length) == (0x0800, 6)
+    assert [blocks[0].offset(dp) for dp in blocks[0].datapoints] == [0, 2, 4]
+
+
+def test_plan_reads_small_gaps_only():
+    datapoints = [_datapoint("a", 0x0800), _datapoint("b", 0x0806), _datapoint("c", 0x0900)]
+    blocks = plan_reads(datapoints, max_gap=4)
+
+    assert [(block.address, block.length) for block in blocks] == [(0x0800, 8), (0x0900, 2)]
+
+
+def test_plan_respects_max_length():
+    datapoints = [_datapoint(str(index), 0x0800 + 2 * index) for index in range(8)]
+    blocks = plan_reads(datapoints, max_length=8)
+
+    assert [block.length for block in blocks] == [8, 8]
+
+
+def test_plan_keeps_isolated_addresses_alone():
+    datapoints = [_datapoint("a", 0x0800), _datapoint("b", 0x0802), _datapoint("c", 0x0804)]
+    blocks = plan_reads(datapoints, isolated={0x0802})
+
+    assert [(block.address, block.length) for block in blocks] == [(0x0800, 2), (0x0802, 2), (0x0804, 2)]
+
+
+@pytest.mark.parametrize("protocol,framing", [("vs2", Framing.FRAMING), ("kw", Framing.KW)])
+def test_read_many_uses_one_block(optolink_simulator, protocol, framing):
+    simulator = optolink_simulator(protocol)
+
+    async def scenario():
+        controller = ViessmannHeatingController(port=simulator.port, framing=framing, timeout=1)
+        try:
+            return await controller.read_many(["getTempAussen", "getTempKessel", "getTempWWist"])
+        finally:
+            await controller.cleanup()
+
+    values = asyncio.run(scenario())
+    assert values == {"getTempAussen": 5.2, "getTempKessel": 61.2, "getTempWWist": 48.0}
+    assert simulator.stats["reads"] == 1
+
+
+def test_rejected_block_falls_back_to_single_reads(optolink_simulator):
+    # Die Lücke 0x0802-0x0803 zwischen Außen- und WW-Temperatur ist undefiniert
+    simulator = optolink_simulator("vs2", undefined={0x0803})
+    names = ["getTempAussen", "getTempWWist"]
+
+    async def scenario():
+        controller = ViessmannHeatingController(port=simulator.port, framing=Framing.FRAMING, timeout=1)
+        try:
+            first = await controller.read_many(names, use_cache=False)
+            rejected = simulator.stats["rejected"]
+            second = await controller.read_many(names, use_cache=False)
+            return first, rejected, second
+        finally:
+            await controller.cleanup()
+
+    first, rejected, second = asyncio.run(scenario())
+    assert first == second == {"getTempAussen": 5.2, "getTempWWist": 48.0}
+    assert rejected == 1
+    # Danach werden die Datenpunkte gleich einzeln gelesen, ohne erneute Ablehnung
+    assert simulator.stats["rejected"] == 1
+    assert simulator.stats["reads"] == 4
+
+
+def test_failed_bus_does_not_isolate_block(optolink_simulator):
+    simulator = optolink_simulator("vs2", undefined={0x0800, 0x0804})
+    names = ["getTempAussen", "getTempWWist"]
+
+    async def scenario():
+        controller = ViessmannHeatingController(port=simulator.port, framing=Framing.FRAMING, timeout=1)
+        try:
+            values = await controller.read_many(names, use_cache=False)
+            return values, set(controller._isolated)
+        finally:
+            await controller.cleanup()
+
+    values, isolated = asyncio.run(scenario())
+    assert values == {"getTempAussen": None, "getTempWWist": None}
+    # Alle Einzel-Reads gescheitert - kein Hinweis, dass es am Block lag
+    assert isolated == set()
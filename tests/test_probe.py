@@ -0,0 +1,41 @@
+"""Protokoll- und Baud-Raten-Erkennung gegen den Optolink-Simulator."""
+import asyncio
+
+from custom_components.vcontrold import probe
+from custom_components.vcontrold.heating_controller import Framing
+
+
+def test_detects_vs2(optolink_simulator):
+    simulator = optolink_simulator("vs2")
+    result = asyncio.run(probe.async_detect(simulator.port))
+
+    assert (result.framing, result.baudrate, result.device_id) == (Framing.FRAMING, 4800, "20CB")
+
+
+def test_detects_kw_only_device(optolink_simulator):
+    simulator = optolink_simulator("kw")
+    result = asyncio.run(probe.async_detect(simulator.port))
+
+    assert (result.framing, result.device_id) == (Framing.KW, "20CB")
+
+
+def test_silent_device_is_not_detected(optolink_simulator, monkeypatch):
+    monkeypatch.setattr(probe, "PROBE_SYNC_TIMEOUT", 0.3)
+    simulator = optolink_simulator("kw", sync_loss_rate=1.0)
+
+    assert asyncio.run(probe.async_detect(simulator.port)) is None
+    assert simulator.stats["syncs"] == 0
+
+
+def test_result_is_cached_per_port(optolink_simulator, tmp_path):
+    simulator = optolink_simulator("vs2")
+    cache_file = tmp_path / "probe.json"
+    port = simulator.port
+    first = asyncio.run(probe.async_detect(port, cache_file=cache_file))
+    simulator.stop()
+
+    # Ohne Heizung: Ergebnis aus dem Cache, mit force wird neu geprobt
+    cached = asyncio.run(probe.async_detect(port, cache_file=cache_file))
+    assert cached.to_dict() == first.to_dict()
+    assert asyncio.run(probe.async_detect(port, cache_file=cache_file, baudrates=(), force=True)) is None
+    assert probe.load_probe_result(cache_file, "/dev/ttyUSB9") is None
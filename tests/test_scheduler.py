@@ -0,0 +1,63 @@
+"""Gestaffelter, adaptiver Polling-Scheduler."""
+from custom_components.vcontrold.scheduler import PollScheduler
+
+TIERS = [10, 60, 300, 900]
+
+
+def _scheduler(clock, **intervals) -> PollScheduler:
+    scheduler = PollScheduler(TIERS, intervals, default_interval=60, stable_reads=2, clock=clock)
+    scheduler.set_datapoints(intervals)
+    return scheduler
+
+
+def test_new_datapoints_are_due_and_spread(clock):
+    scheduler = _scheduler(clock, a=10, b=10)
+    assert scheduler.due() == ["a", "b"]
+
+    scheduler.record("a", 1.0)
+    scheduler.record("b", 2.0)
+    clock.advance(5)
+    assert scheduler.due() == ["a"]
+    clock.advance(5)
+    assert scheduler.due() == ["a", "b"]
+
+
+def test_stable_value_slows_down_at_most_two_tiers(clock):
+    scheduler = _scheduler(clock, a=10)
+    for _ in range(20):
+        scheduler.record("a", 20.0)
+    assert scheduler.get_stats()["intervals"] == {"a": 300}
+
+
+def test_changing_value_speeds_up_one_tier(clock):
+    scheduler = _scheduler(clock, a=300)
+    scheduler.record("a", 1.0)
+    scheduler.record("a", 2.0)
+    scheduler.record("a", 3.0)
+    assert scheduler.get_stats()["intervals"] == {"a": 60}
+
+
+def test_failed_reads_keep_the_tier(clock):
+    scheduler = _scheduler(clock, a=60)
+    scheduler.record("a", 1.0)
+    for _ in range(5):
+        scheduler.record("a", None)
+    assert scheduler.get_stats()["intervals"] == {"a": 60}
+
+
+def test_expedite_makes_datapoint_due(clock):
+    scheduler = _scheduler(clock, a=900)
+    scheduler.record("a", 50.0)
+    clock.advance(1)
+    assert scheduler.due() == []
+
+    scheduler.expedite("a")
+    scheduler.expedite("unknown")
+    assert scheduler.due() == ["a"]
+
+
+def test_unknown_datapoints_use_default_interval(clock):
+    scheduler = PollScheduler(TIERS, {}, default_interval=300, clock=clock)
+    scheduler.set_datapoints(["x", "x"])
+    scheduler.record("x", 1.0)
+    assert scheduler.get_stats() == {"datapoints": 1, "intervals": {"x": 300}, "reads": 1}
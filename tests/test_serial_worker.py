@@ -0,0 +1,110 @@
+"""Prioritäts-Queue des seriellen Workers."""
+import asyncio
+
+import pytest
+
+from custom_components.vcontrold.serial_worker import Priority, SerialWorker
+
+
+def _recorder(order: list):
+    async def job(name: str) -> str:
+        order.append(name)
+        await asyncio.sleep(0)
+        return name
+    return job
+
+
+def test_writes_and_user_reads_overtake_polling():
+    async def scenario():
+        worker = SerialWorker()
+        order = []
+        job = _recorder(order)
+        futures = [worker.submit(Priority.POLL, job, "poll-1")]
+        await asyncio.sleep(0)  # Worker-Task startet den ersten Auftrag
+        futures += [
+            worker.submit(Priority.POLL, job, "poll-2"),
+            worker.submit(Priority.USER, job, "user"),
+            worker.submit(Priority.WRITE, job, "write"),
+        ]
+        await asyncio.gather(*futures)
+        await worker.stop()
+        return order
+
+    # Der laufende Auftrag wird nicht unterbrochen, danach entscheidet die Priorität
+    assert asyncio.run(scenario()) == ["poll-1", "write", "user", "poll-2"]
+
+
+def test_same_key_shares_one_job():
+    async def scenario():
+        worker = SerialWorker()
+        order = []
+        job = _recorder(order)
+        first = worker.submit(Priority.POLL, job, "a", key="a")
+        second = worker.submit(Priority.POLL, job, "a", key="a")
+        assert first is second
+        await first
+        await worker.stop()
+        return order, worker.get_stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["a"]
+    assert stats["deduplicated"] == 1
+
+
+def test_promote_moves_waiting_job_forward():
+    async def scenario():
+        worker = SerialWorker()
+        order = []
+        job = _recorder(order)
+        blocker = worker.submit(Priority.POLL, job, "blocker")
+        await asyncio.sleep(0)
+        worker.submit(Priority.POLL, job, "poll")
+        refresh = worker.submit(Priority.POLL, job, "refresh", key="refresh")
+        worker.submit(Priority.USER, job, "user")
+
+        assert worker.promote("refresh", Priority.WRITE)
+        await asyncio.gather(blocker, refresh)
+        await asyncio.sleep(0.01)
+        assert not worker.promote("refresh", Priority.WRITE)
+        await worker.stop()
+        return order, worker.get_stats()["processed"]
+
+    order, processed = asyncio.run(scenario())
+    assert order == ["blocker", "refresh", "user", "poll"]
+    # Der vorgezogene Auftrag läuft nur einmal
+    assert processed == 4
+
+
+def test_errors_reach_the_caller():
+    async def failing():
+        raise ConnectionError("Leitung weg")
+
+    async def scenario():
+        worker = SerialWorker()
+        try:
+            with pytest.raises(ConnectionError):
+                await worker.submit(Priority.USER, failing)
+            assert worker.running
+        finally:
+            await worker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_waiting_jobs():
+    async def scenario():
+        worker = SerialWorker()
+
+        async def slow():
+            await asyncio.sleep(0.05)
+
+        running = worker.submit(Priority.POLL, slow)
+        waiting = worker.submit(Priority.POLL, slow)
+        await asyncio.sleep(0)
+        await worker.stop()
+        return running, waiting, worker.running
+
+    running, waiting, still_running = asyncio.run(scenario())
+    assert running.done() and not running.cancelled()
+    assert waiting.cancelled()
+    assert not still_running
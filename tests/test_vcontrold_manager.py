@@ -0,0 +1,119 @@
+"""vcontrold TCP Client gegen den vcontrold-Simulator."""
+import asyncio
+
+from vcontrold_simulator import VcontroldSimulator
+
+from custom_components.vcontrold.vcontrold_manager import VcontroldProtocol, VcontroledManager
+
+
+class _Transport:
+    """Minimaler Transport für das Protokoll ohne Socket."""
+
+    def __init__(self):
+        self.written = b""
+
+    def write(self, data: bytes) -> None:
+        self.written += data
+
+    def is_closing(self) -> bool:
+        return False
+
+
+def _feed(protocol: VcontroldProtocol, data: bytes) -> None:
+    """Übergib Daten wie der Event Loop: höchstens so viel, wie der Puffer fasst."""
+    while data:
+        buffer = protocol.get_buffer(len(data))
+        size = min(len(buffer), len(data))
+        buffer[:size] = data[:size]
+        protocol.buffer_updated(size)
+        data = data[size:]
+
+
+def test_protocol_frames_replies_across_packets():
+    async def scenario():
+        protocol = VcontroldProtocol(buffer_size=16)
+        protocol.connection_made(_Transport())
+        first, second = protocol.send(["getTempKessel", "getTempAussen"])
+        assert protocol.transport.written == b"getTempKessel\ngetTempAussen\n"
+
+        # Begrüßung, zwei Antworten - der Prompt zerteilt, der Puffer wächst
+        stream = b"vctrld>61.200000 Grad Celsius\nvctrld>" + b"x" * 40 + b"\nvct" + b"rld>"
+        for index in range(0, len(stream), 5):
+            _feed(protocol, stream[index:index + 5])
+
+        assert protocol.greeting.done()
+        assert first.result() == "61.200000 Grad Celsius"
+        assert second.result() == "x" * 40
+
+    asyncio.run(scenario())
+
+
+def test_protocol_drops_late_reply_after_timeout():
+    async def scenario():
+        protocol = VcontroldProtocol()
+        protocol.connection_made(_Transport())
+        _feed(protocol, b"vctrld>")
+        (timed_out,) = protocol.send(["getTempKessel"])
+        timed_out.cancel()
+        (current,) = protocol.send(["getTempAussen"])
+
+        _feed(protocol, b"61.2\nvctrld>5.2\nvctrld>")
+        assert current.result() == "5.2"
+        assert protocol.stale_replies == 1
+
+    asyncio.run(scenario())
+
+
+def test_read_many_pipelines_one_round_trip():
+    async def scenario():
+        async with VcontroldSimulator(delay=0.01) as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            try:
+                values = await manager.read_many(
+                    ["getTempKessel", "getTempAussen", "getTempWWist", "getUnbekannt"]
+                )
+                return values, simulator.stats["connections"]
+            finally:
+                await manager.cleanup()
+
+    values, connections = asyncio.run(scenario())
+    assert values == {
+        "getTempKessel": 61.2, "getTempAussen": 5.2, "getTempWWist": 48.0, "getUnbekannt": None,
+    }
+    assert connections == 1
+
+
+def test_concurrent_reads_are_coalesced():
+    async def scenario():
+        async with VcontroldSimulator(delay=0.05) as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            try:
+                values = await asyncio.gather(
+                    *(manager.get_temperature("getTempKessel") for _ in range(5)),
+                    manager.read_many(["getTempKessel", "getTempAussen"]),
+                )
+                return values, simulator.stats["commands"], manager.get_info()["coalesced_reads"]
+            finally:
+                await manager.cleanup()
+
+    values, commands, coalesced = asyncio.run(scenario())
+    assert values[:5] == [61.2] * 5
+    assert values[5] == {"getTempKessel": 61.2, "getTempAussen": 5.2}
+    assert commands == 2
+    assert coalesced == 5
+
+
+def test_paused_daemon_fails_fast():
+    async def scenario():
+        async with VcontroldSimulator() as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            manager.set_daemon_available(False)
+            try:
+                assert await manager.get_temperature("getTempKessel") is None
+                assert simulator.stats["connections"] == 0
+                manager.set_daemon_available(True)
+                assert await manager.get_temperature("getTempKessel") == 61.2
+            finally:
+                await manager.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,127 @@
+"""Write-Through: Getter-Cache nach Schreibbefehlen in beiden Backends."""
+import asyncio
+
+from vcontrold_simulator import VcontroldSimulator
+
+from custom_components.vcontrold.cache import CacheState
+from custom_components.vcontrold.heating_controller import Framing, ViessmannHeatingController
+from custom_components.vcontrold.registry import CommandRegistry
+from custom_components.vcontrold.vcontrold_manager import VcontroledManager
+
+# Enum der Einheit BA wie in vcontrolds vito.xml (Rohwert hex -> Text)
+BA_ENUM = {"00": "WW", "01": "RED", "02": "NORM", "03": "H+WW", "04": "H+WW FS", "05": "ABSCHALT"}
+
+
+def _registry_with_ba_enum() -> CommandRegistry:
+    """Eingebaute Datenpunkte mit Betriebsart-Texten (vcontrold läuft immer mit vito.xml)."""
+    registry = CommandRegistry.builtin()
+    for name in ("getBetriebsart", "setBetriebsart"):
+        registry.get(name).enum = BA_ENUM
+    return registry
+
+
+def test_manager_caches_written_value():
+    async def scenario():
+        async with VcontroldSimulator() as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            written = []
+            manager.add_write_listener(written.append)
+            try:
+                assert await manager.get_temperature("getTempWWsoll") == 50.0
+                assert await manager.set_temperature("setTempWWsoll", 45)
+                commands = simulator.stats["commands"]
+
+                # Wie ein Read: float, ohne Round Trip
+                value = await manager.get_temperature("getTempWWsoll")
+                assert value == 45.0 and isinstance(value, float)
+                assert simulator.stats["commands"] == commands
+                assert written == ["getTempWWsoll"]
+            finally:
+                await manager.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_manager_failed_write_invalidates():
+    async def scenario():
+        errors = {"setTempWWsoll": "ERR: >FRAMER: Error 0x15 != 0x06 (P300_NOT_OK)"}
+        async with VcontroldSimulator(errors=errors) as simulator:
+            manager = VcontroledManager(host=simulator.host, port=simulator.port, timeout=2)
+            try:
+                assert await manager.get_temperature("getTempWWsoll") == 50.0
+                assert not await manager.set_temperature("setTempWWsoll", 45)
+                assert manager._cache.lookup("getTempWWsoll")[1] is CacheState.MISS
+                assert await manager.get_temperature("getTempWWsoll") == 50.0
+            finally:
+                await manager.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_manager_operating_mode_is_read_back():
+    async def scenario():
+        async with VcontroldSimulator() as simulator:
+            manager = VcontroledManager(
+                host=simulator.host, port=simulator.port, timeout=2, registry=_registry_with_ba_enum()
+            )
+            try:
+                assert await manager.get_temperature("getBetriebsart") == "H+WW"
+                assert await manager.set_operating_mode("WW")
+                # Den Enum-Text kennt nur vcontrold - der Getter wird neu gelesen
+                assert manager._cache.lookup("getBetriebsart")[1] is CacheState.MISS
+                assert await manager.get_temperature("getBetriebsart") == "WW"
+            finally:
+                await manager.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_controller_caches_value_as_read(optolink_simulator):
+    simulator = optolink_simulator("vs2")
+
+    async def scenario():
+        controller = ViessmannHeatingController(port=simulator.port, framing=Framing.FRAMING, timeout=1)
+        written = []
+        remove = controller.add_write_listener(written.append)
+        try:
+            assert await controller.set_temperature("setTempWWsoll", 45)
+            assert await controller.set_operating_mode("party")
+            reads = simulator.stats["reads"]
+
+            cached = {
+                name: await controller.get_temperature(name)
+                for name in ("getTempWWsoll", "getBetriebsart")
+            }
+            assert simulator.stats["reads"] == reads
+
+            # Gecacht ist genau das, was ein Read derselben Bytes liefert
+            assert cached == await controller.submit_read(cached)
+            assert written == ["getTempWWsoll", "getBetriebsart"]
+
+            remove()
+            assert await controller.set_temperature("setTempWWsoll", 46)
+            assert len(written) == 2
+        finally:
+            await controller.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_controller_rejected_write_invalidates(optolink_simulator):
+    simulator = optolink_simulator("kw")
+
+    async def scenario():
+        controller = ViessmannHeatingController(port=simulator.port, framing=Framing.KW, timeout=1)
+        try:
+            assert await controller.get_temperature("getTempWWsoll") == 50.0
+            # Außerhalb des Bereichs - nichts wird gesendet, Cache bleibt
+            assert not await controller.set_temperature("setTempWWsoll", 95)
+            assert controller._cache.lookup("getTempWWsoll") == (50.0, CacheState.FRESH)
+
+            simulator.stop()
+            assert not await controller.set_temperature("setTempWWsoll", 45)
+            assert controller._cache.lookup("getTempWWsoll")[1] is CacheState.MISS
+        finally:
+            await controller.cleanup()
+
+    asyncio.run(scenario())
@@ -10,6 +10,7 @@ import tempfile
 import urllib.request
 import tarfile
 import os
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -64,10 +65,9 @@ class VcontroledAutoInstaller:
                 _LOGGER.error("❌ Daemon konnte nicht gestartet werden")
                 return False
             
-            # Step 4: Verify Running
+            # Step 4: Verify Running - warten bis der Prompt kommt, nicht länger
             _LOGGER.info("✅ Step 4/5: Überprüfe ob Daemon läuft")
-            await asyncio.sleep(2)  # Give daemon time to start
-            if not await self._verify_running(host, port):
+            if not await self._verify_running(host, port, process=process):
                 _LOGGER.warning("⚠️ Daemon nicht erreichbar, aber läuft möglicherweise")
             
             # Step 5: Read Data
@@ -170,7 +170,7 @@ class VcontroledAutoInstaller:
         host: str,
         port: int,
         log_level: str
-    ) -> Optional[subprocess.Popen]:
+    ) -> Optional[asyncio.subprocess.Process]:
         """Starte vcontrold Daemon"""
         try:
             cmd = [
@@ -183,11 +183,11 @@ class VcontroledAutoInstaller:
             
             _LOGGER.debug(f"Command: {' '.join(cmd)}")
             
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                preexec_fn=os.setsid if os.name != 'nt' else None
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=os.name != 'nt'
             )
             
             _LOGGER.info(f"✅ Daemon gestartet (PID: {process.pid})")
@@ -197,17 +197,33 @@ class VcontroledAutoInstaller:
             _LOGGER.error(f"❌ Start Error: {e}")
             return None
     
-    async def _verify_running(self, host: str, port: int, timeout: int = 5) -> bool:
-        """Überprüfe ob Daemon läuft"""
-        try:
-            import socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except Exception:
-            return False
+    async def _verify_running(
+        self,
+        host: str,
+        port: int,
+        timeout: float = 20,
+        process: Optional[asyncio.subprocess.Process] = None
+    ) -> bool:
+        """Warte bis der Daemon den vctrld> Prompt sendet (kurzer Backoff, Gesamtfrist)"""
+        deadline = time.monotonic() + timeout
+        backoff = 0.05
+        while time.monotonic() < deadline:
+            if process is not None and process.returncode is not None:
+                _LOGGER.error(f"❌ Daemon beendet (Exit Code: {process.returncode})")
+                return False
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 2)
+                await asyncio.wait_for(reader.readuntil(b"vctrld>"), 2)
+                return True
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(min(backoff, max(deadline - time.monotonic(), 0)))
+            backoff = min(backoff * 2, 1.0)
+        return False
     
     async def _read_sensor_data(self, host: str, port: int) -> dict:
         """Lese Sensordaten vom Daemon"""
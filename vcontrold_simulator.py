@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+vcontrold Ersatz-Server für Tests und Lastmessungen
+Spricht das Textprotokoll von vcontrold (Prompt ``vctrld>``, ``getX`` /
+``setX`` mit Einheiten, ``ERR:`` Meldungen) über asyncio - ohne Heizung
+und ohne Daemon.
+
+Als Fixture (asyncio):
+    async with VcontroldSimulator(delay=0.05) as sim:
+        manager = VcontroledManager(host=sim.host, port=sim.port)
+
+Für blockierende Clients (z.B. VcontroledInstaller.read_sensor_data):
+    sim = VcontroldSimulator()
+    port = sim.start_in_thread()
+    ...
+    sim.stop_in_thread()
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+# Setup Logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROMPT = "vctrld>"
+
+# Standardwerte: Befehl -> (Wert, Einheit)
+DEFAULT_VALUES = {
+    "getTempAussen": (5.2, "Grad Celsius"),
+    "getTempKessel": (61.2, "Grad Celsius"),
+    "getTempVorlaufHK1": (35.5, "Grad Celsius"),
+    "getTempWWist": (48.0, "Grad Celsius"),
+    "getTempWWsoll": (50.0, "Grad Celsius"),
+    "getBetriebsart": ("H+WW", ""),
+    "getBrennerStarts": (12345.0, ""),
+    "getBrennerStunden1": (4321.0, "Stunden"),
+}
+
+Value = Union[float, str]
+
+
+class VcontroldSimulator:
+    """Asyncio TCP Server mit dem Verhalten von vcontrold"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        values: Optional[Dict[str, Tuple[Value, str]]] = None,
+        delay: float = 0.0,
+        delays: Optional[Dict[str, float]] = None,
+        errors: Optional[Dict[str, str]] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            host: Bind-Adresse
+            port: TCP Port (0 = freien Port wählen)
+            values: Datenpunkte Befehl -> (Wert, Einheit)
+            delay: Bearbeitungszeit pro Befehl (Sekunden, entspricht der Optolink-Transaktion)
+            delays: Abweichende Bearbeitungszeit pro Befehl
+            errors: Feste Fehlermeldung pro Befehl (z.B. "ERR: Timeout")
+            error_rate: Wahrscheinlichkeit einer zufälligen Fehlermeldung
+            seed: Zufalls-Seed für reproduzierbare Fehler
+        """
+        self.host = host
+        self.port = port
+        self.values = dict(DEFAULT_VALUES if values is None else values)
+        self.delay = delay
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._bus: Optional[asyncio.Lock] = None
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {"connections": 0, "commands": 0, "errors": 0, "busy_time": 0.0}
+
+    # ======================= LEBENSZYKLUS =======================
+
+    async def start(self) -> int:
+        """Starte Server; liefert den tatsächlichen Port"""
+        # Wie vcontrold: eine Optolink-Schnittstelle für alle Clients
+        self._bus = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"🔌 vcontrold Simulator auf {self.host}:{self.port}")
+        return self.port
+
+    async def stop(self) -> None:
+        """Beende Server"""
+        if self._server is not None:
+            self._server.close()
+            # Offene Verbindungen trennen und Handler auslaufen lassen
+            for writer in self._clients:
+                writer.close()
+            await asyncio.gather(*self._clients.values(), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "VcontroldSimulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def start_in_thread(self) -> int:
+        """Starte Server in einem eigenen Event Loop (für blockierende Clients)"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="vcontrold-sim", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.port
+
+    def stop_in_thread(self) -> None:
+        """Beende den per ``start_in_thread`` gestarteten Server"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = self._thread = None
+
+    # ======================= PROTOKOLL =======================
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Eine Client-Verbindung: Prompt, dann Befehl für Befehl"""
+        self.stats["connections"] += 1
+        self._clients[writer] = asyncio.current_task()
+        writer.write(PROMPT.encode())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("utf-8", errors="replace").strip()
+                if not command:
+                    writer.write(PROMPT.encode())
+                    continue
+                if command in ("quit", "exit"):
+                    writer.write(b"good bye!\n")
+                    break
+
+                reply = await self.execute(command)
+                writer.write(f"{reply}\n{PROMPT}".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def execute(self, command: str) -> str:
+        """Führe einen Befehl aus und liefere die Antwort (ohne Prompt)"""
+        name, _, argument = command.partition(" ")
+        self.stats["commands"] += 1
+
+        if name == "commands":
+            return "\n".join(sorted(self.values))
+
+        getter = "get" + name[3:] if name.startswith("set") else name
+        if getter not in self.values:
+            self.stats["errors"] += 1
+            return f"ERR: command {name} unknown"
+
+        # Bus-Transaktion: Clients werden nacheinander bedient
+        async with self._bus:
+            start = time.monotonic()
+            await asyncio.sleep(self.delays.get(name, self.delay))
+            self.stats["busy_time"] += time.monotonic() - start
+
+            if name in self.errors or self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return self.errors.get(name, "ERR: >FRAMER: Error 0x15 != 0x06 (P300_NOT_OK)")
+
+            if name.startswith("set"):
+                return self._set(getter, argument)
+            return self._format(*self.values[getter])
+
+    def _set(self, getter: str, argument: str) -> str:
+        """Schreibbefehl: Wert übernehmen"""
+        if not argument:
+            self.stats["errors"] += 1
+            return "ERR: parameter missing"
+        current, unit = self.values[getter]
+        if isinstance(current, str):
+            value: Value = argument
+        else:
+            try:
+                value = float(argument)
+            except ValueError:
+                self.stats["errors"] += 1
+                return f"ERR: invalid value {argument}"
+        self.values[getter] = (value, unit)
+        return "OK"
+
+    @staticmethod
+    def _format(value: Value, unit: str) -> str:
+        """Antwort im vcontrold Format ("61.200000 Grad Celsius")"""
+        if isinstance(value, str):
+            return value
+        return f"{value:f} {unit}".rstrip()
+
+
+def main():
+    """Hauptprogramm"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="vcontrold compatible test server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=3002, help="TCP port")
+    parser.add_argument("--values", help="JSON file {\"getTempKessel\": [61.2, \"Grad Celsius\"]}")
+    parser.add_argument("--delay", type=float, default=0.0, help="Processing delay per command in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an ERR reply")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible errors")
+
+    args = parser.parse_args()
+
+    values = None
+    if args.values:
+        with open(args.values, encoding="utf-8") as f:
+            values = {command: tuple(entry) for command, entry in json.load(f).items()}
+
+    simulator = VcontroldSimulator(
+        host=args.host,
+        port=args.port,
+        values=values,
+        delay=args.delay,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+    async def serve():
+        async with simulator:
+            await asyncio.Event().wait()
+
+    logger.info("Press Ctrl+C to stop...")
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info(f"📊 {simulator.stats}")
+
+
+if __name__ == "__main__":
+    main()